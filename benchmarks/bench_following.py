@@ -0,0 +1,93 @@
+"""Costo por paso y flujo de saturación de los modelos de seguimiento.
+
+Compara la regla propia de ``Lane`` con IDM y Gipps (``semaforos.following``):
+
+- costo: corrida del escenario estándar, en µs por paso y por vehículo;
+- saturación: una cola detenida ante la línea arranca con verde y se mide
+  el intervalo medio entre cruces a partir del quinto vehículo (como el
+  HCM), convertido a veh/h con ``following.STEP_SECONDS``.
+
+    python benchmarks/bench_following.py --steps 20000 --queue 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from semaforos.following import STEP_SECONDS  # noqa: E402
+from semaforos.lane import Lane  # noqa: E402
+from semaforos.scenario import LANE_A, build_simulation  # noqa: E402
+from semaforos.vehicle import Vehicle  # noqa: E402
+
+MODELS = {"regla propia": None, "idm": "idm", "gipps": "gipps"}
+SKIP = 4  # vehículos iniciales que se descartan (pérdida de arranque)
+
+
+def step_cost(model, kernel: str, storage: str, steps: int, seed: int):
+    """``(µs por paso, vehículos medios por paso)`` en el escenario estándar."""
+    lane = {"kernel": kernel, "storage": storage, "car_following": model}
+    sim = build_simulation(seed=seed, lane_A=lane, lane_B=lane, max_steps=steps)
+    inter = sim.intersection
+    vehicles = 0
+    start = time.perf_counter()
+    while sim.step():
+        vehicles += len(inter.lane_A.vehicles) + len(inter.lane_B.vehicles)
+    elapsed = time.perf_counter() - start
+    return elapsed / steps * 1e6, vehicles / steps
+
+
+def saturation_headway(model, kernel: str, storage: str, queue: int, jam_gap: float = 2.0):
+    """Intervalo medio (pasos) entre cruces de la línea de una cola que arranca."""
+    lane = Lane(name="A", kernel=kernel, storage=storage, car_following=model, **LANE_A)
+    spacing = lane.vehicle_length + jam_gap
+    for k in range(queue):
+        lane.insert_vehicle(Vehicle(id=k, position=0.5 + k * spacing, speed=0.0, stopped=True))
+
+    crossed = {}
+    for tick in range(1, 20000):
+        lane.step_vehicles(light_green=True)
+        for v in lane.vehicles:
+            if v.position <= 0 and v.id not in crossed:
+                crossed[v.id] = tick
+        if len(crossed) == queue:
+            break
+    ticks = sorted(crossed.values())[SKIP:]
+    if len(ticks) < 2:
+        return None
+    return (ticks[-1] - ticks[0]) / (len(ticks) - 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--queue", type=int, default=20, help="vehículos en la cola de saturación")
+    parser.add_argument("--kernel", default="array", choices=("python", "array", "numba"))
+    parser.add_argument("--storage", default="ring", choices=("list", "ring"))
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{'modelo':<14}{'µs/paso':>10}{'veh/paso':>10}{'µs/veh':>9}"
+        f"{'intervalo s':>13}{'flujo veh/h':>13}"
+    )
+    for name, model in MODELS.items():
+        per_step, vehicles = step_cost(model, args.kernel, args.storage, args.steps, args.seed)
+        headway = saturation_headway(model, args.kernel, args.storage, args.queue)
+        per_vehicle = per_step / vehicles if vehicles else 0.0
+        if headway is None:
+            flow = "sin descarga"
+            seconds = "-"
+        else:
+            seconds = f"{headway * STEP_SECONDS:.2f}"
+            flow = f"{3600 / (headway * STEP_SECONDS):.0f}"
+        print(
+            f"{name:<14}{per_step:>10.1f}{vehicles:>10.1f}{per_vehicle:>9.2f}"
+            f"{seconds:>13}{flow:>13}"
+        )
+
+
+if __name__ == "__main__":
+    main()
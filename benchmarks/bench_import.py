@@ -0,0 +1,64 @@
+"""Tiempo de importación y arranque del paquete en procesos nuevos.
+
+Mide, en intérpretes recién lanzados, cuánto cuesta importar la API sin
+ventana frente a cargar también la GUI (pygame). Es el costo que paga cada
+proceso de un barrido o de un pool de trabajadores.
+
+    python benchmarks/bench_import.py --runs 20
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CASES = {
+    "intérprete vacío": "pass",
+    "import semaforos": "import semaforos",
+    "simulación de 1 paso": (
+        "from semaforos import Lane, Intersection, Simulation\n"
+        "sim = Simulation(Intersection(lane_A=Lane(name='A'), lane_B=Lane(name='B')))\n"
+        "sim.step()"
+    ),
+    "import semaforos.gui": "import semaforos.gui",
+}
+
+
+def time_case(code: str, runs: int):
+    """Devuelve los tiempos (ms) de ``runs`` procesos que ejecutan ``code``."""
+    probe = (
+        "import time\n"
+        "t0 = time.perf_counter()\n"
+        f"exec({code!r})\n"
+        "print((time.perf_counter() - t0) * 1000)"
+    )
+    times = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True
+        )
+        if result.returncode:
+            return None
+        times.append(float(result.stdout.strip().splitlines()[-1]))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    print(f"{'caso':<24}{'mediana ms':>12}{'mín ms':>10}")
+    for name, code in CASES.items():
+        times = time_case(code, args.runs)
+        if times is None:
+            print(f"{name:<24}{'no disponible':>22}")
+            continue
+        print(f"{name:<24}{statistics.median(times):>12.2f}{min(times):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
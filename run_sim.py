@@ -1,45 +1,73 @@
-from semaforos.lane import Lane
-from semaforos.intersection import Intersection
+import argparse
+from semaforos.scenario import build_simulation
 from semaforos.simulation import Simulation
-from semaforos.gui import GUI
 
 
-def main():
+def run_headless(simulation: Simulation, steps: int):
+    """Ejecuta sin ventana y muestra un resumen (no carga pygame)."""
+    for _ in range(steps):
+        if not simulation.step():
+            break
+    stats = simulation.get_statistics()
+    state = stats["intersection_state"]
+    print(f"Pasos: {stats['time']}")
+    print(f"Vehículos: generados={stats['total_spawned']} completados={stats['total_completed']}")
+    print(f"Eficiencia: {stats['system_efficiency']:.1f}% | Espera prom: {stats['avg_wait_time']:.1f}")
+    print(f"Cambios de semáforo: {state['total_changes']}")
 
-    print("=" * 80)
-    print("SIMULACIÓN DE SEMÁFOROS AUTO-ORGANIZANTES")
-    print("=" * 80)
-    print()
 
-    # Configuración de carriles
-    lane_A = Lane(
-        name="A",
-        max_speed=1.8,
-        lane_length=600.0,
-        min_gap_units=1.8,
-        vehicle_length=3.5,
-    )
+def run_until_steady_headless(simulation: Simulation, tolerance: float, max_steps: int):
+    """Ejecuta hasta el estado estacionario (o ``max_steps``) y muestra las estimaciones."""
+    from semaforos.convergence import run_until_steady
+
+    result = run_until_steady(simulation, tolerance=tolerance, max_steps=max_steps)
+    status = "alcanzado" if result["converged"] else "no alcanzado"
+    print(f"Estado estacionario {status} en {result['steps']} pasos")
+    for name, m in result["metrics"].items():
+        print(
+            f"  {name}: calentamiento={m['warmup_ticks']} media={m['mean']:.3f} "
+            f"±{m['half_width']:.3f} ({100 * m['relative_half_width']:.1f}%)"
+        )
 
-    lane_B = Lane(
-        name="B",
-        max_speed=1.7,
-        lane_length=600.0,
-        min_gap_units=1.8,
-        vehicle_length=3.5,
-    )
 
-    intersection = Intersection(
-        lane_A=lane_A, lane_B=lane_B, d=180.0, n=20, u=220, m=4, r=50.0, e=35.0
+def main():
+    parser = argparse.ArgumentParser(description="Simulación de semáforos auto-organizantes")
+    parser.add_argument("--headless", action="store_true", help="ejecutar sin ventana")
+    parser.add_argument(
+        "--steps",
+        type=int,
+        default=None,
+        help="pasos a simular con --headless (10000; con --until-steady, máximo: sin límite propio)",
+    )
+    parser.add_argument(
+        "--until-steady",
+        type=float,
+        default=None,
+        metavar="TOL",
+        help=(
+            "con --headless, parar cuando el semiancho relativo del IC sea < TOL; "
+            "necesita al menos 4000 pasos más el calentamiento"
+        ),
     )
+    parser.add_argument("--seed", type=int, default=None, help="semilla para repetir una corrida")
+    args = parser.parse_args()
 
-    intersection.light_A.set_green()
-    intersection.light_B.set_red()
+    print("=" * 80)
+    print("SIMULACIÓN DE SEMÁFOROS AUTO-ORGANIZANTES")
+    print("=" * 80)
+    print()
 
-    simulation = Simulation(intersection=intersection, max_steps=2000000)
+    simulation = build_simulation(seed=args.seed)
 
-    gui = GUI(simulation, width=1400, height=900)
     try:
-        gui.run()
+        if args.headless and args.until_steady is not None:
+            run_until_steady_headless(simulation, args.until_steady, args.steps)
+        elif args.headless:
+            run_headless(simulation, 10000 if args.steps is None else args.steps)
+        else:
+            from semaforos.gui import GUI  # pygame solo se carga con ventana
+
+            GUI(simulation, width=1400, height=900).run()
     except KeyboardInterrupt:
         print("\nSimulación interrumpida por el usuario.")
     except Exception as e:
@@ -0,0 +1,19 @@
+"""Simulación de semáforos auto-organizantes.
+
+La API principal (``Lane``, ``Intersection``, ``Simulation``) se importa sin
+pygame; ``GUI`` se carga solo al pedirla (``from semaforos import GUI``).
+"""
+
+from .lane import Lane, TrafficPattern
+from .intersection import Intersection
+from .simulation import Simulation
+
+__all__ = ["Lane", "TrafficPattern", "Intersection", "Simulation", "GUI"]
+
+
+def __getattr__(name):
+    if name == "GUI":
+        from .gui import GUI
+
+        return GUI
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,38 @@
+"""Bucle de asyncio en un hilo aparte para los servidores locales.
+
+La simulación corre en el hilo principal; los servidores (telemetría,
+control) viven en este bucle y solo intercambian datos con ella mediante
+llamadas thread-safe, sin bloquear el bucle de simulación.
+"""
+
+import asyncio
+import threading
+
+
+class LoopThread:
+    def __init__(self, name: str = "semaforos-aio"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def submit(self, coro):
+        """Ejecuta una corrutina en el bucle; devuelve un ``concurrent.futures.Future``."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, callback, *args):
+        """Agenda ``callback(*args)`` en el bucle desde cualquier hilo."""
+        self.loop.call_soon_threadsafe(callback, *args)
+
+    def stop(self, timeout: float = 5.0):
+        if not self._thread.is_alive():
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout)
+        self.loop.close()
@@ -0,0 +1,253 @@
+"""Caché persistente de resultados de simulación.
+
+La clave es un SHA-256 del JSON canónico de la configuración (campos de
+cada ``Lane`` y su ``TrafficPattern``, parámetros del ``Intersection``),
+la semilla, los pasos y una huella del código de simulación, de modo que
+cambiar el código invalida los resultados viejos. Los valores se guardan
+como JSON comprimido con zlib en SQLite (modo WAL, apto para varios
+procesos a la vez) y se descartan los menos usados cuando el tamaño total
+supera ``max_bytes``.
+
+Los modelos de demanda se describen por su clase y sus atributos simples;
+si dependen de archivos o funciones (p. ej. ``DetectorDemand``) conviene
+pasar ``extra`` con algo que los identifique.
+
+Las series se muestrean de los contadores y las estadísticas completas
+solo se piden al final (``get_statistics()`` no consume números
+aleatorios, pero arma diccionarios por carril en cada llamada).
+"""
+
+from functools import lru_cache
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from dataclasses import asdict
+from typing import Optional
+from .scenario import build_simulation
+
+# Módulos cuyo código determina el resultado de una corrida
+SIMULATION_MODULES = (
+    "demand.py",
+    "following.py",
+    "intersection.py",
+    "kernels.py",
+    "lane.py",
+    "light.py",
+    "road.py",
+    "rolling.py",
+    "scenario.py",
+    "simulation.py",
+    "storage.py",
+    "vehicle.py",
+)
+
+LANE_FIELDS = (
+    "name",
+    "max_speed",
+    "lane_length",
+    "min_gap_units",
+    "vehicle_length",
+    "kernel",
+    "storage",
+    "demand_block",
+)
+INTERSECTION_FIELDS = ("d", "n", "u", "m", "r", "e", "use_pce")
+SERIES_FIELDS = ("time", "total_vehicles_completed", "total_waiting_time")
+
+_SIMPLE = (bool, int, float, str, type(None))
+
+
+@lru_cache(maxsize=None)
+def code_version() -> str:
+    """Huella del código fuente de los módulos de simulación."""
+    digest = hashlib.sha256()
+    base = os.path.dirname(os.path.abspath(__file__))
+    for name in SIMULATION_MODULES:
+        with open(os.path.join(base, name), "rb") as f:
+            digest.update(name.encode())
+            digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+def _describe_demand(demand) -> Optional[dict]:
+    if demand is None:
+        return None
+    attrs = {
+        k: v
+        for k, v in vars(demand).items()
+        if not k.startswith("_")
+        and (isinstance(v, _SIMPLE) or (isinstance(v, (list, tuple)) and all(isinstance(x, _SIMPLE) for x in v)))
+    }
+    return {"class": type(demand).__name__, **attrs}
+
+
+def _describe_following(model) -> Optional[dict]:
+    if model is None or isinstance(model, str):
+        return model
+    return {"model": model.name, **asdict(model)}
+
+
+def _describe_vclass(vclass) -> dict:
+    description = asdict(vclass)
+    description["following"] = [_describe_following(m) for m in vclass.following]
+    return description
+
+
+def _describe_lane(lane) -> dict:
+    pattern = asdict(lane.traffic_pattern)
+    pattern.pop("current_time", None)
+    description = {name: getattr(lane, name) for name in LANE_FIELDS}
+    description["traffic_pattern"] = pattern
+    description["demand"] = _describe_demand(lane.demand)
+    if lane.vehicle_mix is not None:
+        description["vehicle_mix"] = [
+            [_describe_vclass(vclass), weight] for vclass, weight in lane.vehicle_mix
+        ]
+    if lane.car_following is not None:
+        description["car_following"] = _describe_following(lane.car_following)
+    return description
+
+
+def describe_simulation(sim) -> dict:
+    """Configuración completa de una simulación recién construida."""
+    inter = sim.intersection
+    approaches = {}
+    for key, approach in (("A", inter.lane_A), ("B", inter.lane_B)):
+        lanes = getattr(approach, "lanes", None)
+        if lanes is None:
+            approaches[key] = _describe_lane(approach)
+        else:
+            approaches[key] = {
+                "road": type(approach).__name__,
+                "lanes": [_describe_lane(lane) for lane in lanes],
+            }
+    return {
+        "approaches": approaches,
+        "intersection": {name: getattr(inter, name) for name in INTERSECTION_FIELDS},
+        "initial_green": "A" if inter.light_A.state == "green" else "B",
+    }
+
+
+def make_key(config: dict, seed, steps: int, extra=None) -> str:
+    payload = {
+        "config": config,
+        "seed": seed,
+        "steps": steps,
+        "extra": extra,
+        "code": code_version(),
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ResultCache:
+    def __init__(self, path: str, max_bytes: int = 256 << 20):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._pid = None
+
+    def _connection(self) -> sqlite3.Connection:
+        # Una conexión por proceso: no se comparten tras un fork
+        if self._conn is None or self._pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=30.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, value BLOB NOT NULL,"
+                " size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS results_accessed ON results(accessed)")
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[dict]:
+        conn = self._connection()
+        row = conn.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        conn.execute("UPDATE results SET accessed = ? WHERE key = ?", (time.time(), key))
+        return json.loads(zlib.decompress(row[0]))
+
+    def put(self, key: str, value: dict):
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode(), 6)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, blob, len(blob), time.time()),
+            )
+            self._evict(conn)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn):
+        (total,) = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        for key, size in conn.execute(
+            "SELECT key, size FROM results ORDER BY accessed"
+        ).fetchall():
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            excess -= size
+            if excess <= 0:
+                break
+
+    def size(self) -> int:
+        (total,) = self._connection().execute(
+            "SELECT COALESCE(SUM(size), 0) FROM results"
+        ).fetchone()
+        return total
+
+    def clear(self):
+        self._connection().execute("DELETE FROM results")
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+    def run(
+        self,
+        steps: int,
+        seed: Optional[int] = None,
+        series_every: Optional[int] = None,
+        extra=None,
+        **build_kwargs,
+    ) -> dict:
+        """Devuelve ``{"statistics", "series"}`` de la corrida, simulándola solo si falta.
+
+        ``build_kwargs`` se pasan a ``scenario.build_simulation``. Sin semilla
+        la corrida no es reproducible y no se guarda.
+        """
+        sim = build_simulation(seed=seed, max_steps=steps, **build_kwargs)
+        key = make_key(describe_simulation(sim), seed, steps, extra)
+        if seed is not None:
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+
+        series = {name: [] for name in SERIES_FIELDS} if series_every else None
+        for _ in range(steps):
+            if not sim.step():
+                break
+            if series is not None and sim.time % series_every == 0:
+                for name in SERIES_FIELDS:
+                    series[name].append(getattr(sim, name))
+
+        result = {"statistics": sim.get_statistics(), "series": series}
+        if seed is not None:
+            self.put(key, result)
+        return result
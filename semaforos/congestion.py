@@ -0,0 +1,139 @@
+"""Detección de desbordes de cola (spillback) y episodios de bloqueo total.
+
+``CongestionMonitor`` es un observador de ``Simulation`` que por tick solo
+lee valores ya calculados durante el paso: la cola de cada aproximación
+(``queue_length``/``queue_tail``, medidas al mover los vehículos), las
+llegadas rechazadas y el contador de completados. No recorre vehículos.
+
+- Spillback: la cola detenida alcanza el punto de generación
+  (``queue_tail >= lane_length - margin``) o se rechaza una llegada por
+  falta de espacio. Termina cuando la cola retrocede por debajo de
+  ``lane_length - margin - hysteresis`` sin nuevos rechazos.
+- Gridlock: pasan ``gridlock_ticks`` sin que ningún vehículo complete el
+  recorrido mientras hay cola. El episodio empieza en el tick siguiente a
+  la última salida y termina con la próxima. Al inicio se cuenta desde el
+  tiempo mínimo de recorrido, para no confundir el llenado con un bloqueo.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+
+@dataclass
+class CongestionEvent:
+    kind: str  # "spillback" o "gridlock"
+    approach: Optional[str]  # "A", "B" o None para eventos de todo el cruce
+    start: int
+    end: Optional[int] = None  # None mientras el episodio sigue activo
+    peak_queue: int = 0
+    rejected: int = 0  # llegadas rechazadas durante el episodio
+
+    @property
+    def duration(self) -> Optional[int]:
+        return None if self.end is None else self.end - self.start
+
+
+class CongestionMonitor:
+    def __init__(
+        self,
+        sim,
+        margin: float = 10.0,
+        hysteresis: float = 20.0,
+        gridlock_ticks: int = 300,
+        on_event: Optional[Callable[[CongestionEvent], None]] = None,
+    ):
+        self.sim = sim
+        self.margin = margin
+        self.hysteresis = hysteresis
+        self.gridlock_ticks = gridlock_ticks
+        self.on_event = on_event  # se llama al abrir y al cerrar cada episodio
+
+        self.events: List[CongestionEvent] = []
+        self.active: Dict[str, CongestionEvent] = {}
+        self._rejected = {"A": 0, "B": 0}
+        self._last_completed = sim.total_vehicles_completed
+        inter = sim.intersection
+        travel = max(
+            2 * lane.lane_length / lane.max_speed for lane in (inter.lane_A, inter.lane_B)
+        )
+        self._last_exit_tick = sim.time + int(travel)  # primera salida esperada
+
+    def start(self):
+        inter = self.sim.intersection
+        self._rejected = {"A": inter.lane_A.rejected_spawns, "B": inter.lane_B.rejected_spawns}
+        self.sim.add_observer(self._on_step)
+        return self
+
+    def stop(self):
+        self.sim.remove_observer(self._on_step)
+
+    def _on_step(self, sim):
+        t = sim.time
+        inter = sim.intersection
+        self._check_spillback("A", inter.lane_A, t)
+        self._check_spillback("B", inter.lane_B, t)
+        self._check_gridlock(sim, inter, t)
+
+    def _check_spillback(self, name: str, approach, t: int):
+        rejected = approach.rejected_spawns - self._rejected[name]
+        self._rejected[name] = approach.rejected_spawns
+        tail = approach.queue_tail
+        limit = approach.lane_length - self.margin
+        key = "spillback_" + name
+        event = self.active.get(key)
+
+        if event is None:
+            if tail >= limit or rejected:
+                event = CongestionEvent(
+                    "spillback", name, t, peak_queue=approach.queue_length, rejected=rejected
+                )
+                self._open(event, key)
+        else:
+            event.rejected += rejected
+            if approach.queue_length > event.peak_queue:
+                event.peak_queue = approach.queue_length
+            if not rejected and tail < limit - self.hysteresis:
+                self._close(key, t)
+
+    def _check_gridlock(self, sim, inter, t: int):
+        completed = sim.total_vehicles_completed
+        if completed != self._last_completed:
+            self._last_completed = completed
+            self._last_exit_tick = t
+            if "gridlock" in self.active:
+                self._close("gridlock", t)
+            return
+
+        queue = inter.lane_A.queue_length + inter.lane_B.queue_length
+        event = self.active.get("gridlock")
+        if event is not None:
+            if queue > event.peak_queue:
+                event.peak_queue = queue
+        elif queue and t - self._last_exit_tick >= self.gridlock_ticks:
+            self._open(
+                CongestionEvent("gridlock", None, self._last_exit_tick + 1, peak_queue=queue),
+                "gridlock",
+            )
+
+    def _open(self, event: CongestionEvent, key: str):
+        self.active[key] = event
+        self.events.append(event)
+        if self.on_event:
+            self.on_event(event)
+
+    def _close(self, key: str, t: int):
+        event = self.active.pop(key)
+        event.end = t
+        if self.on_event:
+            self.on_event(event)
+
+    def summary(self) -> dict:
+        """Conteo y ticks acumulados por tipo de episodio (los activos hasta ahora)."""
+        now = self.sim.time
+        result = {}
+        for event in self.events:
+            entry = result.setdefault(event.kind, {"episodes": 0, "ticks": 0, "active": 0})
+            entry["episodes"] += 1
+            entry["ticks"] += (event.end if event.end is not None else now) - event.start
+            entry["active"] += event.end is None
+        return result
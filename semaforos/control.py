@@ -0,0 +1,244 @@
+"""API local de control (JSON-RPC 2.0 sobre TCP, una petición por línea).
+
+Las peticiones llegan al bucle de asyncio en un hilo aparte y se encolan;
+la simulación las aplica entre pasos (``apply_pending``), de modo que el
+bucle caliente nunca toma un lock ni espera a la red.
+
+Métodos: ``pause``, ``resume``, ``step`` (``{"n": 100}``), ``set_params``
+(``{"d": 150.0, "n": 12}``), ``set_pattern`` (``{"lane": "A",
+"peak_multiplier": 2.5}``), ``stats``, ``status`` y ``shutdown``.
+"""
+
+import asyncio
+from concurrent.futures import Future
+from dataclasses import fields
+import json
+import queue
+from typing import Optional
+from .aio import LoopThread
+from .lane import TrafficPattern
+
+INTERSECTION_PARAMS = ("d", "n", "u", "m", "r", "e")
+# El reloj del patrón (``current_time``) no se expone: lo avanza la simulación
+PATTERN_FIELDS = tuple(f.name for f in fields(TrafficPattern) if f.name != "current_time")
+
+_DEFERRED = object()  # respuesta pendiente hasta completar los pasos pedidos
+
+
+class ControlError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class ControlServer:
+    def __init__(self, sim, host: str = "127.0.0.1", port: int = 0):
+        self.sim = sim
+        self.host = host
+        self.port = port
+
+        self.paused = False
+        self.address = None
+        self._commands = queue.SimpleQueue()
+        self._step_budget = 0
+        self._step_waiters = []
+        self._shutdown = False
+        self._aio = None
+        self._server = None
+        self._handlers = {}  # tarea -> writer de cada cliente conectado
+
+    # --- Servidor -----------------------------------------------------------
+
+    def start(self):
+        self._aio = LoopThread("semaforos-control").start()
+        self.address = self._aio.submit(self._serve()).result()
+        return self
+
+    def stop(self):
+        if self._aio is not None:
+            self._aio.submit(self._close()).result()
+            self._aio.stop()
+            self._aio = None
+
+    async def _serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _close(self):
+        self._server.close()
+        # Cerrar las conexiones hace que cada cliente vea fin de datos y termine
+        for writer in self._handlers.values():
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                response = await self._dispatch(line)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            writer.close()
+
+    async def _dispatch(self, line: bytes) -> dict:
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ControlError(-32700, "JSON inválido")
+            if not isinstance(request, dict):
+                raise ControlError(-32600, "La petición debe ser un objeto JSON")
+            request_id = request.get("id")
+            method = request.get("method")
+            if not isinstance(method, str):
+                raise ControlError(-32600, "Petición JSON-RPC inválida: falta 'method'")
+            params = request.get("params")
+            if params is None:
+                params = {}
+            elif not isinstance(params, dict):
+                raise ControlError(-32602, "'params' debe ser un objeto con nombres")
+
+            future = Future()
+            self._commands.put((method, params, future))
+            result = await asyncio.wrap_future(future)
+            return {"jsonrpc": "2.0", "id": request_id, "result": result}
+        except ControlError as exc:
+            return {
+                "jsonrpc": "2.0",
+                "id": request_id,
+                "error": {"code": exc.code, "message": str(exc)},
+            }
+
+    # --- Lado de la simulación ----------------------------------------------
+
+    def apply_pending(self):
+        """Aplica los comandos encolados; llamar solo entre pasos de simulación."""
+        while not self._commands.empty():
+            self._execute(*self._commands.get())
+
+    def _execute(self, method: str, params: dict, future: Future):
+        handler = getattr(self, f"_cmd_{method}", None)
+        try:
+            if handler is None:
+                raise ControlError(-32601, f"Método desconocido: {method}")
+            result = handler(params)
+        except ControlError as exc:
+            future.set_exception(exc)
+        except (TypeError, ValueError) as exc:
+            future.set_exception(ControlError(-32602, str(exc)))
+        except Exception as exc:
+            # Un comando fallido nunca detiene el bucle de la simulación
+            future.set_exception(ControlError(-32603, f"Error interno: {exc}"))
+        else:
+            if result is not _DEFERRED:
+                future.set_result(result)
+            else:
+                self._step_waiters.append(future)
+
+    def run(self, max_steps: Optional[int] = None):
+        """Bucle sin ventana controlado por la API; bloquea mientras está pausado."""
+        executed = 0
+        while True:
+            self.apply_pending()
+            if self._shutdown:
+                break
+
+            if self.paused and not self._step_budget:
+                # Sin trabajo: esperar el próximo comando sin consumir CPU
+                self._execute(*self._commands.get())
+                continue
+
+            if max_steps is not None and executed >= max_steps:
+                break
+            if not self.sim.step():
+                break
+            executed += 1
+
+            if self._step_budget:
+                self._step_budget -= 1
+                if not self._step_budget:
+                    self._finish_steps()
+
+        self._step_budget = 0
+        self._finish_steps()
+
+    def _finish_steps(self):
+        waiters, self._step_waiters = self._step_waiters, []
+        status = self._cmd_status({})
+        for future in waiters:
+            future.set_result(status)
+
+    # --- Comandos -----------------------------------------------------------
+
+    def _cmd_pause(self, params):
+        self.paused = True
+        return self._cmd_status(params)
+
+    def _cmd_resume(self, params):
+        self.paused = False
+        return self._cmd_status(params)
+
+    def _cmd_step(self, params):
+        n = int(params.get("n", 1))
+        if n < 1:
+            raise ValueError("n debe ser >= 1")
+        self.paused = True
+        self._step_budget += n
+        return _DEFERRED  # se responde al completar los pasos
+
+    def _cmd_set_params(self, params):
+        inter = self.sim.intersection
+        unknown = set(params) - set(INTERSECTION_PARAMS)
+        if unknown:
+            raise ValueError(f"Parámetros desconocidos: {sorted(unknown)}")
+        # Convertir todo antes de aplicar: un error no deja cambios a medias
+        values = {name: type(getattr(inter, name))(value) for name, value in params.items()}
+        for name, value in values.items():
+            setattr(inter, name, value)
+        return {name: getattr(inter, name) for name in INTERSECTION_PARAMS}
+
+    def _cmd_set_pattern(self, params):
+        params = dict(params)
+        target = params.pop("lane", "all")
+        unknown = set(params) - set(PATTERN_FIELDS)
+        if unknown:
+            raise ValueError(f"Campos desconocidos de TrafficPattern: {sorted(unknown)}")
+
+        inter = self.sim.intersection
+        approaches = {"A": [inter.lane_A], "B": [inter.lane_B]}
+        approaches["all"] = approaches["A"] + approaches["B"]
+        if target not in approaches:
+            raise ValueError(f"Carril desconocido: {target}")
+
+        values = {name: float(value) for name, value in params.items()}
+        for approach in approaches[target]:
+            for lane in getattr(approach, "lanes", [approach]):
+                for name, value in values.items():
+                    setattr(lane.traffic_pattern, name, value)
+        return {"lane": target, **values}
+
+    def _cmd_stats(self, params):
+        # ``get_statistics`` no consume números aleatorios: consultar no altera la corrida
+        return self.sim.get_statistics()
+
+    def _cmd_status(self, params):
+        return {
+            "time": self.sim.get_time(),
+            "paused": self.paused,
+            "pending_steps": self._step_budget,
+        }
+
+    def _cmd_shutdown(self, params):
+        self._shutdown = True
+        return self._cmd_status(params)
+
@@ -0,0 +1,188 @@
+"""Corridas hasta alcanzar el estado estacionario.
+
+Las métricas (vehículos completados y cola media) se acumulan por lotes de
+``batch_ticks`` a partir de los contadores de ``Simulation``. Periódicamente:
+
+1. Se estima el calentamiento con MSER-5 (la truncación que minimiza el
+   error estándar de la media de lo que queda, sobre medias de 5 lotes).
+2. Con los lotes posteriores se forman ``groups`` medias de lotes y se
+   calcula el semiancho del intervalo de confianza al 95 %.
+3. La corrida termina cuando, para todas las métricas, el semiancho
+   relativo es menor que ``tolerance`` y la truncación cae en la primera
+   mitad de los datos (si no, la serie todavía tiene tendencia).
+
+Largo mínimo: hacen falta ``min_batches`` lotes después del calentamiento,
+o sea ``min_batches * batch_ticks`` pasos (4000 con los valores por
+defecto) más el calentamiento detectado; como la truncación debe caer en la
+primera mitad, un calentamiento de W pasos necesita al menos 2·W pasos en
+total. ``SteadyStateMonitor.minimum_ticks`` da la cota inferior.
+"""
+
+from array import array
+import math
+from typing import Dict, Optional, Sequence
+
+METRICS = ("throughput", "queue")
+
+# Cuantiles t de Student (0.975) para pocos grados de libertad
+_T975 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365,
+    8: 2.306, 9: 2.262, 10: 2.228, 12: 2.179, 15: 2.131, 20: 2.086, 25: 2.060,
+    30: 2.042,
+}
+
+
+def _t975(df: int) -> float:
+    if df > 30:
+        return 1.96
+    return _T975[max(k for k in _T975 if k <= df)]
+
+
+def mser(values: Sequence[float]) -> int:
+    """Índice de truncación MSER: minimiza ``var(values[d:]) / (n - d)``.
+
+    Solo se consideran truncaciones en la primera mitad de la serie.
+    """
+    n = len(values)
+    if n < 2:
+        return 0
+    # Sumas desde el final para evaluar cada truncación en O(1)
+    best_d, best = 0, math.inf
+    total = total_sq = 0.0
+    suffix = [None] * n
+    for i in range(n - 1, -1, -1):
+        total += values[i]
+        total_sq += values[i] * values[i]
+        suffix[i] = (total, total_sq)
+    for d in range(n // 2 + 1):
+        m = n - d
+        s, sq = suffix[d]
+        stat = (sq - s * s / m) / (m * m)
+        if stat < best:
+            best_d, best = d, stat
+    return best_d
+
+
+def mser5(values: Sequence[float]) -> int:
+    """MSER sobre medias de 5 observaciones; devuelve la truncación en observaciones."""
+    means = [sum(values[i : i + 5]) / 5 for i in range(0, len(values) - 4, 5)]
+    return 5 * mser(means)
+
+
+def batch_means_interval(values: Sequence[float], groups: int = 20):
+    """Media y semiancho al 95 % con ``groups`` medias de lotes no solapados."""
+    size = len(values) // groups
+    if size == 0:
+        return (sum(values) / len(values) if values else 0.0), math.inf
+    means = [sum(values[g * size : (g + 1) * size]) / size for g in range(groups)]
+    mean = sum(means) / groups
+    var = sum((x - mean) ** 2 for x in means) / (groups - 1)
+    return mean, _t975(groups - 1) * math.sqrt(var / groups)
+
+
+class SteadyStateMonitor:
+    """Observador que acumula métricas por lote y decide si ya hay convergencia."""
+
+    def __init__(
+        self,
+        sim,
+        tolerance: float = 0.05,
+        batch_ticks: int = 100,
+        groups: int = 20,
+        min_batches: int = 40,  # lotes posteriores al calentamiento (>= 2 por grupo)
+        check_every: int = 20,  # lotes entre evaluaciones
+    ):
+        if min_batches < 2 * groups:
+            raise ValueError("min_batches debe ser al menos 2 * groups")
+        self.sim = sim
+        self.tolerance = tolerance
+        self.batch_ticks = batch_ticks
+        self.groups = groups
+        self.min_batches = min_batches
+        self.check_every = check_every
+
+        self.series: Dict[str, array] = {name: array("d") for name in METRICS}
+        self.converged = False
+        self.result: Optional[dict] = None
+        self._start = (sim.total_vehicles_completed, sim.total_waiting_time)
+        self._next_batch = sim.time + batch_ticks
+
+    @property
+    def minimum_ticks(self) -> int:
+        """Pasos mínimos para poder converger (sin calentamiento)."""
+        return self.min_batches * self.batch_ticks
+
+    def start(self):
+        self.sim.add_observer(self._on_step)
+        return self
+
+    def stop(self):
+        self.sim.remove_observer(self._on_step)
+
+    def _on_step(self, sim):
+        if sim.time < self._next_batch:
+            return
+        self._next_batch += self.batch_ticks
+        completed, waiting = sim.total_vehicles_completed, sim.total_waiting_time
+        self.series["throughput"].append(100.0 * (completed - self._start[0]) / self.batch_ticks)
+        self.series["queue"].append((waiting - self._start[1]) / self.batch_ticks)
+        self._start = (completed, waiting)
+
+        if len(self.series["throughput"]) % self.check_every == 0:
+            self.result = self.evaluate()
+            self.converged = self.result["converged"]
+
+    def evaluate(self) -> dict:
+        """Estimaciones actuales: truncación, media y semiancho por métrica."""
+        estimates = {}
+        converged = True
+        for name, values in self.series.items():
+            n = len(values)
+            warmup = mser5(values)
+            kept = values[warmup:]
+            mean, half = batch_means_interval(kept, self.groups)
+            relative = half / abs(mean) if mean else (0.0 if half == 0 else math.inf)
+            ok = (
+                len(kept) >= self.min_batches
+                and warmup < n // 2
+                and relative <= self.tolerance
+            )
+            converged = converged and ok
+            estimates[name] = {
+                "warmup_ticks": warmup * self.batch_ticks,
+                "mean": mean,
+                "half_width": half,
+                "relative_half_width": relative,
+                "converged": ok,
+            }
+        return {"converged": converged, "time": self.sim.time, "metrics": estimates}
+
+
+def run_until_steady(
+    sim,
+    tolerance: float = 0.05,
+    max_steps: Optional[int] = None,
+    **monitor_kwargs,
+) -> dict:
+    """Ejecuta ``sim`` hasta la convergencia o hasta ``max_steps`` (o ``sim.max_steps``).
+
+    Si el límite es menor que ``SteadyStateMonitor.minimum_ticks`` se lanza
+    ``ValueError``: la corrida no podría converger.
+    """
+    monitor = SteadyStateMonitor(sim, tolerance, **monitor_kwargs)
+    limit = sim.max_steps if max_steps is None else min(sim.max_steps, sim.time + max_steps)
+    if limit - sim.time < monitor.minimum_ticks:
+        raise ValueError(
+            f"Se necesitan al menos {monitor.minimum_ticks} pasos para evaluar la "
+            f"convergencia (límite: {limit - sim.time})"
+        )
+    monitor.start()
+    try:
+        while not monitor.converged and sim.time < limit:
+            if not sim.step():
+                break
+    finally:
+        monitor.stop()
+    result = monitor.evaluate()
+    result["steps"] = sim.time
+    return result
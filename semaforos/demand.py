@@ -0,0 +1,173 @@
+"""Modelos de demanda para generar llegadas en bloque.
+
+Cada modelo produce los tiempos de llegada (en pasos de simulación) de un
+intervalo completo de una sola vez, en lugar de una prueba de Bernoulli por
+paso. ``Lane`` consume esos tiempos a medida que avanza su reloj.
+"""
+
+from bisect import bisect_right
+import csv
+import random
+from typing import Callable, List, Optional, Sequence
+
+
+class DemandModel:
+    """Interfaz común de los modelos de demanda."""
+
+    def arrivals(self, start: float, end: float) -> List[float]:
+        """Tiempos de llegada ordenados en el intervalo ``[start, end)``."""
+        raise NotImplementedError
+
+    def rate(self, t: float) -> float:
+        """Tasa instantánea (llegadas por paso) en el tiempo ``t``."""
+        raise NotImplementedError
+
+    def reset(self):
+        """Reinicia el estado interno, si lo hay."""
+
+
+def _poisson_times(rate: float, start: float, end: float, rng) -> List[float]:
+    """Proceso de Poisson homogéneo por muestreo de tiempos entre llegadas."""
+    times = []
+    if rate <= 0:
+        return times
+    t = start + rng.expovariate(rate)
+    while t < end:
+        times.append(t)
+        t += rng.expovariate(rate)
+    return times
+
+
+class PoissonDemand(DemandModel):
+    """Llegadas de Poisson con tasa constante."""
+
+    def __init__(self, rate: float, rng: Optional[random.Random] = None):
+        self._rate = rate
+        self._rng = rng or random
+
+    def arrivals(self, start: float, end: float) -> List[float]:
+        return _poisson_times(self._rate, start, end, self._rng)
+
+    def rate(self, t: float) -> float:
+        return self._rate
+
+
+class TimeOfDayDemand(DemandModel):
+    """Tasa constante por tramos (p. ej. por hora del día), opcionalmente periódica.
+
+    ``starts`` son los inicios de cada tramo en pasos (ascendentes, el primero
+    en 0) y ``rates`` la tasa de cada tramo. Cada tramo se muestrea de forma
+    exacta por tiempos entre llegadas.
+    """
+
+    def __init__(
+        self,
+        starts: Sequence[float],
+        rates: Sequence[float],
+        period: Optional[float] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        if len(starts) != len(rates) or not starts:
+            raise ValueError("starts y rates deben tener la misma longitud (> 0)")
+        self.starts = list(starts)
+        self.rates = list(rates)
+        self.period = period
+        self._rng = rng or random
+
+    def _segment(self, t: float) -> int:
+        return max(0, bisect_right(self.starts, t) - 1)
+
+    def rate(self, t: float) -> float:
+        if self.period:
+            t %= self.period
+        return self.rates[self._segment(t)]
+
+    def arrivals(self, start: float, end: float) -> List[float]:
+        times = []
+        t = start
+        while t < end:
+            offset = 0.0
+            local = t
+            if self.period:
+                offset = t - t % self.period
+                local = t - offset
+            segment = self._segment(local)
+            if segment + 1 < len(self.starts):
+                segment_end = self.starts[segment + 1] + offset
+            elif self.period:
+                segment_end = offset + self.period
+            else:
+                segment_end = end
+            stop = min(end, segment_end)
+            times.extend(_poisson_times(self.rates[segment], t, stop, self._rng))
+            t = stop
+        return times
+
+
+class EmpiricalDemand(TimeOfDayDemand):
+    """Tasas por tramo obtenidas de conteos de detectores."""
+
+    @classmethod
+    def from_csv(
+        cls,
+        path: str,
+        count_column: str = "count",
+        time_column: Optional[str] = None,
+        interval: float = 900.0,
+        ticks_per_second: float = 1.0,
+        periodic: bool = True,
+        rng: Optional[random.Random] = None,
+    ) -> "EmpiricalDemand":
+        """Lee un CSV con un conteo por intervalo.
+
+        Si ``time_column`` está presente se usa como inicio de cada intervalo
+        (segundos); si no, las filas se toman consecutivas de ``interval``
+        segundos cada una.
+        """
+        starts, counts = [], []
+        with open(path, newline="") as f:
+            for i, row in enumerate(csv.DictReader(f)):
+                start = float(row[time_column]) if time_column else i * interval
+                starts.append(start)
+                counts.append(float(row[count_column]))
+
+        if not starts:
+            raise ValueError(f"{path} no contiene conteos")
+
+        origin = starts[0]
+        tick_starts = [(s - origin) * ticks_per_second for s in starts]
+        ends = tick_starts[1:] + [tick_starts[-1] + interval * ticks_per_second]
+        rates = [
+            count / (end - start) if end > start else 0.0
+            for count, start, end in zip(counts, tick_starts, ends)
+        ]
+        period = ends[-1] if periodic else None
+        return cls(tick_starts, rates, period=period, rng=rng)
+
+
+class ThinnedDemand(DemandModel):
+    """Proceso de Poisson no homogéneo con tasa arbitraria, por aceptación-rechazo.
+
+    ``rate_fn(t)`` no debe superar ``max_rate``.
+    """
+
+    def __init__(
+        self,
+        rate_fn: Callable[[float], float],
+        max_rate: float,
+        rng: Optional[random.Random] = None,
+    ):
+        self.rate_fn = rate_fn
+        self.max_rate = max_rate
+        self._rng = rng or random
+
+    def rate(self, t: float) -> float:
+        return self.rate_fn(t)
+
+    def arrivals(self, start: float, end: float) -> List[float]:
+        rng = self._rng
+        return [
+            t
+            for t in _poisson_times(self.max_rate, start, end, rng)
+            if rng.random() * self.max_rate < self.rate_fn(t)
+        ]
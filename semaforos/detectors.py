@@ -0,0 +1,151 @@
+"""Lectura en flujo de registros de detectores (loops) para alimentar ``Lane``.
+
+Los registros se leen de forma perezosa: los CSV por bloques con el buffer
+del archivo y los binarios mediante ``mmap``, de modo que una semana de
+datos se reproduce sin cargarla en memoria. Se asume que los eventos del
+registro están en orden cronológico.
+
+Formato binario: registros de ``RECORD`` (tiempo en segundos como float64 y
+identificador de carril como uint32, little-endian).
+"""
+
+import csv
+import mmap
+import struct
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+from .demand import DemandModel
+
+RECORD = struct.Struct("<dI")
+
+Event = Tuple[float, object]  # (tiempo en segundos, carril)
+
+
+def read_detector_csv(
+    path: str,
+    lane=None,
+    time_column: str = "time",
+    lane_column: str = "lane",
+    chunk_size: int = 1 << 20,
+) -> Iterator[Event]:
+    """Genera ``(tiempo, carril)`` desde un CSV, filtrando por carril si se indica."""
+    wanted = None if lane is None else str(lane)
+    with open(path, newline="", buffering=chunk_size) as f:
+        for row in csv.DictReader(f):
+            lane_id = row[lane_column]
+            if wanted is None or lane_id == wanted:
+                yield float(row[time_column]), lane_id
+
+
+def read_detector_binary(
+    path: str, lane: Optional[int] = None, chunk_records: int = 65536
+) -> Iterator[Event]:
+    """Genera ``(tiempo, carril)`` desde un registro binario mapeado en memoria."""
+    chunk_bytes = chunk_records * RECORD.size
+    with open(path, "rb") as f:
+        if f.seek(0, 2) == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            usable = len(mm) - len(mm) % RECORD.size
+            for offset in range(0, usable, chunk_bytes):
+                # Copia acotada a un bloque; el resto del archivo no se lee
+                chunk = mm[offset : min(offset + chunk_bytes, usable)]
+                for t, lane_id in RECORD.iter_unpack(chunk):
+                    if lane is None or lane_id == lane:
+                        yield t, lane_id
+
+
+def write_detector_binary(path: str, events: Iterable[Event], lane_ids=None):
+    """Escribe eventos en formato binario (p. ej. para convertir un CSV una sola vez).
+
+    ``lane_ids`` traduce identificadores de carril no numéricos a enteros.
+    """
+    with open(path, "wb") as f:
+        for t, lane_id in events:
+            if lane_ids is not None:
+                lane_id = lane_ids[lane_id]
+            f.write(RECORD.pack(t, int(lane_id)))
+
+
+def arrival_ticks(
+    events: Iterable[Event],
+    ticks_per_second: float = 1.0,
+    scale: float = 1.0,
+    origin: Optional[float] = None,
+) -> Iterator[float]:
+    """Convierte tiempos de eventos en pasos de simulación.
+
+    ``scale`` comprime el tiempo: con 1.5 o 2.0 las mismas llegadas ocurren en
+    menos pasos, es decir, 1.5× o 2× la demanda registrada.
+    """
+    factor = ticks_per_second / scale
+    for t, _ in events:
+        if origin is None:
+            origin = t
+        yield (t - origin) * factor
+
+
+class DetectorDemand(DemandModel):
+    """Modelo de demanda que reproduce un registro de detectores de forma perezosa.
+
+    ``source`` es una función sin argumentos que devuelve un iterador nuevo de
+    tiempos de llegada en pasos; se vuelve a llamar en ``reset``.
+    """
+
+    def __init__(self, source: Callable[[], Iterator[float]]):
+        self.source = source
+        self.reset()
+
+    @classmethod
+    def from_file(
+        cls,
+        path: str,
+        lane=None,
+        binary: bool = False,
+        ticks_per_second: float = 1.0,
+        scale: float = 1.0,
+        origin: Optional[float] = None,
+        **reader_kwargs,
+    ) -> "DetectorDemand":
+        """Demanda de un carril a partir de un archivo de registros.
+
+        Para alinear varios carriles del mismo registro conviene pasar un
+        ``origin`` común (segundos); si no, cada carril empieza en su primer
+        evento.
+        """
+        reader = read_detector_binary if binary else read_detector_csv
+
+        def source():
+            return arrival_ticks(
+                reader(path, lane=lane, **reader_kwargs),
+                ticks_per_second=ticks_per_second,
+                scale=scale,
+                origin=origin,
+            )
+
+        return cls(source)
+
+    def reset(self):
+        self._events = self.source()
+        self._pending = None  # primer evento aún no entregado
+        self._last_rate = 0.0
+
+    def arrivals(self, start: float, end: float) -> List[float]:
+        times = []
+        while True:
+            if self._pending is None:
+                self._pending = next(self._events, None)
+                if self._pending is None:
+                    break
+            if self._pending >= end:
+                break
+            if self._pending >= start:
+                times.append(self._pending)
+            self._pending = None
+
+        if end > start:
+            self._last_rate = len(times) / (end - start)
+        return times
+
+    def rate(self, t: float) -> float:
+        """Tasa observada en el último bloque entregado."""
+        return self._last_rate
@@ -0,0 +1,118 @@
+"""Registro compacto de cambios de semáforo.
+
+Cada cambio se guarda como una fila en arreglos columnares (``array``):
+tick, nuevo estado, regla que lo produjo y contadores de la Regla 1 al
+momento de decidir. Los ticks se agregan en orden creciente, así que una
+consulta por rango es una búsqueda binaria; además, por cada regla se
+guardan los ticks y los índices de sus filas, de modo que "eventos de la
+Regla 6 entre X e Y" no recorre los eventos de las demás reglas.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, NamedTuple, Optional
+
+# Estado de los semáforos tras el cambio
+STATE_A_GREEN = 0
+STATE_B_GREEN = 1
+STATE_BOTH_RED = 2
+STATE_NAMES = ("A", "B", "both_red")
+
+# Identificadores de regla (0 = salida del estado "ambos rojos")
+RULE_EXIT_BOTH_RED = 0
+RULE_COUNTER = 1
+RULE_NO_APPROACHING = 4
+RULE_STOPPED_BEYOND = 5
+RULE_CROSS_BLOCKING = 6
+RULES = (RULE_EXIT_BOTH_RED, RULE_COUNTER, RULE_NO_APPROACHING, RULE_STOPPED_BEYOND, RULE_CROSS_BLOCKING)
+
+
+class LightEvent(NamedTuple):
+    tick: int
+    state: int
+    rule: int
+    counter_A: int
+    counter_B: int
+
+
+class LightEventLog:
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.ticks = array("q")
+        self.states = array("B")
+        self.rules = array("B")
+        self.counters_A = array("i")
+        self.counters_B = array("i")
+        # Índice por regla: ticks y número de fila de cada evento
+        self._rule_ticks: Dict[int, array] = {rule: array("q") for rule in RULES}
+        self._rule_rows: Dict[int, array] = {rule: array("q") for rule in RULES}
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def record(self, tick: int, state: int, rule: int, counter_A: int, counter_B: int):
+        if self.ticks and tick < self.ticks[-1]:
+            raise ValueError("Los eventos deben registrarse en orden de tick")
+        row = len(self.ticks)
+        self.ticks.append(tick)
+        self.states.append(state)
+        self.rules.append(rule)
+        self.counters_A.append(counter_A)
+        self.counters_B.append(counter_B)
+        self._rule_ticks[rule].append(tick)
+        self._rule_rows[rule].append(row)
+
+    def _bounds(self, ticks: array, start: Optional[int], end: Optional[int]):
+        lo = 0 if start is None else bisect_left(ticks, start)
+        hi = len(ticks) if end is None else bisect_left(ticks, end)
+        return lo, max(lo, hi)
+
+    def select(
+        self, start: Optional[int] = None, end: Optional[int] = None, rule: Optional[int] = None
+    ) -> List[int]:
+        """Filas de los eventos con ``start <= tick < end`` (y de ``rule``, si se indica)."""
+        if rule is None:
+            lo, hi = self._bounds(self.ticks, start, end)
+            return list(range(lo, hi))
+        lo, hi = self._bounds(self._rule_ticks[rule], start, end)
+        return self._rule_rows[rule][lo:hi].tolist()
+
+    def count(
+        self, start: Optional[int] = None, end: Optional[int] = None, rule: Optional[int] = None
+    ) -> int:
+        ticks = self.ticks if rule is None else self._rule_ticks[rule]
+        lo, hi = self._bounds(ticks, start, end)
+        return hi - lo
+
+    def query(
+        self, start: Optional[int] = None, end: Optional[int] = None, rule: Optional[int] = None
+    ) -> List[LightEvent]:
+        return [self[row] for row in self.select(start, end, rule)]
+
+    def __getitem__(self, row: int) -> LightEvent:
+        return LightEvent(
+            self.ticks[row],
+            self.states[row],
+            self.rules[row],
+            self.counters_A[row],
+            self.counters_B[row],
+        )
+
+    def state_at(self, tick: int) -> Optional[int]:
+        """Estado vigente al final de ``tick`` (None si no hubo cambios hasta entonces)."""
+        row = bisect_left(self.ticks, tick + 1) - 1
+        return self.states[row] if row >= 0 else None
+
+    def columns(self) -> Dict[str, array]:
+        return {
+            "tick": self.ticks,
+            "state": self.states,
+            "rule": self.rules,
+            "counter_A": self.counters_A,
+            "counter_B": self.counters_B,
+        }
+
+    def rule_counts(self) -> Dict[int, int]:
+        return {rule: len(ticks) for rule, ticks in self._rule_ticks.items()}
@@ -0,0 +1,298 @@
+"""Modelos de seguimiento vehicular (car-following) seleccionables por carril.
+
+Por defecto ``Lane`` usa la regla propia del proyecto
+(``Lane._calculate_target_speed``). Con ``Lane(car_following="idm")`` o
+``"gipps"`` (o una instancia de ``IDM`` / ``Gipps`` con otros parámetros)
+el carril se actualiza con uno de estos modelos, ejecutado por lotes sobre
+los vehículos ordenados del carril.
+
+Los parámetros se expresan en unidades físicas (metros y segundos) y se
+convierten a unidades de la simulación con ``STEP_SECONDS``: una unidad de
+posición es un metro y un paso dura ``STEP_SECONDS`` segundos, así que
+``max_speed=1.8`` equivale a 18 m/s. Los valores por defecto son los
+habituales en la literatura para tráfico urbano (Treiber et al. para IDM,
+Gipps 1981), ajustados para que el flujo de saturación de los carriles
+del escenario estándar quede cerca de 1900 veh/h
+(``benchmarks/bench_following.py``).
+
+La velocidad deseada y el largo salen de la clase de cada vehículo
+(``VehicleClass.resolve``); una clase puede traer sus propios parámetros
+del modelo en ``VehicleClass.following``.
+
+El rojo se trata como un líder detenido en ``stop_line + stop_buffer``,
+salvo que el vehículo ya no pueda frenar antes de la línea con
+``max_decel``: en ese caso sigue (zona de dilema). Todos los vehículos se actualizan con el
+estado del paso anterior (actualización en paralelo) y nadie pasa a su
+líder.
+"""
+
+from dataclasses import dataclass
+import math
+from typing import ClassVar
+
+from .kernels import ORDER_SPACING, ArrayKernel, NumbaKernel
+
+STEP_SECONDS = 0.1
+
+_INF = float("inf")
+
+
+@dataclass(frozen=True)
+class IDM:
+    """Intelligent Driver Model (Treiber, Hennecke y Helbing, 2000)."""
+
+    name: ClassVar[str] = "idm"
+
+    accel: float = 1.2  # aceleración máxima (m/s²)
+    decel: float = 1.5  # desaceleración cómoda (m/s²)
+    headway: float = 1.0  # tiempo de seguimiento deseado (s)
+    min_gap: float = 2.0  # distancia mínima con el líder detenido (m)
+    delta: float = 4.0  # exponente de aceleración
+    max_decel: float = 6.0  # frenado máximo para detenerse ante el rojo (m/s²)
+
+    def resolve(self, step_seconds: float = STEP_SECONDS):
+        """Parámetros en unidades por paso, en el orden que espera ``idm_update``."""
+        dt2 = step_seconds * step_seconds
+        return (
+            self.accel * dt2,
+            self.decel * dt2,
+            self.headway / step_seconds,
+            self.min_gap,
+            self.delta,
+            self.max_decel * dt2,
+        )
+
+
+@dataclass(frozen=True)
+class Gipps:
+    """Modelo de Gipps (1981) con velocidad segura evaluada en cada paso."""
+
+    name: ClassVar[str] = "gipps"
+
+    accel: float = 1.7  # aceleración máxima (m/s²)
+    decel: float = 3.0  # desaceleración máxima propia (m/s²)
+    leader_decel: float = 3.5  # desaceleración estimada del líder (m/s²)
+    reaction: float = 2.0 / 3.0  # tiempo de reacción (s)
+    min_gap: float = 3.0  # margen sumado al largo del líder (m)
+    max_decel: float = 6.0  # frenado máximo para detenerse ante el rojo (m/s²)
+
+    def resolve(self, step_seconds: float = STEP_SECONDS):
+        """Parámetros en unidades por paso, en el orden que espera ``gipps_update``."""
+        dt2 = step_seconds * step_seconds
+        return (
+            self.accel * dt2,
+            self.decel * dt2,
+            self.leader_decel * dt2,
+            self.reaction / step_seconds,
+            self.min_gap,
+            self.max_decel * dt2,
+        )
+
+
+MODELS = {model.name: model for model in (IDM, Gipps)}
+
+
+def idm_update(
+    pos, spd, stp, extra, desired, params, count, light_green, stop_line, stop_buffer, length
+):
+    """Un paso de IDM sobre ``count`` vehículos ordenados por posición descendente.
+
+    ``params`` son las columnas de ``IDM.resolve`` por vehículo; ``length``
+    es el largo del vehículo de referencia del carril, al que se suma
+    ``extra`` del líder.
+    """
+    acc_col, dec_col, headway_col, gap_col, delta_col, max_dec_col = params
+    lead_p = _INF  # estado del líder en el paso anterior
+    lead_v = 0.0
+    lead_new = -_INF  # posición ya actualizada del líder
+    lead_extra = 0.0
+
+    # Del más adelantado al último: el líder de i es i + 1
+    for i in range(count - 1, -1, -1):
+        p = pos[i]
+        v = spd[i]
+        a = acc_col[i]
+        b = dec_col[i]
+        headway = headway_col[i]
+        s0 = gap_col[i]
+        v0 = desired[i]
+
+        free = 1.0 - (v / v0) ** delta_col[i] if v0 > 0 else -1.0
+        interaction = 0.0
+        root = 2.0 * math.sqrt(a * b)
+
+        if lead_p < _INF:
+            s = p - lead_p - length - lead_extra
+            if s < 1e-3:
+                s = 1e-3
+            desired_gap = s0 + max(0.0, v * headway + v * (v - lead_v) / root)
+            interaction = (desired_gap / s) ** 2
+
+        # Rojo: líder virtual detenido con la distancia mínima ya descontada
+        distance = p - stop_line - stop_buffer
+        if not light_green and p > stop_line and v * v <= 2.0 * max_dec_col[i] * (p - stop_line):
+            s = distance + s0
+            if s < 1e-3:
+                s = 1e-3
+            desired_gap = s0 + v * headway + v * v / root
+            light = (desired_gap / s) ** 2
+            if light > interaction:
+                interaction = light
+
+        acceleration = a * (free - interaction)
+
+        # Integración balística, sin velocidades negativas
+        new_v = v + acceleration
+        if new_v < 0.0:
+            advance = -0.5 * v * v / acceleration if acceleration < 0.0 else 0.0
+            new_v = 0.0
+        else:
+            advance = 0.5 * (v + new_v)
+
+        new_p = p - advance
+        if new_p < lead_new + ORDER_SPACING:
+            new_p = min(p, lead_new + ORDER_SPACING)
+            new_v = min(new_v, p - new_p)
+
+        lead_p = p
+        lead_v = v
+        lead_new = new_p
+        lead_extra = extra[i]
+
+        pos[i] = new_p
+        spd[i] = new_v
+        stp[i] = 1 if new_v <= 0.01 else 0
+
+
+def gipps_update(
+    pos, spd, stp, extra, desired, params, count, light_green, stop_line, stop_buffer, length
+):
+    """Un paso de Gipps sobre ``count`` vehículos ordenados por posición descendente.
+
+    La aceleración libre usa el paso de la simulación y la velocidad segura
+    el tiempo de reacción (como en las variantes de paso corto del modelo).
+    """
+    acc_col, dec_col, leader_dec_col, reaction_col, gap_col, max_dec_col = params
+    lead_p = _INF
+    lead_v = 0.0
+    lead_new = -_INF
+    lead_extra = 0.0
+
+    for i in range(count - 1, -1, -1):
+        p = pos[i]
+        v = spd[i]
+        a = acc_col[i]
+        b = dec_col[i]
+        leader_b = leader_dec_col[i]
+        tau = reaction_col[i]
+        v0 = desired[i]
+
+        ratio = v / v0 if v0 > 0 else 1.0
+        new_v = v + 2.5 * a * (1.0 - ratio) * math.sqrt(max(0.0, 0.025 + ratio))
+
+        if lead_p < _INF:
+            gap = p - lead_p - length - lead_extra - gap_col[i]
+            radicand = b * b * tau * tau + b * (2.0 * gap - v * tau + lead_v * lead_v / leader_b)
+            safe = -b * tau + math.sqrt(radicand) if radicand > 0.0 else 0.0
+            if safe < new_v:
+                new_v = safe
+
+        distance = p - stop_line - stop_buffer
+        if not light_green and p > stop_line and v * v <= 2.0 * max_dec_col[i] * (p - stop_line):
+            radicand = b * b * tau * tau + b * (2.0 * distance - v * tau)
+            safe = -b * tau + math.sqrt(radicand) if radicand > 0.0 else 0.0
+            if safe < new_v:
+                new_v = safe
+
+        if new_v < 0.0:
+            new_v = 0.0
+
+        new_p = p - 0.5 * (v + new_v)
+        if new_p < lead_new + ORDER_SPACING:
+            new_p = min(p, lead_new + ORDER_SPACING)
+            new_v = min(new_v, p - new_p)
+
+        lead_p = p
+        lead_v = v
+        lead_new = new_p
+        lead_extra = extra[i]
+
+        pos[i] = new_p
+        spd[i] = new_v
+        stp[i] = 1 if new_v <= 0.01 else 0
+
+
+_UPDATES = {"idm": idm_update, "gipps": gipps_update}
+
+
+class FollowingKernel(ArrayKernel):
+    """Ejecuta un modelo de seguimiento sobre ``array.array`` en Python puro."""
+
+    def __init__(self, model):
+        self.model = model
+        self._update = _UPDATES[model.name]
+
+    def step(
+        self,
+        vehicles,
+        params,
+        model_params,
+        light_green,
+        stop_line,
+        stop_buffer,
+        length,
+    ):
+        """Actualiza el carril; devuelve ``(largo de la cola, posición de su cola)``.
+
+        ``params`` tiene por vehículo la tupla de ``VehicleClass.resolve`` y
+        ``model_params`` la de ``resolve`` del modelo.
+        """
+        count = len(vehicles)
+        pos, spd, stp = self._pack(vehicles)
+        extra = self._pack_floats([p[0] for p in params])
+        desired = self._pack_floats([p[3] for p in params])
+        columns = tuple(self._pack_floats(column) for column in zip(*model_params))
+
+        self._update(
+            pos, spd, stp, extra, desired, columns, count, light_green, stop_line,
+            stop_buffer, length,
+        )
+        return self._unpack(vehicles, pos, spd, stp, stop_line)
+
+
+class NumbaFollowingKernel(FollowingKernel, NumbaKernel):
+    """Mismo modelo compilado con Numba sobre arreglos de NumPy."""
+
+    def __init__(self, model, numba, numpy):
+        self.model = model
+        self._np = numpy
+        self._update = numba.njit(cache=True)(_UPDATES[model.name])
+
+
+def load_following(spec, kernel: str = "array"):
+    """Devuelve el backend del modelo pedido, o ``None`` para la regla propia.
+
+    ``spec`` es ``None``, el nombre de un modelo (``"idm"``, ``"gipps"``) o
+    una instancia de ``IDM`` / ``Gipps``. Con ``kernel="numba"`` se compila
+    si ``numba`` está disponible; si no, se usa Python puro.
+    """
+    if spec is None:
+        return None
+    if isinstance(spec, str):
+        if spec not in MODELS:
+            raise ValueError(
+                f"Modelo de seguimiento desconocido: {spec!r} (opciones: {tuple(MODELS)})"
+            )
+        spec = MODELS[spec]()
+    elif not isinstance(spec, tuple(MODELS.values())):
+        raise TypeError(f"Modelo de seguimiento no válido: {spec!r}")
+
+    if kernel == "numba":
+        try:
+            import numba
+            import numpy
+        except ImportError:
+            pass
+        else:
+            return NumbaFollowingKernel(spec, numba, numpy)
+    return FollowingKernel(spec)
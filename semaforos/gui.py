@@ -1,3 +1,5 @@
+from functools import cached_property
+import os
 import pygame
 import sys
 import math
@@ -28,17 +30,26 @@ TRAFFIC_HIGH = (200, 100, 100)
 
 
 class GUI:
-    def __init__(self, sim: Simulation, width: int = 1200, height: int = 800):
+    def __init__(
+        self,
+        sim: Simulation,
+        width: int = 1200,
+        height: int = 800,
+        headless: bool = False,  # dibuja en una superficie fuera de pantalla, sin ventana
+    ):
+        if headless:
+            os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
         pygame.init()
         self.sim = sim
         self.width = width
         self.height = height
-        self.screen = pygame.display.set_mode((width, height))
-        pygame.display.set_caption("Semáforos Auto-organizantes")
+        self.headless = headless
+        if headless:
+            self.screen = pygame.Surface((width, height))
+        else:
+            self.screen = pygame.display.set_mode((width, height))
+            pygame.display.set_caption("Semáforos Auto-organizantes")
         self.clock = pygame.time.Clock()
-        self.font = pygame.font.SysFont("Arial", 16, bold=True)
-        self.small_font = pygame.font.SysFont("Arial", 12)
-        self.tiny_font = pygame.font.SysFont("Arial", 10)
 
         # Coordenadas del cruce
         self.center_x = width // 2
@@ -63,6 +74,25 @@ class GUI:
         self.show_stats = True
         self.show_debug = False
         self.show_traffic_patterns = True
+        self.show_controls = True
+
+    # Las fuentes (SysFont recorre las fuentes del sistema) y la capa de zonas
+    # se crean la primera vez que se usan.
+    @cached_property
+    def font(self):
+        return pygame.font.SysFont("Arial", 16, bold=True)
+
+    @cached_property
+    def small_font(self):
+        return pygame.font.SysFont("Arial", 12)
+
+    @cached_property
+    def tiny_font(self):
+        return pygame.font.SysFont("Arial", 10)
+
+    @cached_property
+    def _zone_surface(self):
+        return pygame.Surface((self.width, self.height), pygame.SRCALPHA)
 
     def _map_position_A_to_pixel(self, position: float, lane: Lane) -> int:
         """Mapea posición del carril A a coordenada X."""
@@ -193,7 +223,8 @@ class GUI:
         inter = self.sim.intersection
         d, r, e = inter.d, inter.r, inter.e
 
-        surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        surf = self._zone_surface
+        surf.fill((0, 0, 0, 0))
 
         def dist_to_pixels_h(dist):
             return int((dist / inter.lane_A.lane_length) * (self.stop_line_A_x - 50))
@@ -343,27 +374,32 @@ class GUI:
         self._draw_lane_A_vehicles()
         self._draw_lane_B_vehicles()
 
+    def _lane_offsets(self, approach):
+        """Carriles de una aproximación y su desplazamiento en píxeles."""
+        lanes = getattr(approach, "lanes", [approach])
+        step = self.lane_width // len(lanes)
+        first = -step * (len(lanes) - 1) // 2
+        return [(lane, first + k * step) for k, lane in enumerate(lanes)]
+
     def _draw_lane_A_vehicles(self):
         lane_a = self.sim.intersection.lane_A
-        if not lane_a.vehicles:
-            return
 
-        y_position = self.center_y - self.lane_width // 2
+        for lane, offset in self._lane_offsets(lane_a):
+            y_position = self.center_y - self.lane_width // 2 + offset
 
-        for vehicle in lane_a.vehicles:
-            x = self._map_position_A_to_pixel(vehicle.position, lane_a)
-            self._draw_vehicle_enhanced(vehicle, x, y_position, True)
+            for vehicle in lane.vehicles:
+                x = self._map_position_A_to_pixel(vehicle.position, lane)
+                self._draw_vehicle_enhanced(vehicle, x, y_position, True)
 
     def _draw_lane_B_vehicles(self):
         lane_b = self.sim.intersection.lane_B
-        if not lane_b.vehicles:
-            return
 
-        x_position = self.center_x + self.lane_width // 2
+        for lane, offset in self._lane_offsets(lane_b):
+            x_position = self.center_x + self.lane_width // 2 + offset
 
-        for vehicle in lane_b.vehicles:
-            y = self._map_position_B_to_pixel(vehicle.position, lane_b)
-            self._draw_vehicle_enhanced(vehicle, x_position, y, False)
+            for vehicle in lane.vehicles:
+                y = self._map_position_B_to_pixel(vehicle.position, lane)
+                self._draw_vehicle_enhanced(vehicle, x_position, y, False)
 
     def _draw_vehicle_enhanced(self, vehicle, x, y, is_horizontal):
         # Color según estado y carril
@@ -527,7 +563,8 @@ class GUI:
             y += 24
 
         # Panel de controles
-        self._draw_controls()
+        if self.show_controls:
+            self._draw_controls()
 
         # Paneles adicionales
         if self.show_stats:
@@ -647,7 +684,20 @@ class GUI:
                 panel_x + 10, y + 20, 280, 60, stats["throughput_history"]
             )
 
-    def _draw_throughput_graph(self, x, y, width, height, data):
+        # Tendencia de toda la corrida (serie submuestreada de tamaño fijo)
+        if len(stats.get("throughput_trend", ())) > 1:
+            self._draw_throughput_graph(
+                panel_x + 10,
+                y + 110,
+                280,
+                60,
+                stats["throughput_trend"],
+                "Rendimiento (toda la corrida)",
+            )
+
+    def _draw_throughput_graph(
+        self, x, y, width, height, data, title="Rendimiento (últimos 10 períodos)"
+    ):
         if len(data) < 2:
             return
 
@@ -657,7 +707,7 @@ class GUI:
         pygame.draw.rect(self.screen, BLACK, graph_rect, 1)
 
         # Título
-        title = self.small_font.render("Rendimiento (últimos 10 períodos)", True, BLACK)
+        title = self.small_font.render(title, True, BLACK)
         self.screen.blit(title, (x, y - 20))
 
         # Escalar datos
@@ -779,8 +829,8 @@ class GUI:
             text_surf = self.small_font.render(text, True, BLACK)
             self.screen.blit(text_surf, (legend_x + 30, item_y))
 
-    def draw(self):
-        """Renderiza toda la escena."""
+    def render(self):
+        """Dibuja toda la escena en ``self.screen`` sin presentarla."""
         self.screen.fill(WHITE)
         self._draw_road_infrastructure()
         self._draw_zones()
@@ -792,8 +842,20 @@ class GUI:
         if self.show_zones:
             self._draw_legend()
 
+    def draw(self):
+        """Renderiza toda la escena."""
+        self.render()
         pygame.display.flip()
 
+    def _all_lanes(self):
+        """Todos los carriles individuales de ambas aproximaciones."""
+        inter = self.sim.intersection
+        return [
+            lane
+            for approach in (inter.lane_A, inter.lane_B)
+            for lane in getattr(approach, "lanes", [approach])
+        ]
+
     def run(self):
         running = True
 
@@ -811,18 +873,17 @@ class GUI:
                     elif event.key == pygame.K_DOWN:
                         self.speedup = max(1, self.speedup - 1)
                     elif event.key == pygame.K_RIGHT:
-                        for lane in [
-                            self.sim.intersection.lane_A,
-                            self.sim.intersection.lane_B,
-                        ]:
+                        for lane in self._all_lanes():
+                            # Los carriles de una repetición no tienen patrón
+                            if not hasattr(lane, "traffic_pattern"):
+                                continue
                             lane.traffic_pattern.peak_multiplier = min(
                                 5.0, lane.traffic_pattern.peak_multiplier + 0.2
                             )
                     elif event.key == pygame.K_LEFT:
-                        for lane in [
-                            self.sim.intersection.lane_A,
-                            self.sim.intersection.lane_B,
-                        ]:
+                        for lane in self._all_lanes():
+                            if not hasattr(lane, "traffic_pattern"):
+                                continue
                             lane.traffic_pattern.peak_multiplier = max(
                                 1.5, lane.traffic_pattern.peak_multiplier - 0.2
                             )
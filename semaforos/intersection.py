@@ -1,18 +1,23 @@
+from typing import Union
+from . import events
+from .events import LightEventLog
 from .lane import Lane
 from .light import TrafficLight
+from .road import Road
 
 
 class Intersection:
     def __init__(
         self,
-        lane_A: Lane,
-        lane_B: Lane,
+        lane_A: Union[Lane, Road],
+        lane_B: Union[Lane, Road],
         d: float = 150.0,  # distancia para detectar vehículos aproximándose
         n: int = 10,  # umbral del contador para cambiar semáforo
         u: int = 15,  # tiempo mínimo en verde
         m: int = 2,  # máximo número de vehículos cerca para no cambiar
         r: float = 50.0,  # distancia corta para vehículos por cruzar
         e: float = 30.0,  # distancia para detectar bloqueos después del cruce
+        use_pce: bool = False,  # contar las zonas d y r en equivalentes de auto
     ):
         self.lane_A = lane_A
         self.lane_B = lane_B
@@ -26,6 +31,7 @@ class Intersection:
         self.m = m
         self.r = r
         self.e = e
+        self.use_pce = use_pce
 
         # Líneas de parada para cada carril
         self.stop_line_A = 0.0
@@ -42,6 +48,11 @@ class Intersection:
         # Estadísticas
         self.total_changes = 0
         self.last_change_reason = ""
+        self.last_change_rule = None
+
+        # Historial de cambios (tick, estado, regla, contadores)
+        self.time = 0
+        self.events = LightEventLog()
 
     def step(self):
         """Ejecuta un paso de la simulación del cruce."""
@@ -58,6 +69,8 @@ class Intersection:
         else:
             self.both_red_timer += 1
 
+        self.time += 1
+
     def _check_cross_blocking(self):
         """Regla 6: Detectar bloqueo cruzado."""
         blocked_A = self.lane_A.has_stopped_beyond_intersection_within(self.e)
@@ -69,15 +82,17 @@ class Intersection:
             self.both_red = True
             self.both_red_timer = 0
             self.last_change_reason = "Regla 6: Bloqueo cruzado detectado"
+            self.last_change_rule = events.RULE_CROSS_BLOCKING
             self.total_changes += 1
+            self._log_change()
 
         elif (
             self.both_red and not (blocked_A and blocked_B) and self.both_red_timer > 5
         ):
             # Salir del estado de emergencia
             self.both_red = False
-            count_A = self.lane_A.count_approaching_within(self.d)
-            count_B = self.lane_B.count_approaching_within(self.d)
+            count_A = self.lane_A.count_approaching_within(self.d, self.use_pce)
+            count_B = self.lane_B.count_approaching_within(self.d, self.use_pce)
 
             if count_A >= count_B:
                 self.light_A.set_green()
@@ -87,13 +102,15 @@ class Intersection:
                 self.light_A.set_red()
 
             self.last_change_reason = "Saliendo del bloqueo cruzado"
+            self.last_change_rule = events.RULE_EXIT_BOTH_RED
             self.total_changes += 1
+            self._log_change()
 
     def _apply_traffic_flow_rules(self):
         """Aplica las reglas de flujo de tráfico correctamente."""
         # Contar vehículos en cada carril
-        count_A = self.lane_A.count_approaching_within(self.d)
-        count_B = self.lane_B.count_approaching_within(self.d)
+        count_A = self.lane_A.count_approaching_within(self.d, self.use_pce)
+        count_B = self.lane_B.count_approaching_within(self.d, self.use_pce)
 
         # REGLA 1: Incrementar contadores para semáforos en rojo
         if self.light_A.state == "red":
@@ -109,7 +126,7 @@ class Intersection:
         elif change_target == "B" and self.light_B.state == "red":
             self._change_to_B()
 
-    def _should_change_light(self, count_A: int, count_B: int):
+    def _should_change_light(self, count_A: float, count_B: float):
         """
         Determina si el semáforo debe cambiar aplicando todas las reglas correctamente.
         """
@@ -120,11 +137,13 @@ class Intersection:
 
         should_change = False
         reason = ""
+        rule = None
 
         # REGLA 5: Vehículo detenido más allá del cruce
         if current_lane.has_stopped_beyond_intersection_within(self.e):
             should_change = True
             reason = f"Regla 5: Vehículo detenido después del cruce en {current_green}"
+            rule = events.RULE_STOPPED_BEYOND
 
         # REGLA 4: No hay vehículos aproximándose a luz verde, pero sí a luz roja
         green_approaching = count_A if current_green == "A" else count_B
@@ -133,12 +152,14 @@ class Intersection:
         if not should_change and green_approaching == 0 and red_approaching > 0:
             should_change = True
             reason = f"Regla 4: Sin tráfico aproximándose a {current_green}, pero {red_approaching} en rojo"
+            rule = events.RULE_NO_APPROACHING
 
         # REGLA 1: El contador excede el umbral
         red_counter = self.counter_B if current_green == "A" else self.counter_A
         if not should_change and red_counter >= self.n:
             should_change = True
             reason = f"Regla 1: Contador excede umbral ({red_counter} >= {self.n})"
+            rule = events.RULE_COUNTER
 
         if not should_change:
             return None
@@ -150,27 +171,42 @@ class Intersection:
             return None
 
         # REGLA 3: Pocos vehículos cerca de cruzar
-        close_vehicles = current_lane.count_within_r_to_cross(self.r)
+        close_vehicles = current_lane.count_within_r_to_cross(self.r, self.use_pce)
         if 0 < close_vehicles <= self.m:
             return None
 
         # Cambiar al otro semáforo
         self.last_change_reason = reason
+        self.last_change_rule = rule
         return "B" if current_green == "A" else "A"
 
     def _change_to_A(self):
         """Cambia para dar verde al carril A."""
         self.light_A.set_green()
         self.light_B.set_red()
-        self.counter_A = 0
         self.total_changes += 1
+        self._log_change()
+        self.counter_A = 0
 
     def _change_to_B(self):
         """Cambia para dar verde al carril B."""
         self.light_B.set_green()
         self.light_A.set_red()
-        self.counter_B = 0
         self.total_changes += 1
+        self._log_change()
+        self.counter_B = 0
+
+    def _log_change(self):
+        """Registra el cambio recién aplicado con los contadores previos al reinicio."""
+        if self.both_red:
+            state = events.STATE_BOTH_RED
+        elif self.light_A.state == "green":
+            state = events.STATE_A_GREEN
+        else:
+            state = events.STATE_B_GREEN
+        self.events.record(
+            self.time, state, self.last_change_rule, int(self.counter_A), int(self.counter_B)
+        )
 
     def get_state(self):
         """Retorna el estado actual del cruce."""
@@ -0,0 +1,159 @@
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+from .lane import Lane
+from .light import TrafficLight
+from .phases import ConflictMatrix, Movement, PhaseController
+
+
+class Junction:
+    """Cruce con movimientos de giro controlado por fases compatibles.
+
+    Cada movimiento (p. ej. "NL", "NT", "NR") tiene su propio carril y su
+    propio semáforo. El controlador elige entre las fases precalculadas de la
+    matriz de conflictos aplicando las reglas auto-organizantes.
+    """
+
+    def __init__(
+        self,
+        lanes: Dict[str, Lane],  # carril por nombre de movimiento, p. ej. {"NT": Lane(...)}
+        movements: Optional[Sequence[Movement]] = None,
+        conflicts: Optional[Iterable[Tuple[str, str]]] = None,
+        d: float = 150.0,  # distancia para detectar vehículos aproximándose
+        n: int = 10,  # umbral del contador para cambiar de fase
+        u: int = 15,  # tiempo mínimo en verde
+        m: int = 2,  # máximo número de vehículos cerca para no cambiar
+        r: float = 50.0,  # distancia corta para vehículos por cruzar
+        e: float = 30.0,  # distancia para detectar bloqueos después del cruce
+        initial_phase: int = 0,
+    ):
+        if movements is None:
+            movements = [Movement(name[0], name[1:]) for name in lanes]
+
+        self.matrix = ConflictMatrix(movements, conflicts)
+        self.lanes = [lanes[name] for name in self.matrix.names]
+        self.lights = [TrafficLight(name=name) for name in self.matrix.names]
+        self.controller = PhaseController(
+            self.matrix, n=n, u=u, m=m, initial_phase=initial_phase
+        )
+
+        # Parámetros del algoritmo
+        self.d = d
+        self.r = r
+        self.e = e
+
+        self.stop_line = 0.0
+        self._apply_lights()
+
+    def step(self):
+        """Ejecuta un paso de decisión de fases."""
+        for light in self.lights:
+            light.step_time()
+
+        approaching = [lane.count_approaching_within(self.d) for lane in self.lanes]
+        close = [lane.count_within_r_to_cross(self.r) for lane in self.lanes]
+
+        blocked_mask = 0
+        for i, lane in enumerate(self.lanes):
+            if self.controller.green_mask >> i & 1:
+                if lane.has_stopped_beyond_intersection_within(self.e):
+                    blocked_mask |= 1 << i
+
+        if self.controller.step(approaching, close, blocked_mask) is not None:
+            self._apply_lights()
+
+    def _apply_lights(self):
+        green_mask = self.controller.green_mask
+        for i, light in enumerate(self.lights):
+            if green_mask >> i & 1:
+                if light.state != "green":
+                    light.set_green()
+            elif light.state != "red":
+                light.set_red()
+
+    def reset(self):
+        self.controller.reset()
+        for light in self.lights:
+            light.set_red()
+        self._apply_lights()
+
+    def get_state(self):
+        """Retorna el estado actual del cruce."""
+        controller = self.controller
+        return {
+            "phase": controller.current_phase,
+            "green_movements": self.matrix.phase_names(controller.current_phase),
+            "green_time": controller.green_time,
+            "counters": dict(zip(self.matrix.names, controller.counters)),
+            "total_changes": controller.total_changes,
+            "last_change_reason": controller.last_change_reason,
+            "vehicles": {
+                name: lane.get_vehicle_count()
+                for name, lane in zip(self.matrix.names, self.lanes)
+            },
+            "waiting": {
+                name: lane.get_waiting_vehicles()
+                for name, lane in zip(self.matrix.names, self.lanes)
+            },
+        }
+
+
+class JunctionSimulation:
+    """Bucle de simulación para un ``Junction`` (equivalente a ``Simulation``)."""
+
+    def __init__(self, junction: Junction, max_steps: int = 1000000):
+        self.junction = junction
+        self.max_steps = max_steps
+        self.time = 0
+        self.next_vehicle_id = 1
+
+        self.total_vehicles_spawned = 0
+        self.total_vehicles_completed = 0
+        self.total_waiting_time = 0
+
+    def step(self):
+        """Ejecuta un paso completo de la simulación."""
+        if self.time >= self.max_steps:
+            return False
+
+        junction = self.junction
+        junction.step()
+
+        for lane, light in zip(junction.lanes, junction.lights):
+            self.total_waiting_time += lane.get_waiting_vehicles()
+
+            before = lane.get_vehicle_count()
+            lane.step_vehicles(
+                light_green=light.state == "green",
+                stop_line=junction.stop_line,
+                stop_buffer=2.0,
+            )
+            self.total_vehicles_completed += max(0, before - lane.get_vehicle_count())
+
+            if lane.spawn(self.next_vehicle_id):
+                self.next_vehicle_id += 1
+                self.total_vehicles_spawned += 1
+
+        self.time += 1
+        return True
+
+    def get_time(self):
+        return self.time
+
+    def get_statistics(self):
+        return {
+            "time": self.time,
+            "total_spawned": self.total_vehicles_spawned,
+            "total_completed": self.total_vehicles_completed,
+            "avg_wait_time": self.total_waiting_time / max(1, self.time),
+            "junction_state": self.junction.get_state(),
+        }
+
+    def reset(self):
+        self.time = 0
+        self.next_vehicle_id = 1
+        self.total_vehicles_spawned = 0
+        self.total_vehicles_completed = 0
+        self.total_waiting_time = 0
+
+        for lane in self.junction.lanes:
+            lane.reset()
+        self.junction.reset()
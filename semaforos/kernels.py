@@ -0,0 +1,228 @@
+"""Backends de cálculo para la actualización de vehículos de un carril.
+
+El camino de referencia es ``Lane._update_single_vehicle`` (objeto a objeto).
+Los backends de este módulo ejecutan la misma aritmética sobre arreglos
+empaquetados (posición, velocidad, detenido) y devuelven el resultado a los
+objetos ``Vehicle`` al final del paso.
+"""
+
+from array import array
+import random
+import warnings
+
+KERNELS = ("python", "array", "numba")
+
+_INF = float("inf")
+
+# Separación mínima con el líder en los modelos que no permiten adelantar
+ORDER_SPACING = 0.01
+
+
+def lane_update(
+    pos, spd, stp, noise, extra, acc, dec, desired, count, light_green, stop_line,
+    stop_buffer, min_gap_units,
+):
+    """Actualiza ``count`` vehículos ordenados por posición descendente.
+
+    ``extra``, ``acc``, ``dec`` y ``desired`` son los parámetros de la clase
+    de cada vehículo (``VehicleClass.resolve``): exceso de largo sobre el
+    vehículo de referencia, aceleración y desaceleración máximas y
+    velocidad deseada.
+
+    Reproduce exactamente ``Lane._update_single_vehicle``: los vehículos se
+    procesan de atrás hacia adelante y cada uno ve a su líder con el estado
+    que tenga en ese momento (ya actualizado si lo adelantó en este paso).
+    """
+    min_new = _INF  # menor posición ya actualizada en este paso
+
+    for i in range(count):
+        p = pos[i]
+
+        # Buscar vehículo adelante (menor posición y a menos de 150)
+        lead = -1
+        lead_dist = _INF
+        if min_new < p:
+            # Algún vehículo ya procesado quedó delante: revisar los anteriores
+            for k in range(i):
+                if pos[k] < p:
+                    dist = p - pos[k]
+                    if dist < lead_dist and dist < 150:
+                        lead_dist = dist
+                        lead = k
+        j = i + 1
+        while j < count and pos[j] >= p:
+            j += 1
+        if j < count:
+            dist = p - pos[j]
+            if dist < lead_dist and dist < 150:
+                lead_dist = dist
+                lead = j
+
+        # Velocidad objetivo
+        desired_speed = desired[i]
+        target_speed = desired_speed * noise[i]
+
+        # Factor 1: Vehículo adelante
+        gap = _INF
+        if lead >= 0:
+            gap = pos[lead] - p - extra[lead]
+            safe_gap = 0.8
+
+            if gap < safe_gap * 1.5:
+                if gap < safe_gap:
+                    target_speed = 0.0
+                else:
+                    gap_factor = (gap - safe_gap) / (safe_gap * 2)
+                    target_speed *= max(0.2, gap_factor)
+
+                if stp[lead] and gap < safe_gap * 1.5:
+                    target_speed = 0.0
+
+        # Factor 2: Semáforo
+        if lead < 0 or gap > min_gap_units * 2:
+            distance_to_stop = p - stop_line
+
+            if not light_green and distance_to_stop > 0:
+                deceleration_zone = 80.0
+
+                if distance_to_stop < deceleration_zone:
+                    if distance_to_stop < stop_buffer + 1.0:
+                        target_speed = 0.0
+                    else:
+                        slow_factor = (
+                            distance_to_stop - stop_buffer
+                        ) / deceleration_zone
+                        target_speed *= max(0.1, slow_factor)
+
+        # Aceleración/desaceleración suave
+        speed = spd[i]
+        speed_change = target_speed - speed
+        max_acceleration = acc[i]
+        max_deceleration = dec[i]
+        if speed_change > max_acceleration:
+            speed += max_acceleration
+        elif speed_change < -max_deceleration:
+            speed -= max_deceleration
+        else:
+            speed = target_speed
+
+        speed = max(0.0, min(desired_speed * 1.2, speed))
+
+        # Mover vehículo
+        new_position = p
+        if speed > 0.01:
+            new_position = p - speed
+        spd[i] = speed
+
+        if speed > 0.01:
+            pos[i] = new_position
+            stp[i] = 0
+        else:
+            stp[i] = 1
+
+        if pos[i] < min_new:
+            min_new = pos[i]
+
+
+class ArrayKernel:
+    """Ejecuta ``lane_update`` sobre ``array.array`` en Python puro."""
+
+    name = "array"
+
+    def __init__(self):
+        self._update = lane_update
+
+    def _pack(self, vehicles):
+        pos = array("d", [v.position for v in vehicles])
+        spd = array("d", [v.speed for v in vehicles])
+        stp = array("b", [v.stopped for v in vehicles])
+        return pos, spd, stp
+
+    def step(
+        self,
+        vehicles,
+        params,
+        light_green,
+        stop_line,
+        stop_buffer,
+        min_gap_units,
+    ):
+        """Actualiza el carril; devuelve ``(largo de la cola, posición de su cola)``.
+
+        ``params`` tiene, por vehículo, la tupla de ``VehicleClass.resolve``.
+        """
+        count = len(vehicles)
+        pos, spd, stp = self._pack(vehicles)
+        extra, acc, dec, desired = (self._pack_floats(column) for column in zip(*params))
+        # Mismo orden de sorteo que el camino Python: uno por vehículo
+        noise = self._pack_floats([random.uniform(0.9, 1.1) for _ in range(count)])
+
+        self._update(
+            pos, spd, stp, noise, extra, acc, dec, desired, count, light_green,
+            stop_line, stop_buffer, min_gap_units,
+        )
+
+        return self._unpack(vehicles, pos, spd, stp, stop_line)
+
+    def _unpack(self, vehicles, pos, spd, stp, stop_line):
+        # Al devolver el estado se mide también la cola detenida antes de la línea
+        queue, tail = 0, 0.0
+        for i, vehicle in enumerate(vehicles):
+            p = float(pos[i])
+            vehicle.position = p
+            vehicle.speed = float(spd[i])
+            vehicle.stopped = stopped = bool(stp[i])
+            if stopped and p > stop_line:
+                queue += 1
+                if p > tail:
+                    tail = p
+        return queue, tail
+
+    def _pack_floats(self, values):
+        return array("d", values)
+
+
+class NumbaKernel(ArrayKernel):
+    """Misma actualización compilada con Numba sobre arreglos de NumPy."""
+
+    name = "numba"
+
+    def __init__(self, numba, numpy):
+        self._np = numpy
+        self._update = numba.njit(cache=True)(lane_update)
+
+    def _pack(self, vehicles):
+        np = self._np
+        count = len(vehicles)
+        pos = np.fromiter((v.position for v in vehicles), np.float64, count)
+        spd = np.fromiter((v.speed for v in vehicles), np.float64, count)
+        stp = np.fromiter((v.stopped for v in vehicles), np.int8, count)
+        return pos, spd, stp
+
+    def _pack_floats(self, values):
+        return self._np.asarray(values, dtype=self._np.float64)
+
+
+def load_kernel(name: str):
+    """Devuelve el backend pedido, o ``None`` para el camino Python puro.
+
+    Si ``numba`` no está disponible se emite un aviso y se usa el camino
+    Python, de modo que la simulación siempre puede ejecutarse.
+    """
+    if name == "python":
+        return None
+    if name == "array":
+        return ArrayKernel()
+    if name == "numba":
+        try:
+            import numba
+            import numpy
+        except ImportError:
+            warnings.warn(
+                "numba no está disponible; se usa el backend 'python'",
+                RuntimeWarning,
+                stacklevel=3,
+            )
+            return None
+        return NumbaKernel(numba, numpy)
+    raise ValueError(f"Backend de cálculo desconocido: {name!r} (opciones: {KERNELS})")
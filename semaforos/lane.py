@@ -1,8 +1,18 @@
 from dataclasses import dataclass, field
-from typing import List, Optional
+from operator import attrgetter
+from typing import TYPE_CHECKING, List, Optional, Sequence, Tuple, Union
 import random
 import math
-from .vehicle import Vehicle
+from .vehicle import CAR, Vehicle, VehicleClass, VehiclePool
+from .demand import DemandModel
+from .following import IDM, Gipps, load_following
+from .kernels import load_kernel
+from .storage import STORAGES, VehicleRing
+
+if TYPE_CHECKING:
+    from .trajectory import LaneRecorder
+
+_by_position = attrgetter("position")
 
 
 @dataclass
@@ -27,8 +37,51 @@ class Lane:
     lane_length: float = 400.0
     min_gap_units: float = 8.0
     vehicle_length: float = 5.0
+    kernel: str = "python"  # backend de actualización: "python", "array" o "numba"
+    storage: str = "list"  # almacenamiento de vehículos: "list" o "ring"
+    demand: Optional[DemandModel] = None  # si se define, reemplaza al patrón de tráfico
+    demand_block: float = 1000.0  # pasos generados por cada llamada al modelo
+    # Mezcla de tipos de vehículo como pares (clase, peso); None = solo autos
+    vehicle_mix: Optional[Sequence[Tuple[VehicleClass, float]]] = None
+    # Modelo de seguimiento: None = regla propia, "idm", "gipps" o una instancia
+    car_following: Optional[Union[str, IDM, Gipps]] = None
+    recorder: Optional["LaneRecorder"] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
+        self._kernel = load_kernel(self.kernel)
+        self._following = load_following(self.car_following, self.kernel)
+        self._pool = VehiclePool()
+        self._reset_demand()
+        self._class_params = {}  # VehicleClass -> parámetros resueltos en este carril
+        self._class_following = {}  # VehicleClass -> parámetros del modelo de seguimiento
+        # Mientras todos sean autos, los parámetros por vehículo son una sola tupla
+        self._mixed = self.vehicle_mix is not None or any(
+            v.vclass is not CAR for v in self.vehicles
+        )
+        if self.vehicle_mix is not None:
+            total = sum(weight for _, weight in self.vehicle_mix)
+            if not self.vehicle_mix or total <= 0:
+                raise ValueError("vehicle_mix necesita al menos una clase con peso positivo")
+            self._mix_total = total
+
+        # Cola detenida antes de la línea, medida en el mismo recorrido del paso
+        self.queue_length = 0
+        self.queue_tail = 0.0  # posición del último vehículo de la cola
+        self._min_moved = float("inf")  # ver ``_find_vehicle_ahead``
+        self.rejected_spawns = 0  # llegadas descartadas por falta de espacio
+
+        if self.storage not in STORAGES:
+            raise ValueError(
+                f"Almacenamiento desconocido: {self.storage!r} (opciones: {STORAGES})"
+            )
+        # En modo "ring" el buffer se mantiene ordenado: se corrige en el lugar
+        # tras cada paso en vez de ordenarlo entero al inicio del siguiente
+        self._ring = self.storage == "ring"
+        if self._ring:
+            self.vehicles = VehicleRing(
+                sorted(self.vehicles, key=_by_position, reverse=True)
+            )
+
         if self.name == "A":
             self.traffic_pattern.phase_offset = random.uniform(
                 0, 50
@@ -54,6 +107,24 @@ class Lane:
 
     def _calculate_current_spawn_rate(self) -> float:
         """Calcula la tasa de spawn actual basada en patrones de tráfico dinámicos."""
+        if self.demand is not None:
+            return self.demand.rate(self.traffic_pattern.current_time)
+
+        # Añadir ruido aleatorio
+        noise = random.uniform(0.8, 1.2)
+        return self.traffic_pattern.base_rate * (self._pattern_multiplier() * noise)
+
+    def expected_spawn_rate(self) -> float:
+        """Tasa de spawn actual sin el ruido (su media); no consume números aleatorios.
+
+        Es la que se reporta en estadísticas y telemetría, así que observar la
+        simulación no altera la corrida.
+        """
+        if self.demand is not None:
+            return self.demand.rate(self.traffic_pattern.current_time)
+        return self.traffic_pattern.base_rate * self._pattern_multiplier()
+
+    def _pattern_multiplier(self) -> float:
         pattern = self.traffic_pattern
         adjusted_time = (
             pattern.current_time + pattern.phase_offset
@@ -70,34 +141,219 @@ class Lane:
             (pattern.cycle_length * 0.7) < adjusted_time < (pattern.cycle_length * 0.9)
         )
 
-        # Añadir ruido aleatorio
-        noise = random.uniform(0.8, 1.2)
-
         if peak_1 or peak_2:
-            multiplier = pattern.peak_multiplier * noise
-        elif low_period:
-            multiplier = pattern.low_multiplier * noise
-        else:
-            multiplier = 1.0 * noise
-
-        return pattern.base_rate * multiplier
+            return pattern.peak_multiplier
+        if low_period:
+            return pattern.low_multiplier
+        return 1.0
 
     def step_vehicles(
         self, light_green: bool, stop_line: float = 0.0, stop_buffer: float = 0.5
     ):
+        self._move_vehicles(light_green, stop_line, stop_buffer)
+        if self.recorder is not None:
+            # Trayectorias (ver ``trajectory.TrajectoryStore``)
+            self.recorder.record(self.traffic_pattern.current_time, self.vehicles)
+
+    def _move_vehicles(self, light_green: bool, stop_line: float, stop_buffer: float):
         self.traffic_pattern.current_time += 1
+        self.queue_length = 0
+        self.queue_tail = 0.0
 
         if not self.vehicles:
             return
 
-        self.vehicles.sort(key=lambda v: v.position, reverse=True)
+        if not self._ring:
+            self.vehicles.sort(key=_by_position, reverse=True)
+
+        if self._following is not None:
+            # Modelo de seguimiento por lotes (ver ``following``)
+            self.queue_length, self.queue_tail = self._following.step(
+                self.vehicles,
+                self._vehicle_params(),
+                self._vehicle_following(),
+                light_green,
+                stop_line,
+                stop_buffer,
+                self.vehicle_length,
+            )
+        elif self._kernel is not None:
+            # Actualizar todo el carril sobre arreglos empaquetados
+            self.queue_length, self.queue_tail = self._kernel.step(
+                self.vehicles,
+                self._vehicle_params(),
+                light_green,
+                stop_line,
+                stop_buffer,
+                self.min_gap_units,
+            )
+        else:
+            # Procesar cada vehículo individualmente
+            queue, tail = 0, 0.0
+            self._min_moved = float("inf")  # menor posición ya actualizada en el paso
+            for i, vehicle in enumerate(self.vehicles):
+                self._update_single_vehicle(
+                    vehicle, i, light_green, stop_line, stop_buffer
+                )
+                if vehicle.position < self._min_moved:
+                    self._min_moved = vehicle.position
+                if vehicle.stopped and vehicle.position > stop_line:
+                    queue += 1
+                    if vehicle.position > tail:
+                        tail = vehicle.position
+            self.queue_length, self.queue_tail = queue, tail
+
+        vehicles = self.vehicles
+        exit_position = -self.lane_length
+
+        if self._ring:
+            # Reubicar a los que adelantaron: mismo orden que el sort estable
+            # del modo lista, así que el almacenamiento no cambia la dinámica
+            vehicles.reorder(_by_position)
+            # Los que salen están siempre al frente del buffer
+            while vehicles and vehicles[-1].position <= exit_position:
+                self._pool.release(vehicles.pop())
+            return
 
-        # Procesar cada vehículo individualmente
-        for i, vehicle in enumerate(self.vehicles):
-            self._update_single_vehicle(vehicle, i, light_green, stop_line, stop_buffer)
+        # Limpiar vehículos que salieron completamente del sistema,
+        # compactando la lista en el lugar y reciclando los que salen
+        kept = 0
+        for vehicle in vehicles:
+            if vehicle.position > exit_position:
+                vehicles[kept] = vehicle
+                kept += 1
+            else:
+                self._pool.release(vehicle)
+        del vehicles[kept:]
+
+    def reset(self):
+        """Vacía el carril (reciclando sus vehículos) y reinicia el reloj del patrón."""
+        for vehicle in self.vehicles:
+            self._pool.release(vehicle)
+        self.vehicles.clear()
+        self.traffic_pattern.current_time = 0.0
+        self._reset_demand()
+        self.queue_length = 0
+        self.queue_tail = 0.0
+        self.rejected_spawns = 0
+        self._class_params.clear()
+        self._class_following.clear()
+
+    def _params(self, vclass: VehicleClass):
+        """Parámetros de ``vclass`` en este carril (ver ``VehicleClass.resolve``)."""
+        params = self._class_params.get(vclass)
+        if params is None:
+            params = self._class_params[vclass] = vclass.resolve(
+                self.vehicle_length, self.max_speed
+            )
+        return params
+
+    def _vehicle_params(self) -> list:
+        vehicles = self.vehicles
+        if not self._mixed:
+            return [self._params(CAR)] * len(vehicles)
+        return [self._params(v.vclass) for v in vehicles]
+
+    def _following_params(self, vclass: VehicleClass):
+        """Parámetros del modelo de seguimiento de ``vclass``, en unidades por paso."""
+        params = self._class_following.get(vclass)
+        if params is None:
+            model = vclass.following_model(self._following.model)
+            params = self._class_following[vclass] = model.resolve()
+        return params
+
+    def _vehicle_following(self) -> list:
+        vehicles = self.vehicles
+        if not self._mixed:
+            return [self._following_params(CAR)] * len(vehicles)
+        return [self._following_params(v.vclass) for v in vehicles]
+
+    def _draw_class(self) -> VehicleClass:
+        if self.vehicle_mix is None:
+            return CAR
+        x = random.random() * self._mix_total
+        for vclass, weight in self.vehicle_mix:
+            x -= weight
+            if x < 0:
+                return vclass
+        return self.vehicle_mix[-1][0]
+
+    def _reset_demand(self):
+        self._arrivals = []
+        self._arrival_index = 0
+        self._demand_horizon = 0.0
+        if self.demand is not None:
+            self.demand.reset()
+
+    def _take_arrival(self) -> bool:
+        """Consume una llegada pendiente del modelo de demanda, si ya ocurrió.
+
+        Las llegadas se generan por bloques de ``demand_block`` pasos; si en un
+        paso ocurren varias, las restantes quedan para los pasos siguientes.
+        """
+        now = self.traffic_pattern.current_time
+        while self._arrival_index >= len(self._arrivals):
+            if self._demand_horizon > now:
+                return False
+            start = self._demand_horizon
+            self._demand_horizon += self.demand_block
+            self._arrivals = self.demand.arrivals(start, self._demand_horizon)
+            self._arrival_index = 0
+
+        if self._arrivals[self._arrival_index] > now:
+            return False
+        self._arrival_index += 1
+        return True
+
+    def remove_vehicle(self, vehicle: Vehicle):
+        """Quita un vehículo del carril sin reciclarlo (p. ej. al cambiar de carril)."""
+        vehicles = self.vehicles
+        for i in range(len(vehicles)):
+            if vehicles[i] is vehicle:
+                del vehicles[i]
+                return
+        raise ValueError(f"El vehículo {vehicle.id} no está en el carril {self.name}")
+
+    def insert_vehicle(self, vehicle: Vehicle):
+        """Agrega un vehículo existente al carril respetando el orden del almacenamiento."""
+        if vehicle.vclass is not CAR:
+            self._mixed = True
+        if not self._ring:
+            # La lista se reordena al inicio de cada paso
+            self.vehicles.append(vehicle)
+            return
 
-        # Limpiar vehículos que salieron completamente del sistema
-        self.vehicles = [v for v in self.vehicles if v.position > -self.lane_length]
+        # Búsqueda binaria del primer vehículo más adelantado (posición menor)
+        vehicles = self.vehicles
+        lo, hi = 0, len(vehicles)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if vehicles[mid].position >= vehicle.position:
+                lo = mid + 1
+            else:
+                hi = mid
+        vehicles.insert(lo, vehicle)
+
+    def transfer_vehicles(self, leaving, arriving: Sequence[Vehicle]):
+        """Aplica en bloque los cambios de carril de un paso.
+
+        ``leaving`` tiene los ``id()`` de los vehículos que salen y
+        ``arriving`` los que entran, en el orden en que se decidieron. El
+        carril se reconstruye una sola vez; el resultado es el mismo que
+        con ``remove_vehicle`` e ``insert_vehicle`` uno por uno.
+        """
+        kept = [v for v in self.vehicles if id(v) not in leaving]
+        if any(v.vclass is not CAR for v in arriving):
+            self._mixed = True
+        if not self._ring:
+            # La lista se reordena al inicio de cada paso
+            self.vehicles[:] = kept + list(arriving)
+            return
+        # Orden estable: ante posiciones iguales, los recién llegados quedan
+        # detrás de los que ya estaban (como en ``insert_vehicle``)
+        kept.extend(arriving)
+        kept.sort(key=_by_position, reverse=True)
+        self.vehicles.replace(kept)
 
     def _update_single_vehicle(
         self, vehicle, index, light_green, stop_line, stop_buffer
@@ -107,10 +363,9 @@ class Lane:
             vehicle, index, light_green, stop_line, stop_buffer
         )
 
-        # 2. Aplicar aceleración/desaceleración suave
+        # 2. Aplicar aceleración/desaceleración suave (según la clase)
+        _, max_acceleration, max_deceleration, desired_speed = self._params(vehicle.vclass)
         speed_change = target_speed - vehicle.speed
-        max_acceleration = 0.4  # Aceleración máxima por step
-        max_deceleration = 0.6  # Desaceleración máxima por step
 
         if speed_change > max_acceleration:
             vehicle.speed += max_acceleration
@@ -120,7 +375,7 @@ class Lane:
             vehicle.speed = target_speed
 
         # 3. Limitar velocidad dentro de rangos realistas
-        vehicle.speed = max(0.0, min(self.max_speed * 1.2, vehicle.speed))
+        vehicle.speed = max(0.0, min(desired_speed * 1.2, vehicle.speed))
 
         # 4. Mover vehículo
         if vehicle.speed > 0.01:
@@ -134,13 +389,17 @@ class Lane:
         self, vehicle, index, light_green, stop_line, stop_buffer
     ):
         # Velocidad base con variación individual
-        base_speed = self.max_speed * random.uniform(0.9, 1.1)
+        base_speed = self._params(vehicle.vclass)[3] * random.uniform(0.9, 1.1)
         target_speed = base_speed
 
-        # Factor 1: Vehículo adelante
-        front_vehicle = self._find_vehicle_ahead(vehicle)
+        # Factor 1: Vehículo adelante (descontando el exceso de largo del líder)
+        front_vehicle = self._find_vehicle_ahead(vehicle, index)
         if front_vehicle:
-            gap = front_vehicle.position - vehicle.position
+            gap = (
+                front_vehicle.position
+                - vehicle.position
+                - self._params(front_vehicle.vclass)[0]
+            )
             safe_gap = 0.8
 
             if gap < safe_gap * 1.5:  # Comenzar a reducir velocidad antes
@@ -156,10 +415,7 @@ class Lane:
                     target_speed = 0.0
 
         # Factor 2: Semáforo (solo afecta si no hay vehículo adelante muy cerca)
-        if (
-            not front_vehicle
-            or (front_vehicle.position - vehicle.position) > self.min_gap_units * 2
-        ):
+        if not front_vehicle or gap > self.min_gap_units * 2:
             distance_to_stop = vehicle.position - stop_line
 
             if not light_green and distance_to_stop > 0:
@@ -178,7 +434,23 @@ class Lane:
 
         return target_speed
 
-    def _find_vehicle_ahead(self, current_vehicle):
+    def _find_vehicle_ahead(self, current_vehicle, index=None):
+        if (
+            self._ring
+            and index is not None
+            and self._min_moved >= current_vehicle.position
+        ):
+            # Buffer ordenado y nadie lo adelantó en este paso: el líder es
+            # el siguiente con menor posición
+            vehicles = self.vehicles
+            for j in range(index + 1, len(vehicles)):
+                other_vehicle = vehicles[j]
+                if other_vehicle.position < current_vehicle.position:
+                    if current_vehicle.position - other_vehicle.position < 150:
+                        return other_vehicle
+                    return None
+            return None
+
         closest_vehicle = None
         min_distance = float("inf")
 
@@ -198,36 +470,61 @@ class Lane:
         return closest_vehicle
 
     def spawn(self, next_vehicle_id: int) -> Optional[Vehicle]:
-        current_rate = self._calculate_current_spawn_rate()
+        if self.demand is not None:
+            if not self._take_arrival():
+                return None
+        else:
+            current_rate = self._calculate_current_spawn_rate()
 
-        if random.random() > current_rate:
-            return None
+            if random.random() > current_rate:
+                return None
 
-        # Verificar espacio disponible
+        # Verificar espacio disponible (los vehículos largos ocupan más)
         spawn_position = self.lane_length
         min_spawn_gap = 0.5
-
-        # Solo verificar vehículos muy cerca del punto de spawn
-        for v in self.vehicles:
-            if v.position > spawn_position - min_spawn_gap:
-                return None  # No hay espacio suficiente
+        if self._following is not None:
+            # Con un modelo de seguimiento el hueco se mide desde la cola del líder
+            min_spawn_gap += self.vehicle_length
+
+        if self._ring and not self._mixed:
+            # Solo autos: basta mirar el más atrasado, al inicio del buffer
+            if self.vehicles:
+                last = self.vehicles[0]
+                if last.position > spawn_position - min_spawn_gap - self._params(last.vclass)[0]:
+                    self.rejected_spawns += 1
+                    return None
+        else:
+            # Solo verificar vehículos muy cerca del punto de spawn
+            for v in self.vehicles:
+                if v.position > spawn_position - min_spawn_gap - self._params(v.vclass)[0]:
+                    self.rejected_spawns += 1
+                    return None  # No hay espacio suficiente
 
         # Crear vehículo
+        vclass = self._draw_class()
         speed_variation = random.uniform(0.8, 1.3)
-        actual_speed = self.max_speed * speed_variation
+        actual_speed = self._params(vclass)[3] * speed_variation
 
-        vehicle = Vehicle(
-            id=next_vehicle_id, position=spawn_position, speed=actual_speed
-        )
-        self.vehicles.append(vehicle)
+        vehicle = self._pool.acquire(next_vehicle_id, spawn_position, actual_speed, vclass)
+        if self._ring:
+            self.vehicles.appendleft(vehicle)
+        else:
+            self.vehicles.append(vehicle)
         return vehicle
 
-    def count_approaching_within(self, dist: float) -> int:
-        """Cuenta vehículos que se acercan dentro de una distancia específica del stop line."""
+    def count_approaching_within(self, dist: float, pce: bool = False) -> float:
+        """Cuenta vehículos que se acercan dentro de una distancia específica del stop line.
+
+        Con ``pce`` cada vehículo pesa sus equivalentes de auto.
+        """
+        if pce:
+            return sum(v.vclass.pce for v in self.vehicles if 0 < v.position <= dist)
         return sum(1 for v in self.vehicles if 0 < v.position <= dist)
 
-    def count_within_r_to_cross(self, r: float) -> int:
+    def count_within_r_to_cross(self, r: float, pce: bool = False) -> float:
         """Cuenta vehículos cerca de cruzar (dentro de distancia r del stop line)."""
+        if pce:
+            return sum(v.vclass.pce for v in self.vehicles if 0 < v.position <= r)
         return sum(1 for v in self.vehicles if 0 < v.position <= r)
 
     def has_stopped_beyond_intersection_within(self, e: float) -> bool:
@@ -245,11 +542,14 @@ class Lane:
         return sum(1 for v in self.vehicles if v.position > 0 and v.stopped)
 
     def get_traffic_info(self) -> dict:
-        current_rate = self._calculate_current_spawn_rate()
+        current_rate = self.expected_spawn_rate()
 
         # Calcular separaciones promedio entre vehículos
         separations = []
-        sorted_vehicles = sorted(self.vehicles, key=lambda v: v.position, reverse=True)
+        if self._ring:
+            sorted_vehicles = self.vehicles
+        else:
+            sorted_vehicles = sorted(self.vehicles, key=_by_position, reverse=True)
         for i in range(len(sorted_vehicles) - 1):
             sep = sorted_vehicles[i].position - sorted_vehicles[i + 1].position
             separations.append(sep)
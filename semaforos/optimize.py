@@ -0,0 +1,165 @@
+"""Búsqueda de parámetros ``(d, n, u, m, r, e)`` con poda temprana.
+
+Implementa *successive halving* y *Hyperband*: se evalúan muchas
+configuraciones con pocos pasos, se conserva la mejor fracción ``1/eta``
+según ``avg_wait_time`` y solo esas se vuelven a simular con ``eta`` veces
+más pasos. Las corridas son simulaciones sin ventana armadas con
+``scenario.build_simulation`` y se reparten en un pool de procesos. Todas
+las configuraciones usan las mismas semillas (números aleatorios comunes),
+así las diferencias se deben a los parámetros y no al azar de la demanda.
+
+    python -m semaforos.optimize --trials 27 --min-steps 2000 --max-steps 54000
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+import math
+import random
+from typing import Dict, List, Optional, Sequence
+from .scenario import build_simulation
+
+# Rango de búsqueda de cada parámetro: (mínimo, máximo, tipo)
+SPACE = {
+    "d": (60.0, 300.0, float),
+    "n": (5, 60, int),
+    "u": (20, 500, int),
+    "m": (1, 12, int),
+    "r": (20.0, 120.0, float),
+    "e": (10.0, 80.0, float),
+}
+
+
+@dataclass
+class Trial:
+    params: Dict[str, float]
+    scores: Dict[int, float] = field(default_factory=dict)  # pasos -> avg_wait_time
+
+    @property
+    def budget(self) -> int:
+        return max(self.scores, default=0)
+
+    @property
+    def score(self) -> float:
+        return self.scores[self.budget] if self.scores else math.inf
+
+
+def sample_params(rng: random.Random, space=SPACE) -> Dict[str, float]:
+    params = {}
+    for name, (low, high, kind) in space.items():
+        if kind is int:
+            params[name] = rng.randint(low, high)
+        else:
+            params[name] = round(rng.uniform(low, high), 1)
+    return params
+
+
+def evaluate(params: Dict[str, float], steps: int, seeds: Sequence[int], scenario=None) -> float:
+    """Espera media (vehículos detenidos por tick) promediada sobre ``seeds``."""
+    total = 0.0
+    for seed in seeds:
+        sim = build_simulation(seed=seed, max_steps=steps, **(scenario or {}), **params)
+        for _ in range(steps):
+            sim.step()
+        total += sim.total_waiting_time / max(1, sim.time)
+    return total / len(seeds)
+
+
+def _evaluate_job(job):
+    params, steps, seeds, scenario = job
+    return evaluate(params, steps, seeds, scenario)
+
+
+def successive_halving(
+    trials: List[Trial],
+    min_steps: int,
+    max_steps: int,
+    eta: int = 3,
+    seeds: Sequence[int] = (0,),
+    pool: Optional[ProcessPoolExecutor] = None,
+    scenario: Optional[dict] = None,
+    log=None,
+) -> List[Trial]:
+    """Evalúa ``trials`` por rondas y devuelve los sobrevivientes de la última."""
+    steps = min_steps
+    alive = list(trials)
+    while alive:
+        jobs = [(t.params, steps, tuple(seeds), scenario) for t in alive]
+        results = pool.map(_evaluate_job, jobs) if pool else map(_evaluate_job, jobs)
+        for trial, score in zip(alive, results):
+            trial.scores[steps] = score
+        alive.sort(key=lambda t: t.score)
+        if log:
+            log(f"  {len(alive):>3} pruebas con {steps} pasos; mejor espera {alive[0].score:.2f}")
+        if steps >= max_steps or len(alive) == 1:
+            return alive
+        alive = alive[: max(1, len(alive) // eta)]
+        steps = min(max_steps, steps * eta)
+    return alive
+
+
+def hyperband(
+    max_steps: int,
+    min_steps: int,
+    eta: int = 3,
+    rng: Optional[random.Random] = None,
+    **kwargs,
+) -> List[Trial]:
+    """Hyperband: varias rondas de successive halving con distinto compromiso
+    entre cantidad de configuraciones y pasos iniciales."""
+    rng = rng or random.Random()
+    s_max = int(math.log(max_steps / min_steps, eta) + 1e-9)
+    trials = []
+    for s in range(s_max, -1, -1):
+        count = int(math.ceil((s_max + 1) / (s + 1) * eta ** s))
+        start = max(min_steps, int(max_steps / eta ** s))
+        bracket = [Trial(sample_params(rng)) for _ in range(count)]
+        if kwargs.get("log"):
+            kwargs["log"](f"Bracket s={s}: {count} configuraciones desde {start} pasos")
+        successive_halving(bracket, start, max_steps, eta, **kwargs)
+        trials.extend(bracket)
+    return trials
+
+
+def best(trials: List[Trial]) -> Trial:
+    """Mejor prueba entre las que llegaron al presupuesto máximo."""
+    top = max(t.budget for t in trials)
+    return min((t for t in trials if t.budget == top), key=lambda t: t.score)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Optimiza los parámetros del cruce")
+    parser.add_argument("--method", choices=("halving", "hyperband"), default="halving")
+    parser.add_argument("--trials", type=int, default=27, help="configuraciones (halving)")
+    parser.add_argument("--min-steps", type=int, default=2000)
+    parser.add_argument("--max-steps", type=int, default=54000)
+    parser.add_argument("--eta", type=int, default=3)
+    parser.add_argument("--seeds", type=int, default=2, help="semillas por evaluación")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0, help="semilla del muestreo")
+    parser.add_argument("--kernel", default="array", help="kernel de los carriles")
+    parser.add_argument("--storage", default="list", help="almacenamiento de los carriles")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    lane = {"kernel": args.kernel, "storage": args.storage}
+    common = dict(
+        eta=args.eta,
+        seeds=range(args.seeds),
+        scenario={"lane_A": lane, "lane_B": lane},
+        log=print,
+    )
+    with ProcessPoolExecutor(args.workers) as pool:
+        if args.method == "halving":
+            trials = [Trial(sample_params(rng)) for _ in range(args.trials)]
+            successive_halving(trials, args.min_steps, args.max_steps, pool=pool, **common)
+        else:
+            trials = hyperband(args.max_steps, args.min_steps, rng=rng, pool=pool, **common)
+
+    winner = best(trials)
+    print(f"Mejor configuración ({winner.budget} pasos): {winner.params}")
+    print(f"Espera media: {winner.score:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Movimientos de giro, matriz de conflictos y control de fases.
+
+Los conflictos entre movimientos se precalculan como máscaras de bits: el
+bit ``j`` de ``masks[i]`` indica que los movimientos ``i`` y ``j`` no pueden
+estar en verde a la vez. Las fases son los conjuntos maximales de
+movimientos compatibles, también como máscaras, de modo que elegir la fase
+en cada paso solo requiere operaciones de bits y sumas de contadores.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+LEGS = ("N", "E", "S", "W")  # en sentido horario
+TURNS = ("L", "T", "R")  # izquierda, recto, derecha (circulación por la derecha)
+
+
+@dataclass(frozen=True)
+class Movement:
+    origin: str  # brazo de entrada: "N", "E", "S" u "W"
+    turn: str  # "L", "T" o "R"
+
+    @property
+    def name(self) -> str:
+        return f"{self.origin}{self.turn}"
+
+    @property
+    def destination(self) -> str:
+        shift = {"L": 1, "T": 2, "R": 3}[self.turn]
+        return LEGS[(LEGS.index(self.origin) + shift) % len(LEGS)]
+
+
+def four_leg_movements() -> List[Movement]:
+    """Los 12 movimientos de un cruce de cuatro brazos."""
+    return [Movement(origin, turn) for origin in LEGS for turn in TURNS]
+
+
+def movements_conflict(a: Movement, b: Movement) -> bool:
+    """Regla estándar de conflictos para circulación por la derecha."""
+    if a.origin == b.origin:
+        return False
+    if a.destination == b.destination:
+        return True  # convergen en la misma salida
+
+    # Los giros a la derecha solo entran en conflicto al converger
+    if a.turn == "R" or b.turn == "R":
+        return False
+
+    opposing = (LEGS.index(b.origin) - LEGS.index(a.origin)) % len(LEGS) == 2
+    if a.turn == b.turn:
+        # Rectos opuestos o izquierdas opuestas no se cruzan
+        return not opposing
+    # Izquierda contra recto: se cruzan siempre
+    return True
+
+
+def _bits(mask: int):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class ConflictMatrix:
+    def __init__(
+        self,
+        movements: Sequence[Movement],
+        conflicts: Optional[Iterable[Tuple[str, str]]] = None,
+    ):
+        """
+        Si ``conflicts`` es None se usa ``movements_conflict``; si no, se
+        interpreta como pares de nombres de movimientos en conflicto.
+        """
+        self.movements = list(movements)
+        self.names = [mv.name for mv in self.movements]
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+        count = len(self.movements)
+        self.masks = [0] * count
+
+        if conflicts is None:
+            for i in range(count):
+                for j in range(i + 1, count):
+                    if movements_conflict(self.movements[i], self.movements[j]):
+                        self._add_conflict(i, j)
+        else:
+            for name_a, name_b in conflicts:
+                self._add_conflict(self.index[name_a], self.index[name_b])
+
+        self.full_mask = (1 << count) - 1
+        self.phases = self._maximal_phases()
+        self.phase_members = [tuple(_bits(phase)) for phase in self.phases]
+
+    def _add_conflict(self, i: int, j: int):
+        self.masks[i] |= 1 << j
+        self.masks[j] |= 1 << i
+
+    def conflicts(self, i: int, j: int) -> bool:
+        return bool(self.masks[i] >> j & 1)
+
+    def compatible(self, mask: int) -> bool:
+        """True si ningún par de movimientos de ``mask`` está en conflicto."""
+        return all(not (self.masks[i] & mask) for i in _bits(mask))
+
+    def _maximal_phases(self) -> List[int]:
+        """Conjuntos maximales de movimientos compatibles (Bron-Kerbosch con pivote)."""
+        compat = [self.full_mask & ~mask & ~(1 << i) for i, mask in enumerate(self.masks)]
+        phases = []
+
+        def expand(chosen, candidates, excluded):
+            if not candidates and not excluded:
+                phases.append(chosen)
+                return
+            pivot = next(_bits(candidates | excluded))
+            for v in _bits(candidates & ~compat[pivot]):
+                bit = 1 << v
+                expand(chosen | bit, candidates & compat[v], excluded & compat[v])
+                candidates &= ~bit
+                excluded |= bit
+
+        expand(0, self.full_mask, 0)
+        return sorted(phases)
+
+    def phase_names(self, phase: int) -> List[str]:
+        return [self.names[i] for i in self.phase_members[phase]]
+
+
+class PhaseController:
+    """Reglas auto-organizantes generalizadas a fases de varios movimientos.
+
+    Regla 1: los movimientos en rojo acumulan un contador con los vehículos
+    que se aproximan; Regla 2: tiempo mínimo en verde; Regla 3: no cortar si
+    quedan pocos vehículos por cruzar; Regla 4: cambiar si el verde no tiene
+    demanda y el rojo sí; Regla 5: cambiar si un movimiento en verde está
+    bloqueado después del cruce.
+    """
+
+    def __init__(
+        self,
+        matrix: ConflictMatrix,
+        n: int = 10,
+        u: int = 15,
+        m: int = 2,
+        initial_phase: int = 0,
+    ):
+        self.matrix = matrix
+        self.n = n
+        self.u = u
+        self.m = m
+
+        self.initial_phase = initial_phase
+        self.reset()
+
+    def reset(self):
+        self.current_phase = self.initial_phase
+        self.green_mask = self.matrix.phases[self.initial_phase]
+        self.green_time = 0
+        self.counters = [0] * len(self.matrix.movements)
+
+        # Estadísticas
+        self.total_changes = 0
+        self.last_change_reason = ""
+
+    def step(
+        self,
+        approaching: Sequence[int],
+        close: Sequence[int],
+        blocked_mask: int = 0,
+    ) -> Optional[int]:
+        """Avanza un paso; devuelve la nueva fase si hay cambio, o None."""
+        self.green_time += 1
+        green_mask = self.green_mask
+        counters = self.counters
+
+        demand_mask = 0
+        for i, count in enumerate(approaching):
+            if count:
+                demand_mask |= 1 << i
+                if not green_mask >> i & 1:
+                    counters[i] += count  # Regla 1
+
+        red_demand = demand_mask & ~green_mask
+        blocked = blocked_mask & green_mask
+        # La Regla 5 cambia aunque nadie espere en rojo (como en ``Intersection``)
+        if not red_demand and not blocked:
+            return None
+
+        reason = ""
+        if blocked:
+            reason = "Regla 5: Movimiento en verde bloqueado después del cruce"
+        elif not demand_mask & green_mask:
+            reason = "Regla 4: Sin tráfico en verde, pero sí en rojo"
+        else:
+            waiting = sum(counters[i] for i in _bits(red_demand))
+            if waiting >= self.n:
+                reason = f"Regla 1: Contador excede umbral ({waiting} >= {self.n})"
+
+        if not reason:
+            return None
+
+        # Regla 2: Tiempo mínimo en verde
+        if self.green_time < self.u:
+            return None
+
+        # Regla 3: Pocos vehículos cerca de cruzar
+        close_green = sum(close[i] for i in _bits(green_mask))
+        if 0 < close_green <= self.m:
+            return None
+
+        best = self._select_phase(red_demand, blocked)
+        if best is None:
+            return None
+
+        self._apply_phase(best)
+        self.last_change_reason = reason
+        return best
+
+    def _select_phase(self, red_demand: int, blocked: int = 0) -> Optional[int]:
+        """Fase que atiende la mayor suma de contadores en rojo.
+
+        Sin demanda en rojo (solo Regla 5) sirve cualquier fase que deje en
+        rojo los movimientos bloqueados.
+        """
+        best, best_score = None, 0
+        for phase, (mask, members) in enumerate(
+            zip(self.matrix.phases, self.matrix.phase_members)
+        ):
+            if phase == self.current_phase:
+                continue
+            if red_demand:
+                if not mask & red_demand:
+                    continue
+            elif mask & blocked:
+                continue
+            score = sum(self.counters[i] for i in members if red_demand >> i & 1)
+            if best is None or score > best_score:
+                best, best_score = phase, score
+        return best
+
+    def _apply_phase(self, phase: int):
+        self.current_phase = phase
+        self.green_mask = self.matrix.phases[phase]
+        self.green_time = 0
+        for i in self.matrix.phase_members[phase]:
+            self.counters[i] = 0
+        self.total_changes += 1
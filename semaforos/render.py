@@ -0,0 +1,190 @@
+"""Exportación offline de grabaciones a imágenes o video, sin ventana.
+
+Los frames de una grabación (``SnapshotRecorder``) se decodifican en orden
+en el proceso principal y se reparten por lotes a un pool de procesos; cada
+proceso dibuja con las rutinas ``_draw_*`` de ``GUI`` sobre una superficie
+fuera de pantalla (driver SDL ``dummy``). El resultado se guarda como una
+secuencia PNG o se envía a ``ffmpeg`` por stdin como video RGB crudo.
+
+    python -m semaforos.render corrida.snap --out frames/ --every 5
+    python -m semaforos.render corrida.snap --video clip.mp4 --start 10000 --end 20000
+"""
+
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import os
+import subprocess
+from typing import Iterable, Iterator, List, Optional
+from .replay import ReplaySimulation, decode_file
+from .snapshot import Frame
+
+_gui = None  # GUI sin ventana de cada proceso del pool
+
+
+def _init_worker(width: int, height: int, show_stats: bool):
+    global _gui
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    from .gui import GUI
+
+    _gui = GUI(ReplaySimulation(), width, height, headless=True)
+    _gui.show_stats = show_stats
+    _gui.show_controls = False
+
+
+def _render(frame: Frame):
+    _gui.sim.load(frame)
+    _gui.render()
+    return _gui.screen
+
+
+def _render_png_batch(batch):
+    import pygame
+
+    for path, frame in batch:
+        pygame.image.save(_render(frame), path)
+    return len(batch)
+
+
+def _render_raw_batch(frames: List[Frame]) -> List[bytes]:
+    import pygame
+
+    return [pygame.image.tostring(_render(frame), "RGB") for frame in frames]
+
+
+def select_frames(
+    frames: Iterable[Frame], start: int = 0, end: Optional[int] = None, every: int = 1
+) -> Iterator[Frame]:
+    """Filtra frames por rango de ticks ``[start, end)`` y conserva uno de cada ``every``."""
+    selected = 0
+    for frame in frames:
+        if frame.tick < start:
+            continue
+        if end is not None and frame.tick >= end:
+            return
+        if selected % every == 0:
+            yield frame
+        selected += 1
+
+
+def _batches(items: Iterable, size: int) -> Iterator[list]:
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _ordered_map(pool, fn, batches: Iterable, window: int) -> Iterator:
+    """Como ``pool.map`` pero con a lo sumo ``window`` lotes en vuelo.
+
+    ``Executor.map`` consume todo el iterable al empezar; aquí los frames se
+    siguen decodificando a medida que los lotes terminan.
+    """
+    pending = deque()
+    for batch in batches:
+        pending.append(pool.submit(fn, batch))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def render_sequence(
+    frames: Iterable[Frame],
+    out_dir: str,
+    width: int = 1200,
+    height: int = 800,
+    workers: Optional[int] = None,
+    batch_size: int = 32,
+    show_stats: bool = True,
+) -> int:
+    """Escribe ``frame_<tick>.png`` en ``out_dir``; devuelve cuántos frames escribió."""
+    os.makedirs(out_dir, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    named = (
+        (os.path.join(out_dir, f"frame_{frame.tick:09d}.png"), frame) for frame in frames
+    )
+    with ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(width, height, show_stats)
+    ) as pool:
+        batches = _batches(named, batch_size)
+        return sum(_ordered_map(pool, _render_png_batch, batches, 2 * workers))
+
+
+def render_video(
+    frames: Iterable[Frame],
+    path: str,
+    fps: float = 30.0,
+    width: int = 1200,
+    height: int = 800,
+    workers: Optional[int] = None,
+    batch_size: int = 32,
+    show_stats: bool = True,
+    ffmpeg: str = "ffmpeg",
+    codec_args: Iterable[str] = ("-c:v", "libx264", "-pix_fmt", "yuv420p"),
+) -> int:
+    """Envía los frames dibujados a ``ffmpeg`` en orden; devuelve cuántos escribió."""
+    command = [
+        ffmpeg, "-y", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+        "-r", str(fps), "-i", "-",
+        *codec_args, path,
+    ]
+    workers = workers or os.cpu_count() or 1
+    written = 0
+    encoder = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        with ProcessPoolExecutor(
+            workers, initializer=_init_worker, initargs=(width, height, show_stats)
+        ) as pool:
+            # Los lotes se entregan en orden aunque terminen desordenados
+            batches = _batches(frames, batch_size)
+            for images in _ordered_map(pool, _render_raw_batch, batches, 2 * workers):
+                for image in images:
+                    encoder.stdin.write(image)
+                written += len(images)
+    finally:
+        encoder.stdin.close()
+        encoder.wait()
+    if encoder.returncode:
+        raise RuntimeError(f"ffmpeg terminó con código {encoder.returncode}")
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta una grabación a PNG o video")
+    parser.add_argument("snapshots", help="archivo grabado con SnapshotRecorder")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--out", help="directorio para la secuencia PNG")
+    target.add_argument("--video", help="archivo de video (requiere ffmpeg)")
+    parser.add_argument("--start", type=int, default=0, help="primer tick a exportar")
+    parser.add_argument("--end", type=int, default=None, help="tick final (excluido)")
+    parser.add_argument("--every", type=int, default=1, help="exportar uno de cada N frames grabados")
+    parser.add_argument("--fps", type=float, default=30.0)
+    parser.add_argument("--width", type=int, default=1200)
+    parser.add_argument("--height", type=int, default=800)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch", type=int, default=32, help="frames por lote de trabajo")
+    parser.add_argument("--no-stats", action="store_true", help="ocultar el panel de estadísticas")
+    args = parser.parse_args(argv)
+
+    frames = select_frames(decode_file(args.snapshots), args.start, args.end, args.every)
+    common = dict(
+        width=args.width,
+        height=args.height,
+        workers=args.workers,
+        batch_size=args.batch,
+        show_stats=not args.no_stats,
+    )
+    if args.out:
+        count = render_sequence(frames, args.out, **common)
+    else:
+        count = render_video(frames, args.video, fps=args.fps, **common)
+    print(f"{count} frames exportados")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import List, Optional
+from .lane import Lane
+from .vehicle import Vehicle
+
+_INF = float("inf")
+
+
+class _LaneIndex:
+    """Posiciones ascendentes de un carril al inicio del paso, con bajas y altas.
+
+    Las bajas se marcan con dos uniones-búsqueda (vecino vivo a izquierda y
+    a derecha, con compresión de caminos), sin mover la lista; las altas del
+    paso van a una lista ordenada aparte.
+    """
+
+    __slots__ = ("positions", "_left", "_right", "_added")
+
+    def __init__(self, vehicles):
+        # Los carriles vienen ordenados por posición descendente (o casi)
+        positions = [v.position for v in reversed(vehicles)]
+        positions.sort()
+        self.positions = positions
+        n = len(positions)
+        self._left = list(range(n + 1))  # ranura i + 1 -> índice i; 0 = ninguno
+        self._right = list(range(n + 1))  # ranura i -> índice i; n = ninguno
+        self._added = []
+
+    @staticmethod
+    def _find(parent, slot: int) -> int:
+        root = slot
+        while parent[root] != root:
+            root = parent[root]
+        while parent[slot] != root:
+            parent[slot], slot = root, parent[slot]
+        return root
+
+    def lead_gap(self, position: float) -> float:
+        """Distancia al vehículo inmediatamente adelante (posición menor)."""
+        ahead = -_INF
+        slot = self._find(self._left, bisect_left(self.positions, position))
+        if slot:
+            ahead = self.positions[slot - 1]
+        i = bisect_left(self._added, position)
+        if i and self._added[i - 1] > ahead:
+            ahead = self._added[i - 1]
+        return position - ahead
+
+    def lag_gap(self, position: float) -> float:
+        """Distancia al vehículo inmediatamente atrás (posición mayor)."""
+        behind = _INF
+        slot = self._find(self._right, bisect_right(self.positions, position))
+        if slot < len(self.positions):
+            behind = self.positions[slot]
+        i = bisect_right(self._added, position)
+        if i < len(self._added) and self._added[i] < behind:
+            behind = self._added[i]
+        return behind - position
+
+    def remove(self, position: float):
+        positions = self.positions
+        i = self._find(self._right, bisect_left(positions, position))
+        if i < len(positions) and positions[i] == position:
+            self._left[i + 1] = i
+            self._right[i] = i + 1
+        else:
+            del self._added[bisect_left(self._added, position)]
+
+    def add(self, position: float):
+        insort(self._added, position)
+
+
+class Road:
+    """Aproximación con varios carriles paralelos controlados por un mismo semáforo.
+
+    Expone la misma interfaz que ``Lane`` (conteos, ``step_vehicles``,
+    ``spawn``...), así que ``Intersection`` y ``Simulation`` la usan sin
+    cambios: los conteos de las reglas (zonas d, r, e) se suman sobre todos
+    los carriles de la aproximación.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        lanes: List[Lane],
+        lane_change_gap: float = 20.0,  # hueco al líder por debajo del cual se busca cambiar
+        min_lead_gap: float = 10.0,  # hueco mínimo aceptado con el nuevo líder
+        min_lag_gap: float = 8.0,  # hueco mínimo aceptado con el nuevo seguidor
+        min_advantage: float = 5.0,  # mejora mínima de hueco para cambiar
+        no_change_zone: float = 20.0,  # sin cambios a menos de esta distancia del stop line
+    ):
+        if not lanes:
+            raise ValueError("Una aproximación necesita al menos un carril")
+
+        self.name = name
+        self.lanes = lanes
+        self.lane_change_gap = lane_change_gap
+        self.min_lead_gap = min_lead_gap
+        self.min_lag_gap = min_lag_gap
+        self.min_advantage = min_advantage
+        self.no_change_zone = no_change_zone
+
+        # Carril por el que empieza a intentarse la próxima llegada
+        self._next_spawn_lane = 0
+
+        # Estadísticas
+        self.total_lane_changes = 0
+
+    @property
+    def vehicles(self) -> List[Vehicle]:
+        """Todos los vehículos de la aproximación (copia, para dibujar o inspeccionar)."""
+        return [v for lane in self.lanes for v in lane.vehicles]
+
+    @property
+    def traffic_pattern(self):
+        return self.lanes[0].traffic_pattern
+
+    @property
+    def lane_length(self) -> float:
+        return self.lanes[0].lane_length
+
+    @property
+    def max_speed(self) -> float:
+        return self.lanes[0].max_speed
+
+    def step_vehicles(
+        self, light_green: bool, stop_line: float = 0.0, stop_buffer: float = 0.5
+    ):
+        for lane in self.lanes:
+            lane.step_vehicles(light_green, stop_line, stop_buffer)
+
+        if len(self.lanes) > 1:
+            self._change_lanes()
+
+    def _change_lanes(self):
+        """Decide cambios de carril por aceptación de huecos.
+
+        Cada carril tiene un índice de posiciones ordenadas (``_LaneIndex``);
+        los vecinos en el carril destino se obtienen por búsqueda binaria, sin
+        recorrer los demás carriles. Las decisiones ven los cambios ya hechos
+        en el paso, pero los carriles se reconstruyen una sola vez al final
+        (``Lane.transfer_vehicles``). Con n vehículos y c cambios en el paso el
+        costo es O(n log n + c²) (las altas del paso se insertan en una lista
+        aparte, que en la práctica es corta).
+        """
+        lanes = self.lanes
+        index = [_LaneIndex(lane.vehicles) for lane in lanes]
+        leaving = [set() for _ in lanes]
+        arriving = [[] for _ in lanes]
+        changed = set()
+
+        for k, lane in enumerate(lanes):
+            for vehicle in list(lane.vehicles):
+                if id(vehicle) in changed or vehicle.position <= self.no_change_zone:
+                    continue
+
+                own_lead = index[k].lead_gap(vehicle.position)
+                if own_lead >= self.lane_change_gap:
+                    continue
+
+                # Elegir el carril vecino con mayor hueco aceptable
+                best_lane = None
+                best_lead = own_lead + self.min_advantage
+                for target in (k - 1, k + 1):
+                    if not 0 <= target < len(lanes):
+                        continue
+                    lead = index[target].lead_gap(vehicle.position)
+                    lag = index[target].lag_gap(vehicle.position)
+                    if (
+                        lead >= self.min_lead_gap
+                        and lag >= self.min_lag_gap
+                        and lead > best_lead
+                    ):
+                        best_lane = target
+                        best_lead = lead
+
+                if best_lane is None:
+                    continue
+
+                index[k].remove(vehicle.position)
+                index[best_lane].add(vehicle.position)
+                leaving[k].add(id(vehicle))
+                arriving[best_lane].append(vehicle)
+                changed.add(id(vehicle))
+                self.total_lane_changes += 1
+
+        if changed:
+            for lane, out, new in zip(lanes, leaving, arriving):
+                if out or new:
+                    lane.transfer_vehicles(out, new)
+
+    def spawn(self, next_vehicle_id: int) -> Optional[Vehicle]:
+        """Genera a lo sumo una llegada por paso, rotando el carril inicial."""
+        count = len(self.lanes)
+        for offset in range(count):
+            lane = self.lanes[(self._next_spawn_lane + offset) % count]
+            vehicle = lane.spawn(next_vehicle_id)
+            if vehicle:
+                self._next_spawn_lane = (self._next_spawn_lane + offset + 1) % count
+                return vehicle
+        return None
+
+    def reset(self):
+        for lane in self.lanes:
+            lane.reset()
+        self._next_spawn_lane = 0
+        self.total_lane_changes = 0
+
+    def count_approaching_within(self, dist: float, pce: bool = False) -> float:
+        """Cuenta vehículos que se acercan dentro de una distancia específica del stop line."""
+        return sum(lane.count_approaching_within(dist, pce) for lane in self.lanes)
+
+    def count_within_r_to_cross(self, r: float, pce: bool = False) -> float:
+        """Cuenta vehículos cerca de cruzar (dentro de distancia r del stop line)."""
+        return sum(lane.count_within_r_to_cross(r, pce) for lane in self.lanes)
+
+    def has_stopped_beyond_intersection_within(self, e: float) -> bool:
+        """Verifica si hay vehículos detenidos justo después del cruce en algún carril."""
+        return any(
+            lane.has_stopped_beyond_intersection_within(e) for lane in self.lanes
+        )
+
+    @property
+    def queue_length(self) -> int:
+        return sum(lane.queue_length for lane in self.lanes)
+
+    @property
+    def queue_tail(self) -> float:
+        return max(lane.queue_tail for lane in self.lanes)
+
+    @property
+    def rejected_spawns(self) -> int:
+        return sum(lane.rejected_spawns for lane in self.lanes)
+
+    def get_vehicle_count(self) -> int:
+        """Retorna el número total de vehículos en la aproximación."""
+        return sum(lane.get_vehicle_count() for lane in self.lanes)
+
+    def get_waiting_vehicles(self) -> int:
+        """Cuenta vehículos detenidos esperando el semáforo."""
+        return sum(lane.get_waiting_vehicles() for lane in self.lanes)
+
+    def get_traffic_info(self) -> dict:
+        infos = [lane.get_traffic_info() for lane in self.lanes]
+        current_rate = sum(info["current_spawn_rate"] for info in infos)
+
+        # Separación promedio ponderada por número de huecos de cada carril
+        gaps = [max(0, info["total_vehicles"] - 1) for info in infos]
+        total_gaps = sum(gaps)
+        avg_separation = (
+            sum(info["avg_separation"] * g for info, g in zip(infos, gaps)) / total_gaps
+            if total_gaps
+            else 0
+        )
+        separations = [info["min_separation"] for info, g in zip(infos, gaps) if g]
+
+        return {
+            "current_spawn_rate": current_rate,
+            "traffic_time": infos[0]["traffic_time"],
+            "approaching_vehicles": sum(i["approaching_vehicles"] for i in infos),
+            "waiting_vehicles": sum(i["waiting_vehicles"] for i in infos),
+            "total_vehicles": sum(i["total_vehicles"] for i in infos),
+            "avg_separation": avg_separation,
+            "min_separation": min(separations) if separations else 0,
+            "stopped_vehicles": sum(i["stopped_vehicles"] for i in infos),
+            "moving_vehicles": sum(i["moving_vehicles"] for i in infos),
+            "spawn_rate_category": self.lanes[0]._get_traffic_category(current_rate),
+            "cycle_progress": infos[0]["cycle_progress"],
+            "lanes": len(self.lanes),
+            "lane_changes": self.total_lane_changes,
+        }
@@ -0,0 +1,159 @@
+"""Estadísticas móviles de costo constante por tick.
+
+Cada horizonte (por defecto 1k, 10k y 100k ticks) guarda ``buckets`` sumas
+parciales en un buffer circular con su total acumulado, así que actualizar
+y consultar una ventana es O(1). Los niveles se alimentan en cascada: el
+más fino recibe los valores de cada tick y, al completar un bucket, lo
+entrega al siguiente nivel; por eso los tamaños de bucket deben ser
+múltiplos entre sí.
+
+Además se mantiene una serie de toda la corrida con a lo sumo
+``history_points`` puntos: cuando se llena, los puntos se combinan de a
+pares y cada punto pasa a cubrir el doble de ticks.
+"""
+
+from array import array
+from typing import Dict, List, Sequence
+
+HORIZONS = (1000, 10000, 100000)
+METRICS = ("completed", "queue", "changes")
+
+
+class _Level:
+    """Buffer circular de sumas por bucket para un horizonte."""
+
+    def __init__(self, bucket_ticks: int, buckets: int):
+        self.bucket_ticks = bucket_ticks
+        self.buckets = buckets
+        self.reset()
+
+    def reset(self):
+        n = len(METRICS)
+        self.ring = [array("d", bytes(8 * self.buckets)) for _ in range(n)]
+        self.totals = [0.0] * n
+        self.partial = [0.0] * n
+        self.partial_ticks = 0
+        self.head = 0
+        self.filled = 0
+
+    def add(self, values: Sequence[float], ticks: int):
+        """Suma ``values`` (que cubren ``ticks``); devuelve el bucket si se completó."""
+        partial = self.partial
+        for k, v in enumerate(values):
+            partial[k] += v
+        self.partial_ticks += ticks
+        if self.partial_ticks < self.bucket_ticks:
+            return None
+
+        head = self.head
+        for k, ring in enumerate(self.ring):
+            self.totals[k] += partial[k] - ring[head]
+            ring[head] = partial[k]
+        self.head = (head + 1) % self.buckets
+        self.filled = min(self.buckets, self.filled + 1)
+
+        done = partial
+        self.partial = [0.0] * len(METRICS)
+        self.partial_ticks = 0
+        return done
+
+    def window(self) -> Dict[str, float]:
+        ticks = self.filled * self.bucket_ticks
+        completed, queue, changes = self.totals
+        if not ticks:
+            return {"ticks": 0, "throughput": 0.0, "queue": 0.0, "wait": 0.0, "change_rate": 0.0}
+        return {
+            "ticks": ticks,
+            "throughput": 100.0 * completed / ticks,  # vehículos por cada 100 ticks
+            "queue": queue / ticks,  # vehículos esperando en promedio
+            "wait": queue / completed if completed else 0.0,  # ticks de espera por vehículo
+            "change_rate": 1000.0 * changes / ticks,  # cambios de luz por cada 1000 ticks
+        }
+
+
+class _History:
+    """Serie de toda la corrida con resolución que se reduce a la mitad al llenarse."""
+
+    def __init__(self, bucket_ticks: int, capacity: int):
+        self.bucket_ticks = bucket_ticks
+        self.capacity = capacity - capacity % 2
+        self.reset()
+
+    def reset(self):
+        self.points = [array("d") for _ in METRICS]
+        self.factor = 1  # buckets del nivel fino por punto
+        self.partial = [0.0] * len(METRICS)
+        self.count = 0
+
+    def add(self, values: Sequence[float]):
+        for k, v in enumerate(values):
+            self.partial[k] += v
+        self.count += 1
+        if self.count < self.factor:
+            return
+        for k, series in enumerate(self.points):
+            series.append(self.partial[k])
+        self.partial = [0.0] * len(METRICS)
+        self.count = 0
+
+        if len(self.points[0]) >= self.capacity:
+            for k, series in enumerate(self.points):
+                self.points[k] = array("d", (series[i] + series[i + 1] for i in range(0, len(series), 2)))
+            self.factor *= 2
+
+    @property
+    def point_ticks(self) -> int:
+        return self.factor * self.bucket_ticks
+
+    def series(self, metric: str) -> List[float]:
+        """Tasa por tick de ``metric`` en cada punto."""
+        ticks = self.point_ticks
+        return [v / ticks for v in self.points[METRICS.index(metric)]]
+
+
+class RollingStats:
+    def __init__(
+        self,
+        horizons: Sequence[int] = HORIZONS,
+        buckets: int = 100,
+        history_points: int = 512,
+    ):
+        horizons = sorted(horizons)
+        sizes = [h // buckets for h in horizons]
+        if any(h % buckets for h in horizons) or any(b % a for a, b in zip(sizes, sizes[1:])):
+            raise ValueError(
+                "Cada horizonte debe ser múltiplo de buckets y del tamaño de bucket anterior"
+            )
+        self.horizons = horizons
+        self.levels = [_Level(size, buckets) for size in sizes]
+        self.history = _History(sizes[0], history_points)
+        self.time = 0
+
+    def reset(self):
+        self.time = 0
+        for level in self.levels:
+            level.reset()
+        self.history.reset()
+
+    def update(self, completed: float, queue: float, changes: float):
+        """Registra un tick: vehículos completados, vehículos esperando y cambios de luz."""
+        self.time += 1
+        values = (completed, queue, changes)
+        ticks = 1
+        for k, level in enumerate(self.levels):
+            done = level.add(values, ticks)
+            if done is None:
+                return
+            if k == 0:
+                self.history.add(done)
+            values, ticks = done, level.bucket_ticks
+
+    def window(self, horizon: int) -> Dict[str, float]:
+        return self.levels[self.horizons.index(horizon)].window()
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {str(h): level.window() for h, level in zip(self.horizons, self.levels)}
+
+    def trend(self, metric: str = "completed") -> List[float]:
+        """Serie submuestreada de toda la corrida (tasa por tick de ``metric``)."""
+        return self.history.series(metric)
@@ -0,0 +1,47 @@
+"""Construcción reproducible del escenario estándar de ``run_sim.py``.
+
+``build_simulation`` arma los dos carriles, el cruce y la simulación a
+partir de parámetros planos, fijando antes la semilla del generador global
+(los carriles y la simulación lo usan), de modo que la misma configuración y
+semilla producen siempre la misma corrida. Lo usan ``run_sim.py``, el
+optimizador y los barridos.
+"""
+
+import random
+from typing import Optional
+from .intersection import Intersection
+from .lane import Lane, TrafficPattern
+from .simulation import Simulation
+
+LANE_A = {"max_speed": 1.8, "lane_length": 600.0, "min_gap_units": 1.8, "vehicle_length": 3.5}
+LANE_B = {"max_speed": 1.7, "lane_length": 600.0, "min_gap_units": 1.8, "vehicle_length": 3.5}
+INTERSECTION = {"d": 180.0, "n": 20, "u": 220, "m": 4, "r": 50.0, "e": 35.0}
+
+
+def _build_lane(name: str, defaults: dict, overrides: Optional[dict]) -> Lane:
+    params = dict(defaults, **(overrides or {}))
+    pattern = params.pop("traffic_pattern", None)
+    if isinstance(pattern, dict):
+        params["traffic_pattern"] = TrafficPattern(**pattern)
+    elif pattern is not None:
+        params["traffic_pattern"] = pattern
+    return Lane(name=name, **params)
+
+
+def build_simulation(
+    seed: Optional[int] = None,
+    lane_A: Optional[dict] = None,  # campos de Lane que reemplazan a LANE_A
+    lane_B: Optional[dict] = None,
+    max_steps: int = 2000000,
+    **params,  # parámetros del cruce: d, n, u, m, r, e
+) -> Simulation:
+    if seed is not None:
+        random.seed(seed)
+    intersection = Intersection(
+        lane_A=_build_lane("A", LANE_A, lane_A),
+        lane_B=_build_lane("B", LANE_B, lane_B),
+        **dict(INTERSECTION, **params),
+    )
+    intersection.light_A.set_green()
+    intersection.light_B.set_red()
+    return Simulation(intersection=intersection, max_steps=max_steps)
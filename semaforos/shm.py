@@ -0,0 +1,389 @@
+"""Canal de estado en memoria compartida entre la simulación y el visor.
+
+``SharedStateWriter`` publica el estado en un bloque de
+``multiprocessing.shared_memory`` con formato fijo, sin serializar: dos
+ranuras (doble buffer) con semáforos, contadores, parámetros del cruce y,
+por aproximación, arreglos empaquetados de id, posición, velocidad y
+bandera de detenido (hasta ``capacity`` vehículos; si hay más se publican
+los más cercanos a la línea de parada).
+
+Protocolo: el escritor siempre escribe en la ranura que no se publicó por
+última vez; incrementa su secuencia (impar = escribiendo), copia los datos,
+la vuelve a incrementar (par) y recién entonces la marca como la última.
+El lector toma la última ranura, lee la secuencia, lee los datos y
+comprueba que la secuencia no cambió (seqlock); si cambió, reintenta. El
+escritor nunca espera al lector.
+
+``SharedStateReader.frames()`` produce ``snapshot.Frame`` para
+``ReplaySimulation``, así que la ``GUI`` puede dibujar una simulación que
+corre en otro proceso (``python -m semaforos.shm``). Ese camino copia cada
+frame leído (listas de Python y luego objetos ``Vehicle``); la lectura sin
+copia es ``SharedStateReader.lane_views``.
+"""
+
+import argparse
+from array import array
+import heapq
+from operator import attrgetter
+from multiprocessing import shared_memory
+import struct
+import time
+from typing import Iterator, Optional
+from .snapshot import BOTH_RED, KEYFRAME, LIGHT_A_GREEN, LIGHT_B_GREEN, Frame
+
+_MAGIC = b"SHM1"
+# magic, capacidad por carril, ranura publicada, frames publicados, cerrado
+_HEADER = struct.Struct("<4sIIQB")
+# secuencia, tick, luces, 7 contadores, d, r, e, n, u, m
+_SLOT = struct.Struct("<QqB7qdddqqq")
+# largo, velocidad máxima, cantidad de vehículos
+_LANE = struct.Struct("<ddI")
+_SEQUENCE = struct.Struct("<Q")
+
+COUNTERS = (
+    "total_spawned",
+    "total_completed",
+    "light_A_gtime",
+    "light_B_gtime",
+    "counter_A",
+    "counter_B",
+    "total_changes",
+)
+CONFIG = ("d", "r", "e", "n", "u", "m")
+LANES = 2
+
+_by_position = attrgetter("position")
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+def _lane_size(capacity: int) -> int:
+    # ids (int64), posiciones y velocidades (float32), detenidos (uint8)
+    return _align(_LANE.size) + capacity * 8 + _align(capacity * 4) * 2 + _align(capacity)
+
+
+def _slot_size(capacity: int) -> int:
+    return _align(_SLOT.size) + LANES * _lane_size(capacity)
+
+
+def _layout_size(capacity: int) -> int:
+    return _align(_HEADER.size) + 2 * _slot_size(capacity)
+
+
+class _Layout:
+    """Vistas tipadas (memoryview) sobre el bloque compartido."""
+
+    def __init__(self, buf: memoryview, capacity: int):
+        self.buf = buf
+        self.capacity = capacity
+        self.slot_offsets = [
+            _align(_HEADER.size) + k * _slot_size(capacity) for k in range(2)
+        ]
+        self.lanes = [
+            [self._lane_views(base + _align(_SLOT.size) + i * _lane_size(capacity)) for i in range(LANES)]
+            for base in self.slot_offsets
+        ]
+
+    def _lane_views(self, offset: int):
+        cap = self.capacity
+        ids = offset + _align(_LANE.size)
+        positions = ids + cap * 8
+        speeds = positions + _align(cap * 4)
+        stopped = speeds + _align(cap * 4)
+        buf = self.buf
+        return (
+            offset,
+            buf[ids : ids + cap * 8].cast("q"),
+            buf[positions : positions + cap * 4].cast("f"),
+            buf[speeds : speeds + cap * 4].cast("f"),
+            buf[stopped : stopped + cap].cast("B"),
+        )
+
+    def sequence(self, slot: int) -> int:
+        return _SEQUENCE.unpack_from(self.buf, self.slot_offsets[slot])[0]
+
+    def set_sequence(self, slot: int, value: int):
+        _SEQUENCE.pack_into(self.buf, self.slot_offsets[slot], value)
+
+    def release(self):
+        for slot in self.lanes:
+            for views in slot:
+                for view in views[1:]:
+                    view.release()
+        self.lanes = []
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Abre un bloque existente sin que el proceso lector lo libere al salir."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13
+        from multiprocessing import resource_tracker
+
+        shm = shared_memory.SharedMemory(name=name)
+        resource_tracker.unregister(getattr(shm, "_name", name), "shared_memory")
+        return shm
+
+
+class SharedStateWriter:
+    """Observador de ``Simulation`` que publica cada ``every`` ticks."""
+
+    def __init__(self, sim, name: Optional[str] = None, capacity: int = 1024, every: int = 1):
+        self.sim = sim
+        self.capacity = capacity
+        self.every = every
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=_layout_size(capacity))
+        self.layout = _Layout(self.shm.buf, capacity)
+        self.published = 0
+        self._slot = 1  # la primera escritura va a la ranura 0
+        _HEADER.pack_into(self.shm.buf, 0, _MAGIC, capacity, 0, 0, 0)
+        self.layout.set_sequence(0, 0)
+        self.layout.set_sequence(1, 0)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def start(self):
+        self.sim.add_observer(self._on_step)
+        return self
+
+    def stop(self):
+        self.sim.remove_observer(self._on_step)
+
+    def close(self, unlink: bool = True):
+        """Marca el canal como cerrado para los lectores y libera el bloque."""
+        _HEADER.pack_into(
+            self.shm.buf, 0, _MAGIC, self.capacity, self._slot, self.published, 1
+        )
+        self.layout.release()
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+    def _on_step(self, sim):
+        if sim.time % self.every == 0:
+            self.publish(sim)
+
+    def publish(self, sim):
+        slot = 1 - self._slot
+        layout = self.layout
+        buf = self.shm.buf
+        base = layout.slot_offsets[slot]
+        sequence = layout.sequence(slot) + 1
+        layout.set_sequence(slot, sequence)  # impar: escribiendo
+
+        inter = sim.intersection
+        lights = 0
+        if inter.light_A.state == "green":
+            lights |= LIGHT_A_GREEN
+        if inter.light_B.state == "green":
+            lights |= LIGHT_B_GREEN
+        if inter.both_red:
+            lights |= BOTH_RED
+        _SLOT.pack_into(
+            buf,
+            base,
+            sequence,
+            sim.time,
+            lights,
+            sim.total_vehicles_spawned,
+            sim.total_vehicles_completed,
+            inter.light_A.green_time,
+            inter.light_B.green_time,
+            int(inter.counter_A),  # con ``use_pce`` los contadores son float
+            int(inter.counter_B),
+            inter.total_changes,
+            inter.d,
+            inter.r,
+            inter.e,
+            inter.n,
+            inter.u,
+            inter.m,
+        )
+
+        for approach, (offset, ids, positions, speeds, stopped) in zip(
+            (inter.lane_A, inter.lane_B), layout.lanes[slot]
+        ):
+            vehicles = approach.vehicles
+            if len(vehicles) > self.capacity:
+                # Los más adelantados; en almacenamiento "list" no hay orden garantizado
+                vehicles = heapq.nsmallest(self.capacity, vehicles, key=_by_position)
+                vehicles.reverse()
+            n = len(vehicles)
+            _LANE.pack_into(buf, offset, approach.lane_length, approach.max_speed, n)
+            if not n:
+                continue
+            ids[:n] = array("q", [v.id for v in vehicles])
+            positions[:n] = array("f", [v.position for v in vehicles])
+            speeds[:n] = array("f", [v.speed for v in vehicles])
+            stopped[:n] = array("B", [v.stopped for v in vehicles])
+
+        layout.set_sequence(slot, sequence + 1)  # par: listo
+        self._slot = slot
+        self.published += 1
+        _HEADER.pack_into(buf, 0, _MAGIC, self.capacity, slot, self.published, 0)
+
+
+class SharedStateReader:
+    def __init__(self, name: str, retries: int = 100):
+        self.shm = _attach(name)
+        magic, capacity, _, _, _ = _HEADER.unpack_from(self.shm.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"El bloque {name!r} no es un canal de estado")
+        self.layout = _Layout(self.shm.buf, capacity)
+        self.retries = retries
+        self.last: Optional[Frame] = None
+
+    def header(self):
+        """``(ranura publicada, frames publicados, cerrado)``."""
+        _, _, slot, published, closed = _HEADER.unpack_from(self.shm.buf, 0)
+        return slot, published, bool(closed)
+
+    @property
+    def closed(self) -> bool:
+        return self.header()[2]
+
+    def lane_views(self, slot: int, lane: int):
+        """Vistas sin copia ``(ids, posiciones, velocidades, detenidos)`` de una ranura.
+
+        Son válidas mientras la ranura no se reescriba; conviene comprobar la
+        secuencia (``layout.sequence(slot)``) antes y después de usarlas.
+        """
+        offset, ids, positions, speeds, stopped = self.layout.lanes[slot][lane]
+        n = _LANE.unpack_from(self.shm.buf, offset)[2]
+        return ids[:n], positions[:n], speeds[:n], stopped[:n]
+
+    def read(self) -> Optional[Frame]:
+        """Último frame consistente, o ``None`` si todavía no se publicó ninguno.
+
+        Copia los arreglos de la ranura a listas dentro del seqlock: el frame
+        sigue siendo válido aunque el escritor reutilice la ranura. Para leer
+        sin copiar usar ``lane_views``.
+        """
+        layout = self.layout
+        buf = self.shm.buf
+        for _ in range(self.retries):
+            slot, published, _ = self.header()
+            if not published:
+                return None
+            sequence = layout.sequence(slot)
+            if sequence & 1:
+                continue
+            values = _SLOT.unpack_from(buf, layout.slot_offsets[slot])
+            lane_lengths, max_speeds, lanes = [], [], []
+            for offset, ids, positions, speeds, stopped in layout.lanes[slot]:
+                length, max_speed, n = _LANE.unpack_from(buf, offset)
+                lane_lengths.append(length)
+                max_speeds.append(max_speed)
+                lanes.append(
+                    list(
+                        zip(
+                            ids[:n].tolist(),
+                            positions[:n].tolist(),
+                            speeds[:n].tolist(),
+                            map(bool, stopped[:n].tolist()),
+                        )
+                    )
+                )
+            if layout.sequence(slot) != sequence:
+                continue  # el escritor volvió a esta ranura mientras leíamos
+            frame = Frame(
+                KEYFRAME,
+                values[1],
+                values[2],
+                dict(zip(COUNTERS, values[3:10])),
+                dict(zip(CONFIG, values[10:16])),
+                lane_lengths,
+                max_speeds,
+                lanes,
+            )
+            self.last = frame
+            return frame
+        return self.last
+
+    def frames(self) -> Iterator[Frame]:
+        """Frames para ``ReplaySimulation``: el más reciente en cada paso.
+
+        Si no hay uno nuevo se repite el último; termina cuando el escritor
+        cierra el canal.
+        """
+        while not self.closed:
+            frame = self.read()
+            if frame is None:
+                time.sleep(0.01)
+                continue
+            yield frame
+
+    def close(self):
+        self.layout.release()
+        self.shm.close()
+
+
+def _simulate(conn, stop, seed, steps, every, capacity, delay, kernel, storage):
+    from .scenario import build_simulation
+
+    lane = {"kernel": kernel, "storage": storage}
+    sim = build_simulation(seed=seed, lane_A=lane, lane_B=lane, max_steps=steps)
+    writer = SharedStateWriter(sim, capacity=capacity, every=every).start()
+    conn.send(writer.name)
+    try:
+        while not stop.is_set() and sim.step():
+            if delay:
+                time.sleep(delay)
+    finally:
+        writer.close()
+
+
+def main(argv=None):
+    import multiprocessing
+
+    parser = argparse.ArgumentParser(
+        description="Simulación en un proceso aparte, dibujada por la GUI vía memoria compartida"
+    )
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--steps", type=int, default=2000000)
+    parser.add_argument("--every", type=int, default=1, help="publicar un tick de cada N")
+    parser.add_argument("--capacity", type=int, default=1024, help="vehículos por carril")
+    parser.add_argument("--delay", type=float, default=0.0, help="pausa por paso (s)")
+    parser.add_argument(
+        "--kernel",
+        choices=("python", "array", "numba"),
+        default="array",
+        help="backend de cálculo (array da los mismos resultados que python)",
+    )
+    parser.add_argument(
+        "--storage",
+        choices=("list", "ring"),
+        default="list",
+        help="almacenamiento de vehículos (ring da los mismos resultados que list)",
+    )
+    args = parser.parse_args(argv)
+
+    from .gui import GUI
+    from .replay import ReplaySimulation
+
+    parent, child = multiprocessing.Pipe()
+    stop = multiprocessing.Event()
+    process = multiprocessing.Process(
+        target=_simulate,
+        args=(
+            child, stop, args.seed, args.steps, args.every, args.capacity, args.delay,
+            args.kernel, args.storage,
+        ),
+        daemon=True,
+    )
+    process.start()
+    reader = SharedStateReader(parent.recv())
+    try:
+        GUI(ReplaySimulation(reader.frames()), width=1400, height=900).run()
+    finally:
+        stop.set()
+        process.join()
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
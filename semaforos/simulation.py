@@ -1,4 +1,6 @@
+from collections import deque
 from .intersection import Intersection
+from .rolling import RollingStats
 import random
 
 
@@ -13,7 +15,9 @@ class Simulation:
         self.total_vehicles_completed = 0
         self.total_waiting_time = 0  # Tiempo total de espera acumulado
         self.vehicles_wait_history = []  # Historial de tiempos de espera
-        self.throughput_history = []  # Historial de rendimiento
+        self.throughput_history = deque(maxlen=50)  # Historial de rendimiento
+        self.rolling = RollingStats()  # ventanas móviles de 1k, 10k y 100k ticks
+        self._last_total_changes = 0
 
         # Métricas por carril
         self.lane_A_spawned = 0
@@ -25,6 +29,16 @@ class Simulation:
         self.avg_wait_time = 0.0
         self.system_efficiency = 0.0
 
+        # Funciones llamadas al final de cada paso (telemetría, control...)
+        self._observers = []
+
+    def add_observer(self, observer):
+        """Registra ``observer(sim)`` para ejecutarse al final de cada paso."""
+        self._observers.append(observer)
+
+    def remove_observer(self, observer):
+        self._observers.remove(observer)
+
     def step(self):
         """Ejecuta un paso completo de la simulación."""
         if self.time >= self.max_steps:
@@ -38,11 +52,11 @@ class Simulation:
         lb_green = self.intersection.light_B.state == "green"
 
         # 3) Contar vehículos antes del movimiento para métricas
-        vehicles_before_A = len(self.intersection.lane_A.vehicles)
-        vehicles_before_B = len(self.intersection.lane_B.vehicles)
+        vehicles_before_A = self.intersection.lane_A.get_vehicle_count()
+        vehicles_before_B = self.intersection.lane_B.get_vehicle_count()
 
         # 4) Actualizar tiempo de espera acumulado
-        self._update_waiting_metrics()
+        waiting = self._update_waiting_metrics()
 
         # 5) Mover vehículos
         self.intersection.lane_A.step_vehicles(
@@ -57,8 +71,8 @@ class Simulation:
         )
 
         # 6) Contar vehículos completados
-        vehicles_after_A = len(self.intersection.lane_A.vehicles)
-        vehicles_after_B = len(self.intersection.lane_B.vehicles)
+        vehicles_after_A = self.intersection.lane_A.get_vehicle_count()
+        vehicles_after_B = self.intersection.lane_B.get_vehicle_count()
 
         completed_A = max(0, vehicles_before_A - vehicles_after_A)
         completed_B = max(0, vehicles_before_B - vehicles_after_B)
@@ -75,6 +89,15 @@ class Simulation:
             self._update_efficiency_metrics()
 
         self.time += 1
+
+        changes = self.intersection.total_changes
+        self.rolling.update(
+            completed_A + completed_B, waiting, changes - self._last_total_changes
+        )
+        self._last_total_changes = changes
+
+        for observer in self._observers:
+            observer(self)
         return True
 
     def _update_waiting_metrics(self):
@@ -83,6 +106,7 @@ class Simulation:
         waiting_B = self.intersection.lane_B.get_waiting_vehicles()
 
         self.total_waiting_time += waiting_A + waiting_B
+        return waiting_A + waiting_B
 
     def _update_efficiency_metrics(self):
         """Actualiza métricas de eficiencia del sistema."""
@@ -96,11 +120,7 @@ class Simulation:
 
         # Guardar en historial
         current_throughput = self.total_vehicles_completed / max(1, self.time / 100.0)
-        self.throughput_history.append(current_throughput)
-
-        # Mantener solo los últimos 50 registros
-        if len(self.throughput_history) > 50:
-            self.throughput_history.pop(0)
+        self.throughput_history.append(current_throughput)  # conserva los últimos 50
 
     def _spawn_vehicles(self):
         # Generar en carril A
@@ -135,31 +155,47 @@ class Simulation:
         traffic_A = self.intersection.lane_A.get_traffic_info()
         traffic_B = self.intersection.lane_B.get_traffic_info()
 
+        # Demanda no atendida: llegadas descartadas porque la cola llegó al inicio
+        rejected_A = self.intersection.lane_A.rejected_spawns
+        rejected_B = self.intersection.lane_B.rejected_spawns
+        offered = self.total_vehicles_spawned + rejected_A + rejected_B
+
         return {
             "time": self.time,
             "total_spawned": self.total_vehicles_spawned,
             "total_completed": self.total_vehicles_completed,
             "system_efficiency": self.system_efficiency,
             "avg_wait_time": self.avg_wait_time,
+            "rejected_spawns": rejected_A + rejected_B,
+            "unserved_demand": (rejected_A + rejected_B) / offered if offered else 0.0,
             "intersection_state": state,
             # Estadísticas por carril
             "lane_A": {
                 "spawned": self.lane_A_spawned,
                 "completed": self.lane_A_completed,
                 "efficiency": efficiency_A,
+                "rejected_spawns": rejected_A,
+                "queue_length": self.intersection.lane_A.queue_length,
+                "queue_tail": self.intersection.lane_A.queue_tail,
                 "traffic_info": traffic_A,
             },
             "lane_B": {
                 "spawned": self.lane_B_spawned,
                 "completed": self.lane_B_completed,
                 "efficiency": efficiency_B,
+                "rejected_spawns": rejected_B,
+                "queue_length": self.intersection.lane_B.queue_length,
+                "queue_tail": self.intersection.lane_B.queue_tail,
                 "traffic_info": traffic_B,
             },
             # Métricas de rendimiento
-            "throughput_history": self.throughput_history[-10:],  # Últimos 10
+            "throughput_history": list(self.throughput_history)[-10:],  # Últimos 10
             "current_throughput": (
                 self.throughput_history[-1] if self.throughput_history else 0
             ),
+            # Ventanas móviles y tendencia de toda la corrida (costo constante)
+            "rolling": self.rolling.summary(),
+            "throughput_trend": [100.0 * v for v in self.rolling.trend("completed")],
         }
 
     def reset(self):
@@ -170,6 +206,8 @@ class Simulation:
         self.total_waiting_time = 0
         self.vehicles_wait_history.clear()
         self.throughput_history.clear()
+        self.rolling.reset()
+        self._last_total_changes = 0
 
         # Reiniciar métricas por carril
         self.lane_A_spawned = 0
@@ -180,13 +218,9 @@ class Simulation:
         self.avg_wait_time = 0.0
         self.system_efficiency = 0.0
 
-        # Limpiar carriles
-        self.intersection.lane_A.vehicles.clear()
-        self.intersection.lane_B.vehicles.clear()
-
-        # Reiniciar patrones de tráfico
-        self.intersection.lane_A.traffic_pattern.current_time = 0.0
-        self.intersection.lane_B.traffic_pattern.current_time = 0.0
+        # Limpiar carriles y reiniciar patrones de tráfico
+        self.intersection.lane_A.reset()
+        self.intersection.lane_B.reset()
 
         # Reiniciar semáforos
         self.intersection.light_A.set_green()
@@ -197,6 +231,9 @@ class Simulation:
         self.intersection.both_red_timer = 0
         self.intersection.total_changes = 0
         self.intersection.last_change_reason = ""
+        self.intersection.last_change_rule = None
+        self.intersection.time = 0
+        self.intersection.events.clear()
 
     def get_debug_info(self):
         return {
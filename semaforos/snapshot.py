@@ -0,0 +1,402 @@
+"""Snapshots binarios compactos del estado de la simulación.
+
+Cada frame guarda los semáforos, los contadores principales y, por
+aproximación, los vehículos con posición (int16, décimas de unidad),
+velocidad (uint8, centésimas) y bandera de detenido. Los frames clave
+(``KEYFRAME``) contienen el estado completo; los demás (``DELTA``) solo los
+vehículos que cambiaron o salieron desde el frame anterior.
+
+En archivos y sockets cada frame va precedido de su longitud (uint32).
+``SnapshotServer`` publica los frames por TCP a su propio ritmo; a un cliente
+que no drena a tiempo se le saltan los deltas y se le reenvía un frame clave
+cuando vuelve a estar al día.
+"""
+
+import asyncio
+from array import array
+from dataclasses import dataclass, field
+import struct
+import sys
+import time
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+from .aio import LoopThread
+
+KEYFRAME = 0
+DELTA = 1
+
+_HEADER = struct.Struct("<2sBBIBIIIIIII")
+_CONFIG = struct.Struct("<fffIIIB")
+_KEY_LANE = struct.Struct("<ffH")
+_DELTA_LANE = struct.Struct("<HH")
+_LENGTH = struct.Struct("<I")
+_MAGIC = b"SN"
+_VERSION = 2
+
+POSITION_SCALE = 10.0
+SPEED_SCALE = 100.0
+
+LIGHT_A_GREEN = 1
+LIGHT_B_GREEN = 2
+BOTH_RED = 4
+
+Quantized = Tuple[int, int, int]  # (posición, velocidad, detenido)
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _from_bytes(typecode: str, data: memoryview, offset: int, count: int):
+    values = array(typecode)
+    end = offset + count * values.itemsize
+    values.frombytes(data[offset:end])
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values, end
+
+
+def _quantize(vehicle) -> Quantized:
+    pos = max(-32768, min(32767, int(round(vehicle.position * POSITION_SCALE))))
+    spd = max(0, min(255, int(round(vehicle.speed * SPEED_SCALE))))
+    return pos, spd, 1 if vehicle.stopped else 0
+
+
+def _approaches(sim):
+    inter = sim.intersection
+    return [inter.lane_A, inter.lane_B]
+
+
+@dataclass
+class Frame:
+    """Estado decodificado de un frame."""
+
+    kind: int
+    tick: int
+    lights: int
+    counters: Dict[str, int]
+    config: Dict[str, float]
+    lane_lengths: List[float]
+    max_speeds: List[float]
+    lanes: List[List[Tuple[int, float, float, bool]]] = field(default_factory=list)
+
+    @property
+    def light_A_green(self) -> bool:
+        return bool(self.lights & LIGHT_A_GREEN)
+
+    @property
+    def light_B_green(self) -> bool:
+        return bool(self.lights & LIGHT_B_GREEN)
+
+    @property
+    def both_red(self) -> bool:
+        return bool(self.lights & BOTH_RED)
+
+
+class SnapshotEncoder:
+    def __init__(self, keyframe_every: int = 100):
+        self.keyframe_every = keyframe_every
+        self._previous: Optional[List[Dict[int, Quantized]]] = None
+        self._since_key = 0
+
+    def capture(self, sim) -> List[Dict[int, Quantized]]:
+        return [
+            {v.id: _quantize(v) for v in approach.vehicles}
+            for approach in _approaches(sim)
+        ]
+
+    def encode(self, sim, force_key: bool = False) -> bytes:
+        """Codifica el estado actual como delta (o clave si corresponde)."""
+        state = self.capture(sim)
+        key = (
+            force_key
+            or self._previous is None
+            or self._since_key + 1 >= self.keyframe_every
+        )
+        if key:
+            data = self._encode(sim, state, KEYFRAME)
+            self._since_key = 0
+        else:
+            data = self._encode(sim, state, DELTA, self._previous)
+            self._since_key += 1
+        self._previous = state
+        return data
+
+    def keyframe(self, sim) -> bytes:
+        """Frame clave del último estado codificado (para clientes nuevos)."""
+        state = self._previous if self._previous is not None else self.capture(sim)
+        return self._encode(sim, state, KEYFRAME)
+
+    def _encode(self, sim, state, kind, previous=None) -> bytes:
+        inter = sim.intersection
+        lights = 0
+        if inter.light_A.state == "green":
+            lights |= LIGHT_A_GREEN
+        if inter.light_B.state == "green":
+            lights |= LIGHT_B_GREEN
+        if inter.both_red:
+            lights |= BOTH_RED
+
+        parts = [
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                kind,
+                sim.time,
+                lights,
+                int(inter.counter_A),
+                int(inter.counter_B),
+                inter.light_A.green_time,
+                inter.light_B.green_time,
+                sim.total_vehicles_spawned,
+                sim.total_vehicles_completed,
+                inter.total_changes,
+            )
+        ]
+
+        approaches = _approaches(sim)
+        if kind == KEYFRAME:
+            parts.append(
+                _CONFIG.pack(
+                    inter.d, inter.r, inter.e, int(inter.n), int(inter.u), int(inter.m),
+                    len(approaches),
+                )
+            )
+            for approach, vehicles in zip(approaches, state):
+                parts.append(
+                    _KEY_LANE.pack(approach.lane_length, approach.max_speed, len(vehicles))
+                )
+                parts.extend(self._pack_vehicles(vehicles.keys(), vehicles))
+        else:
+            for vehicles, old in zip(state, previous):
+                removed = array("I", [vid for vid in old if vid not in vehicles])
+                changed = [vid for vid, q in vehicles.items() if old.get(vid) != q]
+                parts.append(_DELTA_LANE.pack(len(removed), len(changed)))
+                parts.append(_to_bytes(removed))
+                parts.extend(self._pack_vehicles(changed, vehicles))
+
+        return b"".join(parts)
+
+    @staticmethod
+    def _pack_vehicles(ids, vehicles):
+        ids = array("I", ids)
+        pos = array("h", [vehicles[vid][0] for vid in ids])
+        spd = array("B", [vehicles[vid][1] for vid in ids])
+        flags = array("B", [vehicles[vid][2] for vid in ids])
+        return [_to_bytes(ids), _to_bytes(pos), spd.tobytes(), flags.tobytes()]
+
+
+class SnapshotDecoder:
+    def __init__(self):
+        self._lanes: Optional[List[Dict[int, Quantized]]] = None
+        self._config: Dict[str, float] = {}
+        self._lane_lengths: List[float] = []
+        self._max_speeds: List[float] = []
+
+    @property
+    def ready(self) -> bool:
+        """True una vez recibido el primer frame clave."""
+        return self._lanes is not None
+
+    def decode(self, data: bytes) -> Optional[Frame]:
+        """Aplica un frame al estado; devuelve None si es un delta sin clave previa."""
+        view = memoryview(data)
+        (magic, version, kind, tick, lights, counter_A, counter_B, green_A, green_B,
+         spawned, completed, changes) = _HEADER.unpack_from(view, 0)
+        if magic != _MAGIC or version != _VERSION:
+            raise ValueError("Frame de snapshot inválido")
+        offset = _HEADER.size
+
+        if kind == KEYFRAME:
+            d, r, e, n, u, m, lane_count = _CONFIG.unpack_from(view, offset)
+            offset += _CONFIG.size
+            self._config = {"d": d, "r": r, "e": e, "n": n, "u": u, "m": m}
+            self._lanes, self._lane_lengths, self._max_speeds = [], [], []
+            for _ in range(lane_count):
+                length, max_speed, count = _KEY_LANE.unpack_from(view, offset)
+                offset += _KEY_LANE.size
+                vehicles = {}
+                offset = self._unpack_vehicles(view, offset, count, vehicles)
+                self._lanes.append(vehicles)
+                self._lane_lengths.append(length)
+                self._max_speeds.append(max_speed)
+        elif self._lanes is None:
+            return None
+        else:
+            for vehicles in self._lanes:
+                removed_count, changed_count = _DELTA_LANE.unpack_from(view, offset)
+                offset += _DELTA_LANE.size
+                removed, offset = _from_bytes("I", view, offset, removed_count)
+                for vid in removed:
+                    vehicles.pop(vid, None)
+                offset = self._unpack_vehicles(view, offset, changed_count, vehicles)
+
+        return Frame(
+            kind=kind,
+            tick=tick,
+            lights=lights,
+            counters={
+                "counter_A": counter_A,
+                "counter_B": counter_B,
+                "light_A_gtime": green_A,
+                "light_B_gtime": green_B,
+                "total_spawned": spawned,
+                "total_completed": completed,
+                "total_changes": changes,
+            },
+            config=dict(self._config),
+            lane_lengths=list(self._lane_lengths),
+            max_speeds=list(self._max_speeds),
+            lanes=[
+                [
+                    (vid, pos / POSITION_SCALE, spd / SPEED_SCALE, bool(flag))
+                    for vid, (pos, spd, flag) in vehicles.items()
+                ]
+                for vehicles in self._lanes
+            ],
+        )
+
+    @staticmethod
+    def _unpack_vehicles(view, offset, count, vehicles) -> int:
+        ids, offset = _from_bytes("I", view, offset, count)
+        pos, offset = _from_bytes("h", view, offset, count)
+        spd, offset = _from_bytes("B", view, offset, count)
+        flags, offset = _from_bytes("B", view, offset, count)
+        for vid, p, s, f in zip(ids, pos, spd, flags):
+            vehicles[vid] = (p, s, f)
+        return offset
+
+
+def write_frame(stream: BinaryIO, data: bytes):
+    stream.write(_LENGTH.pack(len(data)))
+    stream.write(data)
+
+
+def read_frames(stream: BinaryIO) -> Iterator[bytes]:
+    """Genera los frames de un archivo o flujo con prefijo de longitud."""
+    while True:
+        prefix = stream.read(_LENGTH.size)
+        if len(prefix) < _LENGTH.size:
+            return
+        (length,) = _LENGTH.unpack(prefix)
+        data = stream.read(length)
+        if len(data) < length:
+            return
+        yield data
+
+
+class SnapshotRecorder:
+    """Observador que graba un frame cada ``every`` pasos en un archivo."""
+
+    def __init__(self, sim, path: str, every: int = 1, keyframe_every: int = 100):
+        self.sim = sim
+        self.every = every
+        self.encoder = SnapshotEncoder(keyframe_every)
+        self._file = open(path, "wb")
+        sim.add_observer(self._on_step)
+
+    def _on_step(self, sim):
+        if sim.time % self.every == 0:
+            write_frame(self._file, self.encoder.encode(sim))
+
+    def close(self):
+        self.sim.remove_observer(self._on_step)
+        self._file.close()
+
+
+class SnapshotServer:
+    def __init__(
+        self,
+        sim,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        rate_hz: float = 20.0,
+        keyframe_every: int = 100,
+        max_buffer: int = 1 << 20,  # bytes pendientes a partir de los cuales se salta
+    ):
+        self.sim = sim
+        self.host = host
+        self.port = port
+        self.interval = 1.0 / rate_hz
+        self.max_buffer = max_buffer
+        self.encoder = SnapshotEncoder(keyframe_every)
+
+        self.address = None
+        self._aio = None
+        self._server = None
+        self._handlers = {}  # tarea -> writer de cada cliente conectado
+        self._stale = set()  # writers que esperan un frame clave
+        self._want_key = False
+        self._next_publish = 0.0
+
+    def start(self):
+        self._aio = LoopThread("semaforos-snapshots").start()
+        self.address = self._aio.submit(self._serve()).result()
+        self.sim.add_observer(self._on_step)
+        return self
+
+    def stop(self):
+        self.sim.remove_observer(self._on_step)
+        if self._aio is not None:
+            self._aio.submit(self._close()).result()
+            self._aio.stop()
+            self._aio = None
+
+    def _on_step(self, sim):
+        if not self._handlers:
+            return
+        now = time.monotonic()
+        if now < self._next_publish:
+            return
+        self._next_publish = now + self.interval
+
+        data = self.encoder.encode(sim)
+        key = None
+        if self._want_key and data[3] != KEYFRAME:
+            key = self.encoder.keyframe(sim)
+        self._want_key = False
+        self._aio.call_soon(self._publish, data, key)
+
+    def _publish(self, data: bytes, key: Optional[bytes]):
+        if data[3] == KEYFRAME:
+            key = data
+        for writer in list(self._handlers.values()):
+            if writer.transport.get_write_buffer_size() > self.max_buffer:
+                self._stale.add(writer)
+                self._want_key = True
+                continue
+            if writer in self._stale:
+                if key is None:
+                    self._want_key = True
+                    continue
+                self._stale.discard(writer)
+                write_frame(writer, key)
+            else:
+                write_frame(writer, data)
+
+    async def _serve(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _close(self):
+        self._server.close()
+        for writer in self._handlers.values():
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        self._stale.add(writer)  # un cliente nuevo empieza por un frame clave
+        self._want_key = True
+        try:
+            await reader.read()  # termina cuando el cliente cierra
+        except ConnectionError:
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            self._stale.discard(writer)
+            writer.close()
@@ -0,0 +1,201 @@
+"""Diagramas espacio-tiempo por carril a partir de trayectorias grabadas.
+
+Los puntos (tick, posición) de un ``trajectory.TrajectoryReader`` se
+acumulan en un histograma 2D (una celda por píxel) con NumPy, por tramos de
+ticks, así que millones de puntos se procesan sin dibujarlos uno a uno. El
+eje horizontal es el tiempo y el vertical la posición: arriba el punto de
+generación, la línea de parada marcada y abajo la salida.
+
+Sobre la línea de parada se dibuja una banda con la fase del semáforo del
+carril en cada columna (verde, rojo, o rojo oscuro con ambos en rojo),
+tomada del ``events.LightEventLog`` del cruce. Las imágenes se escriben
+como PNG con un codificador mínimo (zlib), sin pygame.
+"""
+
+import argparse
+import os
+import struct
+import tempfile
+import zlib
+from typing import Optional
+
+import numpy as np
+
+from .events import STATE_A_GREEN, STATE_B_GREEN, STATE_BOTH_RED
+from .scenario import build_simulation
+from .trajectory import TrajectoryReader, TrajectoryStore
+
+BACKGROUND = (255, 255, 255)
+INK = (20, 20, 60)
+GREEN = (40, 170, 70)
+RED = (210, 40, 40)
+BOTH_RED_COLOR = (120, 0, 0)
+STOP_LINE = (150, 150, 150)
+
+CHUNK_TICKS = 20000
+
+
+def write_png(path: str, image: np.ndarray):
+    """Escribe una imagen RGB ``(alto, ancho, 3)`` uint8 como PNG."""
+    height, width, _ = image.shape
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+        )
+
+    # Cada fila va precedida del filtro 0 (sin filtro)
+    raw = np.zeros((height, width * 3 + 1), dtype=np.uint8)
+    raw[:, 1:] = image.reshape(height, width * 3)
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw.tobytes(), 6)))
+        f.write(chunk(b"IEND", b""))
+
+
+def density(
+    lane,
+    width: int,
+    height: int,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+) -> np.ndarray:
+    """Histograma ``(alto, ancho)`` de puntos de un ``trajectory.LaneTrajectories``."""
+    start = lane.first_tick if start is None else start
+    end = lane.last_tick + 1 if end is None else end
+    span = max(1, end - start)
+    length = lane.lane_length
+    counts = np.zeros(height * width, dtype=np.int64)
+
+    for chunk_start in range(start, end, CHUNK_TICKS):
+        ticks, positions, _ = lane.columns(chunk_start, min(end, chunk_start + CHUNK_TICKS))
+        if not len(ticks):
+            continue
+        x = (ticks - start) * width // span
+        # Fila 0 = punto de generación (+length), última fila = salida (-length)
+        y = ((length - positions) * (height / (2 * length))).astype(np.int64)
+        np.clip(y, 0, height - 1, out=y)
+        counts += np.bincount(y * width + x, minlength=height * width)
+    return counts.reshape(height, width)
+
+
+def phase_columns(events, approach: str, width: int, start: int, end: int) -> np.ndarray:
+    """Estado del semáforo de ``approach`` en el tick central de cada columna.
+
+    0 = rojo, 1 = verde, 2 = ambos en rojo. Sin eventos, A empieza en verde.
+    """
+    span = max(1, end - start)
+    centers = start + (np.arange(width) * span + span // 2) // width
+    initial = STATE_A_GREEN
+    if events is None or not len(events):
+        states = np.full(width, initial, dtype=np.int64)
+    else:
+        ticks = np.frombuffer(events.ticks, dtype=np.int64)
+        values = np.frombuffer(events.states, dtype=np.uint8).astype(np.int64)
+        # El tick del carril cuenta el paso ya hecho; el del cruce, el paso en curso
+        rows = np.searchsorted(ticks, centers - 1, side="right") - 1
+        states = np.where(rows >= 0, values[np.maximum(rows, 0)], initial)
+    green = STATE_A_GREEN if approach == "A" else STATE_B_GREEN
+    return np.where(states == STATE_BOTH_RED, 2, (states == green).astype(np.int64))
+
+
+def render_lane(
+    lane,
+    events=None,
+    approach: Optional[str] = None,
+    width: int = 1600,
+    height: int = 600,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+    band: int = 4,
+) -> np.ndarray:
+    """Imagen RGB del diagrama de un carril con la fase superpuesta."""
+    start = lane.first_tick if start is None else start
+    end = lane.last_tick + 1 if end is None else end
+    counts = density(lane, width, height, start, end)
+
+    # Escala logarítmica: una celda ocupada ya se ve, las colas saturan
+    level = np.log1p(counts)
+    peak = level.max() or 1.0
+    alpha = (level / peak)[..., None]
+    image = (
+        np.array(BACKGROUND, dtype=np.float64) * (1 - alpha)
+        + np.array(INK, dtype=np.float64) * alpha
+    ).astype(np.uint8)
+
+    stop_row = height // 2
+    image[stop_row] = STOP_LINE
+    phases = phase_columns(events, approach or lane.key[0], width, start, end)
+    colors = np.array([RED, GREEN, BOTH_RED_COLOR], dtype=np.uint8)[phases]
+    top = max(0, stop_row - band)
+    image[top:stop_row] = colors[None, :, :]
+    return image
+
+
+def render_all(
+    reader: TrajectoryReader,
+    out_dir: str,
+    events=None,
+    width: int = 1600,
+    height: int = 600,
+    start: Optional[int] = None,
+    end: Optional[int] = None,
+):
+    """Escribe ``spacetime_<carril>.png`` por cada carril del almacén."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for key in reader.keys:
+        lane = reader.lane(key)
+        if lane.first_tick is None:
+            continue
+        path = os.path.join(out_dir, f"spacetime_{key}.png")
+        write_png(path, render_lane(lane, events, None, width, height, start, end))
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diagramas espacio-tiempo de una corrida sin ventana")
+    parser.add_argument("--out", required=True, help="directorio de salida de los PNG")
+    parser.add_argument("--store", help="leer un almacén de trayectorias existente (sin fases)")
+    parser.add_argument("--steps", type=int, default=20000, help="pasos a simular")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--every", type=int, default=1, help="registrar un tick de cada N")
+    parser.add_argument(
+        "--storage",
+        choices=("list", "ring"),
+        default="list",
+        help="almacenamiento de vehículos (ring da los mismos resultados que list)",
+    )
+    parser.add_argument("--start", type=int, default=None)
+    parser.add_argument("--end", type=int, default=None)
+    parser.add_argument("--width", type=int, default=1600)
+    parser.add_argument("--height", type=int, default=600)
+    args = parser.parse_args(argv)
+    window = dict(width=args.width, height=args.height, start=args.start, end=args.end)
+
+    if args.store:
+        paths = render_all(TrajectoryReader(args.store), args.out, **window)
+    else:
+        # El kernel "array" y el almacenamiento "ring" reproducen exactamente
+        # el camino por defecto; solo cambian el costo por paso
+        lane = {"kernel": "array", "storage": args.storage}
+        sim = build_simulation(seed=args.seed, lane_A=lane, lane_B=lane, max_steps=args.steps)
+        with tempfile.TemporaryDirectory() as directory:
+            with TrajectoryStore(directory, every=args.every) as store:
+                store.attach_simulation(sim)
+                while sim.step():
+                    pass
+            reader = TrajectoryReader(directory)
+            paths = render_all(reader, args.out, sim.intersection.events, **window)
+            del reader  # cerrar los memmap antes de borrar el directorio
+    for path in paths:
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
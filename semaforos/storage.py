@@ -0,0 +1,141 @@
+"""Almacenamiento de vehículos de un carril en un buffer circular.
+
+Los vehículos entran por ``lane_length`` y salen por ``-lane_length`` casi
+en orden FIFO: el índice 0 es el más atrasado y el índice -1 el más
+adelantado. Los pocos adelantamientos de cada paso se corrigen en el lugar
+con ``reorder``.
+"""
+
+STORAGES = ("list", "ring")
+
+
+class VehicleRing:
+    """Cola doble de capacidad creciente con acceso O(1) a ambos extremos."""
+
+    __slots__ = ("_buf", "_head", "_size")
+
+    def __init__(self, items=(), capacity: int = 64):
+        items = list(items)
+        cap = max(1, capacity)
+        while cap < len(items):
+            cap *= 2
+        self._buf = items + [None] * (cap - len(items))
+        self._head = 0
+        self._size = len(items)
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        buf, head, cap = self._buf, self._head, len(self._buf)
+        for k in range(self._size):
+            yield buf[(head + k) % cap]
+
+    def __reversed__(self):
+        buf, head, cap = self._buf, self._head, len(self._buf)
+        for k in range(self._size - 1, -1, -1):
+            yield buf[(head + k) % cap]
+
+    def _index(self, index: int) -> int:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("índice fuera del buffer")
+        return (self._head + index) % len(self._buf)
+
+    def __getitem__(self, index: int):
+        return self._buf[self._index(index)]
+
+    def __setitem__(self, index: int, item):
+        self._buf[self._index(index)] = item
+
+    def _grow(self):
+        self._buf = list(self) + [None] * len(self._buf)
+        self._head = 0
+
+    def append(self, item):
+        """Agrega al final (lado más adelantado)."""
+        if self._size == len(self._buf):
+            self._grow()
+        self._buf[(self._head + self._size) % len(self._buf)] = item
+        self._size += 1
+
+    def appendleft(self, item):
+        """Agrega al inicio (lado de entrada del carril)."""
+        if self._size == len(self._buf):
+            self._grow()
+        self._head = (self._head - 1) % len(self._buf)
+        self._buf[self._head] = item
+        self._size += 1
+
+    def pop(self):
+        """Quita y devuelve el elemento del final."""
+        if not self._size:
+            raise IndexError("pop de un buffer vacío")
+        slot = (self._head + self._size - 1) % len(self._buf)
+        item = self._buf[slot]
+        self._buf[slot] = None
+        self._size -= 1
+        return item
+
+    def popleft(self):
+        """Quita y devuelve el elemento del inicio."""
+        if not self._size:
+            raise IndexError("pop de un buffer vacío")
+        item = self._buf[self._head]
+        self._buf[self._head] = None
+        self._head = (self._head + 1) % len(self._buf)
+        self._size -= 1
+        return item
+
+    def insert(self, index: int, item):
+        """Inserta en ``index`` desplazando los elementos posteriores (O(n))."""
+        index = max(0, min(index, self._size))
+        self.append(item)
+        for k in range(self._size - 1, index, -1):
+            self[k] = self[k - 1]
+        self[index] = item
+
+    def __delitem__(self, index: int):
+        """Elimina el elemento en ``index`` desplazando los posteriores (O(n))."""
+        if index < 0:
+            index += self._size
+        for k in range(index, self._size - 1):
+            self[k] = self[k + 1]
+        self.pop()
+
+    def reorder(self, key):
+        """Ordena de forma estable por ``key`` descendente.
+
+        Inserción que solo mueve los elementos fuera de orden: con el buffer
+        ya ordenado es un recorrido O(n) y no reescribe nada.
+        """
+        items = list(self)
+        moved = False
+        for i in range(1, len(items)):
+            item = items[i]
+            value = key(item)
+            j = i
+            while j and key(items[j - 1]) < value:
+                items[j] = items[j - 1]
+                j -= 1
+            if j != i:
+                items[j] = item
+                moved = True
+        if moved:
+            self.replace(items)
+
+    def replace(self, items):
+        """Reemplaza todo el contenido en O(n), conservando el objeto."""
+        items = list(items)
+        cap = len(self._buf)
+        while cap < len(items):
+            cap *= 2
+        self._buf = items + [None] * (cap - len(items))
+        self._head = 0
+        self._size = len(items)
+
+    def clear(self):
+        self._buf = [None] * len(self._buf)
+        self._head = 0
+        self._size = 0
@@ -0,0 +1,163 @@
+"""Servidor local de telemetría para simulaciones sin ventana.
+
+Publica ``get_statistics()`` y ``get_debug_info()`` por TCP o socket Unix,
+como líneas JSON: primero el estado completo y luego solo las claves que
+cambiaron. El muestreo ocurre como mucho ``rate_hz`` veces por segundo y
+solo si hay clientes conectados; cada cliente recibe siempre el frame más
+reciente, así que a un cliente lento se le descartan los intermedios.
+
+Las tasas de spawn se reportan sin ruido (``Lane.expected_spawn_rate``):
+armar un frame no consume números aleatorios, así que conectar un cliente
+no altera la corrida.
+"""
+
+import asyncio
+import json
+import time
+from typing import Optional
+from .aio import LoopThread
+
+_MISSING = object()
+
+
+def flatten(data: dict, prefix: str = "") -> dict:
+    """Aplana diccionarios anidados con claves separadas por puntos."""
+    flat = {}
+    for key, value in data.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        else:
+            flat[name] = value
+    return flat
+
+
+class TelemetryServer:
+    def __init__(
+        self,
+        sim,
+        host: str = "127.0.0.1",
+        port: int = 0,  # 0: puerto libre asignado por el sistema
+        path: Optional[str] = None,  # si se indica, socket Unix en lugar de TCP
+        rate_hz: float = 5.0,
+        include_debug: bool = True,
+    ):
+        self.sim = sim
+        self.host = host
+        self.port = port
+        self.path = path
+        self.interval = 1.0 / rate_hz
+        self.include_debug = include_debug
+
+        self.address = None
+        self._aio = None
+        self._server = None
+        self._handlers = {}  # tarea -> writer de cada cliente conectado
+        self._clients = set()
+        self._latest = None
+        self._next_publish = 0.0
+
+    def start(self):
+        self._aio = LoopThread("semaforos-telemetry").start()
+        self.address = self._aio.submit(self._serve()).result()
+        self.sim.add_observer(self._on_step)
+        return self
+
+    def stop(self):
+        self.sim.remove_observer(self._on_step)
+        if self._aio is not None:
+            self._aio.submit(self._close()).result()
+            self._aio.stop()
+            self._aio = None
+
+    def snapshot(self) -> dict:
+        data = {"statistics": self.sim.get_statistics()}
+        if self.include_debug:
+            data["debug"] = self.sim.get_debug_info()
+        return flatten(data)
+
+    def _on_step(self, sim):
+        """Observador del bucle de simulación: barato salvo cuando toca publicar."""
+        if not self._clients:
+            return
+        now = time.monotonic()
+        if now < self._next_publish:
+            return
+        self._next_publish = now + self.interval
+        self._aio.call_soon(self._publish, self.snapshot())
+
+    def _publish(self, frame: dict):
+        self._latest = frame
+        for event in self._clients:
+            event.set()
+
+    async def _serve(self):
+        if self.path:
+            self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+            return self.path
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def _close(self):
+        self._server.close()
+        # Cerrar las conexiones hace que cada cliente vea fin de datos y termine
+        for writer in self._handlers.values():
+            writer.close()
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        event = asyncio.Event()
+        self._clients.add(event)
+        closed = asyncio.ensure_future(reader.read())  # termina cuando el cliente cierra
+        sent = {}
+
+        try:
+            while True:
+                waiter = asyncio.ensure_future(event.wait())
+                await asyncio.wait({waiter, closed}, return_when=asyncio.FIRST_COMPLETED)
+                if closed.done():
+                    waiter.cancel()
+                    break
+                event.clear()
+
+                frame = self._latest
+                delta = {
+                    k: v for k, v in frame.items() if sent.get(k, _MISSING) != v
+                }
+                message = {"type": "delta" if sent else "full", "data": delta}
+                writer.write((json.dumps(message) + "\n").encode())
+                # Mientras se drena, los frames nuevos solo reemplazan a _latest
+                await writer.drain()
+                sent = frame
+        except ConnectionError:
+            pass
+        finally:
+            self._handlers.pop(task, None)
+            self._clients.discard(event)
+            closed.cancel()
+            writer.close()
+
+
+async def subscribe(host: str = "127.0.0.1", port: int = 0, path: Optional[str] = None):
+    """Cliente: genera el estado completo reconstruido a partir de los deltas."""
+    if path:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+
+    state = {}
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = json.loads(line)
+            if message["type"] == "full":
+                state = {}
+            state.update(message["data"])
+            yield dict(state)
+    finally:
+        writer.close()
@@ -0,0 +1,348 @@
+"""Almacén de trayectorias en archivos ``numpy.memmap``.
+
+Cada carril registrado escribe dos archivos de registros de tamaño fijo:
+
+- ``<carril>.ticks``: orden por tick. Las filas de un tick son contiguas y
+  ``tick_offsets`` guarda dónde empieza cada una, así que el estado de un
+  tick es una sola lectura (``snapshot``).
+- ``<carril>.vehicles``: orden por vehículo, en bloques de ``block_rows``
+  registros. Cada vehículo tiene la lista de sus bloques, de modo que su
+  trayectoria se lee con una lectura contigua por bloque (``trajectory``).
+
+``Lane.step_vehicles`` llama a ``record`` al final de cada paso cuando el
+carril tiene ``recorder``. Las posiciones y velocidades se guardan como
+float32. Los archivos crecen de a ``grow_rows`` registros y al cerrar se
+guardan los índices (``index.npz`` por carril y ``trajectories.json``).
+
+La lectura (``TrajectoryReader``) abre los archivos en modo solo lectura y
+no carga nada hasta que se pide un tick o un vehículo.
+"""
+
+from array import array
+import json
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+TICK_RECORD = np.dtype(
+    [("id", "<i8"), ("position", "<f4"), ("speed", "<f4"), ("stopped", "u1")]
+)
+VEHICLE_RECORD = np.dtype(
+    [("tick", "<i8"), ("position", "<f4"), ("speed", "<f4"), ("stopped", "u1")]
+)
+METADATA = "trajectories.json"
+
+
+class _GrowingMemmap:
+    """Arreglo de registros sobre un archivo que se agranda por tramos."""
+
+    def __init__(self, path: str, dtype: np.dtype, grow_rows: int):
+        self.path = path
+        self.dtype = dtype
+        self.grow_rows = grow_rows
+        self.size = 0
+        self.capacity = 0
+        self.data = None
+        open(path, "wb").close()
+        self._resize(grow_rows)
+
+    def _resize(self, capacity: int):
+        if self.data is not None:
+            self.data.flush()
+            self.data = None
+        with open(self.path, "r+b") as f:
+            f.truncate(capacity * self.dtype.itemsize)
+        self.capacity = capacity
+        if capacity:
+            self.data = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(capacity,))
+
+    def reserve(self, rows: int) -> int:
+        """Reserva ``rows`` registros al final y devuelve el índice del primero."""
+        start = self.size
+        if start + rows > self.capacity:
+            extra = start + rows - self.capacity
+            self._resize(self.capacity + max(extra, self.grow_rows))
+        self.size += rows
+        return start
+
+    def close(self, rows: Optional[int] = None):
+        """Recorta el archivo a ``rows`` registros (por defecto, los usados)."""
+        self._resize(self.size if rows is None else rows)
+
+
+class LaneRecorder:
+    """Escritor de trayectorias de un carril (se asigna a ``Lane.recorder``)."""
+
+    def __init__(self, directory: str, key: str, block_rows: int, every: int, grow_rows: int):
+        self.directory = directory
+        self.key = key
+        self.block_rows = block_rows
+        self.every = every
+        self.lane_length = 0.0
+        self.max_speed = 0.0
+
+        self._ticks = _GrowingMemmap(os.path.join(directory, key + ".ticks"), TICK_RECORD, grow_rows)
+        self._blocks = _GrowingMemmap(
+            os.path.join(directory, key + ".vehicles"), VEHICLE_RECORD, grow_rows
+        )
+        self.tick_offsets = array("q", [0])
+        self.first_tick: Optional[int] = None
+        self.last_tick: Optional[int] = None
+        # id -> [primer tick, registros, bloques]
+        self._index: Dict[int, list] = {}
+
+    def record(self, tick: int, vehicles):
+        tick = int(tick)
+        if tick % self.every:
+            return
+        if self.last_tick is not None and tick != self.last_tick + self.every:
+            raise ValueError(
+                f"Tick {tick} fuera de orden en {self.key!r} (último: {self.last_tick}); "
+                "usar un almacén nuevo tras reiniciar la simulación"
+            )
+        if self.first_tick is None:
+            self.first_tick = tick
+        self.last_tick = tick
+
+        n = len(vehicles)
+        start = self._ticks.reserve(n)
+        self.tick_offsets.append(start + n)
+        if not n:
+            return
+
+        ids = [v.id for v in vehicles]
+        positions = [v.position for v in vehicles]
+        speeds = [v.speed for v in vehicles]
+        stopped = [v.stopped for v in vehicles]
+
+        rows = self._ticks.data[start : start + n]
+        rows["id"] = ids
+        rows["position"] = positions
+        rows["speed"] = speeds
+        rows["stopped"] = stopped
+
+        # Destino de cada registro en el archivo por vehículo
+        block_rows = self.block_rows
+        index = self._index
+        dest = array("q")
+        for vid in ids:
+            entry = index.get(vid)
+            if entry is None:
+                entry = index[vid] = [tick, 0, array("q")]
+            offset = entry[1] % block_rows
+            if offset == 0:
+                entry[2].append(self._blocks.reserve(block_rows) // block_rows)
+            dest.append(entry[2][-1] * block_rows + offset)
+            entry[1] += 1
+
+        dest = np.frombuffer(dest, dtype=np.int64)
+        blocks = self._blocks.data
+        blocks["tick"][dest] = tick
+        blocks["position"][dest] = positions
+        blocks["speed"][dest] = speeds
+        blocks["stopped"][dest] = stopped
+
+    def close(self):
+        self._ticks.close()
+        self._blocks.close()
+        ids = np.fromiter(self._index.keys(), dtype=np.int64, count=len(self._index))
+        entries = list(self._index.values())
+        counts = np.array([e[1] for e in entries], dtype=np.int64)
+        block_counts = np.array([len(e[2]) for e in entries], dtype=np.int64)
+        np.savez(
+            os.path.join(self.directory, self.key + ".index.npz"),
+            tick_offsets=np.frombuffer(self.tick_offsets, dtype=np.int64),
+            ids=ids,
+            first_tick=np.array([e[0] for e in entries], dtype=np.int64),
+            counts=counts,
+            block_starts=np.concatenate(([0], np.cumsum(block_counts))),
+            blocks=np.concatenate([np.frombuffer(e[2], dtype=np.int64) for e in entries])
+            if entries
+            else np.empty(0, dtype=np.int64),
+        )
+
+    def metadata(self) -> dict:
+        return {
+            "block_rows": self.block_rows,
+            "every": self.every,
+            "first_tick": self.first_tick,
+            "last_tick": self.last_tick,
+            "rows": self._ticks.size,
+            "vehicles": len(self._index),
+            "lane_length": self.lane_length,
+            "max_speed": self.max_speed,
+        }
+
+
+class TrajectoryStore:
+    def __init__(
+        self,
+        directory: str,
+        block_rows: int = 256,
+        every: int = 1,  # registrar un tick de cada ``every``
+        grow_rows: int = 1 << 20,
+    ):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.block_rows = block_rows
+        self.every = every
+        self.grow_rows = grow_rows
+        self.recorders: Dict[str, LaneRecorder] = {}
+        self._lanes: List[object] = []
+
+    def attach(self, approach, key: Optional[str] = None):
+        """Registra un ``Lane`` o cada carril de una ``Road`` (claves ``A0``, ``A1``...)."""
+        key = key or approach.name
+        lanes = getattr(approach, "lanes", None)
+        if lanes is not None:
+            for i, lane in enumerate(lanes):
+                self.attach(lane, f"{key}{i}")
+            return
+        if key in self.recorders:
+            raise ValueError(f"Ya hay un carril registrado como {key!r}")
+        recorder = LaneRecorder(self.directory, key, self.block_rows, self.every, self.grow_rows)
+        recorder.lane_length = approach.lane_length
+        recorder.max_speed = approach.max_speed
+        approach.recorder = recorder
+        self.recorders[key] = recorder
+        self._lanes.append(approach)
+
+    def attach_simulation(self, sim):
+        self.attach(sim.intersection.lane_A)
+        self.attach(sim.intersection.lane_B)
+        return self
+
+    def close(self):
+        """Desconecta los carriles y escribe los índices."""
+        for lane in self._lanes:
+            lane.recorder = None
+        self._lanes.clear()
+        for recorder in self.recorders.values():
+            recorder.close()
+        with open(os.path.join(self.directory, METADATA), "w") as f:
+            json.dump(
+                {key: r.metadata() for key, r in self.recorders.items()}, f, indent=2
+            )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LaneTrajectories:
+    """Lectura de las trayectorias de un carril."""
+
+    def __init__(self, directory: str, key: str, meta: dict):
+        self.key = key
+        self.block_rows = meta["block_rows"]
+        self.every = meta["every"]
+        self.first_tick = meta["first_tick"]
+        self.last_tick = meta["last_tick"]
+        self.lane_length = meta["lane_length"]
+        self.max_speed = meta["max_speed"]
+
+        index = np.load(os.path.join(directory, key + ".index.npz"))
+        self.tick_offsets = index["tick_offsets"]
+        self._ids = index["ids"]
+        self._first = index["first_tick"]
+        self._counts = index["counts"]
+        self._block_starts = index["block_starts"]
+        self._blocks_flat = index["blocks"]
+        self._row_of = None  # id -> fila del índice, se arma al primer uso
+
+        self.ticks = self._open(os.path.join(directory, key + ".ticks"), TICK_RECORD)
+        self.blocks = self._open(os.path.join(directory, key + ".vehicles"), VEHICLE_RECORD)
+
+    @staticmethod
+    def _open(path: str, dtype: np.dtype):
+        if not os.path.getsize(path):
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode="r")
+
+    def __len__(self) -> int:
+        """Cantidad de ticks registrados."""
+        return len(self.tick_offsets) - 1
+
+    def tick_bounds(self, tick: int) -> Tuple[int, int]:
+        if self.first_tick is None or tick % self.every:
+            raise KeyError(tick)
+        k = (tick - self.first_tick) // self.every
+        if not 0 <= k < len(self):
+            raise KeyError(tick)
+        return int(self.tick_offsets[k]), int(self.tick_offsets[k + 1])
+
+    def snapshot(self, tick: int) -> np.ndarray:
+        """Vehículos del carril en ``tick`` (vista sobre el archivo, sin copia)."""
+        start, end = self.tick_bounds(tick)
+        return self.ticks[start:end]
+
+    def vehicle_ids(self) -> np.ndarray:
+        return self._ids
+
+    def trajectory(self, vehicle_id: int) -> np.ndarray:
+        """Registros de un vehículo en orden de tick (una lectura por bloque)."""
+        if self._row_of is None:
+            self._row_of = {vid: i for i, vid in enumerate(self._ids.tolist())}
+        i = self._row_of[vehicle_id]
+        count = int(self._counts[i])
+        blocks = self._blocks_flat[self._block_starts[i] : self._block_starts[i + 1]]
+        size = self.block_rows
+        parts = [self.blocks[b * size : b * size + size] for b in blocks.tolist()]
+        if len(parts) == 1:
+            return parts[0][:count]
+        return np.concatenate(parts)[:count]
+
+    def iter_ticks(
+        self, start: Optional[int] = None, end: Optional[int] = None
+    ) -> Iterator[Tuple[int, np.ndarray]]:
+        """Genera ``(tick, registros)`` para ``start <= tick < end``."""
+        if self.first_tick is None:
+            return
+        first = self.first_tick if start is None else max(start, self.first_tick)
+        k = -(-(first - self.first_tick) // self.every)
+        stop = len(self) if end is None else min(len(self), -(-(end - self.first_tick) // self.every))
+        for k in range(k, stop):
+            lo, hi = int(self.tick_offsets[k]), int(self.tick_offsets[k + 1])
+            yield self.first_tick + k * self.every, self.ticks[lo:hi]
+
+    def columns(self, start: Optional[int] = None, end: Optional[int] = None):
+        """Ticks, posiciones y velocidades de todos los registros en ``[start, end)``.
+
+        Devuelve vistas sobre el archivo, salvo los ticks, que se expanden a
+        partir de ``tick_offsets``.
+        """
+        if self.first_tick is None:
+            empty = np.empty(0)
+            return np.empty(0, dtype=np.int64), empty, empty
+        k0 = 0 if start is None else max(0, -(-(start - self.first_tick) // self.every))
+        k1 = len(self) if end is None else min(len(self), -(-(end - self.first_tick) // self.every))
+        k1 = max(k0, k1)
+        lo, hi = int(self.tick_offsets[k0]), int(self.tick_offsets[k1])
+        counts = np.diff(self.tick_offsets[k0 : k1 + 1])
+        ticks = np.repeat(self.first_tick + self.every * np.arange(k0, k1, dtype=np.int64), counts)
+        rows = self.ticks[lo:hi]
+        return ticks, rows["position"], rows["speed"]
+
+
+class TrajectoryReader:
+    def __init__(self, directory: str):
+        self.directory = directory
+        with open(os.path.join(directory, METADATA)) as f:
+            self.metadata = json.load(f)
+        self._lanes: Dict[str, LaneTrajectories] = {}
+
+    @property
+    def keys(self) -> List[str]:
+        return list(self.metadata)
+
+    def lane(self, key: str) -> LaneTrajectories:
+        lane = self._lanes.get(key)
+        if lane is None:
+            lane = self._lanes[key] = LaneTrajectories(self.directory, key, self.metadata[key])
+        return lane
+
+    def __getitem__(self, key: str) -> LaneTrajectories:
+        return self.lane(key)
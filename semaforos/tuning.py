@@ -0,0 +1,173 @@
+"""Ajuste en línea de los umbrales ``n``, ``u`` y ``m`` del cruce.
+
+``OnlineTuner`` es un observador de ``Simulation``: cada tick solo compara
+el tiempo actual con el final de la ventana en curso. Al cerrar una ventana
+calcula la recompensa a partir de los contadores acumulados de la
+simulación (vehículos completados y vehículos·tick de espera), sin recorrer
+vehículos, y aplica una búsqueda (1+1) sin gradiente:
+
+1. Con los parámetros vigentes (incumbente) se mide una ventana.
+2. Se prueba un candidato que perturba un parámetro al azar dentro de sus
+   límites y se mide otra ventana.
+3. Se vuelve al incumbente y se mide de nuevo; el candidato se compara con
+   el promedio de las ventanas anterior y posterior, de modo que una demanda
+   que sube o baja de forma sostenida no sesga la comparación.
+4. Si el candidato rinde al menos igual se adopta y el paso crece; si no,
+   el paso se reduce y la última ventana sirve de base para el siguiente.
+
+Tras cada cambio se descartan ``settle`` ticks para que las colas se
+acomoden a los nuevos umbrales antes de medir.
+"""
+
+from dataclasses import dataclass
+import random
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_BOUNDS = {"n": (5, 100), "u": (10, 600), "m": (1, 15)}
+DEFAULT_STEPS = {"n": 4, "u": 40, "m": 1}
+
+
+@dataclass
+class TuningRecord:
+    time: int
+    params: Dict[str, int]
+    reward: float
+    incumbent_reward: Optional[float]
+    accepted: bool
+
+
+class OnlineTuner:
+    def __init__(
+        self,
+        sim,
+        period: int = 1000,  # ticks medidos por ventana
+        settle: int = 200,  # ticks descartados tras cambiar parámetros
+        bounds: Optional[Dict[str, Tuple[int, int]]] = None,
+        steps: Optional[Dict[str, int]] = None,
+        wait_weight: float = 0.05,
+        seed: Optional[int] = None,
+    ):
+        self.sim = sim
+        self.period = period
+        self.settle = settle
+        self.bounds = dict(DEFAULT_BOUNDS if bounds is None else bounds)
+        self.steps = {name: float(s) for name, s in (steps or DEFAULT_STEPS).items()}
+        self.wait_weight = wait_weight
+        self.rng = random.Random(seed)  # no consume el generador global de la simulación
+
+        self.history: List[TuningRecord] = []
+        self.incumbent = self._current_params()
+        self.incumbent_reward: Optional[float] = None
+        self._candidate: Optional[Dict[str, int]] = None
+        self._candidate_reward = 0.0
+        self._changed: Optional[str] = None
+        self._phase = "baseline"  # baseline -> candidate -> check
+        self._before = 0.0
+        self._start_counters = (0, 0)
+        self._window_start = 0
+        self._window_end = 0
+
+    def start(self):
+        self._schedule(self.sim.time)
+        self.sim.add_observer(self._on_step)
+        return self
+
+    def stop(self):
+        self.sim.remove_observer(self._on_step)
+
+    # --- Observador -----------------------------------------------------
+
+    def _on_step(self, sim):
+        t = sim.time
+        if t == self._window_start:
+            self._start_counters = (sim.total_vehicles_completed, sim.total_waiting_time)
+        elif t >= self._window_end:
+            self._close_window(sim)
+
+    def _schedule(self, now: int, settle: int = 0):
+        self._window_start = now + settle
+        self._window_end = self._window_start + self.period
+        if not settle:
+            self._start_counters = (
+                self.sim.total_vehicles_completed,
+                self.sim.total_waiting_time,
+            )
+
+    def reward(self, completed: int, waiting: int, ticks: int) -> float:
+        """Vehículos completados por cada 100 ticks menos la cola media ponderada."""
+        return 100.0 * completed / ticks - self.wait_weight * waiting / ticks
+
+    def _close_window(self, sim):
+        completed0, waiting0 = self._start_counters
+        value = self.reward(
+            sim.total_vehicles_completed - completed0,
+            sim.total_waiting_time - waiting0,
+            sim.time - self._window_start,
+        )
+
+        if self._phase == "baseline":
+            self._before = value
+            self._record(sim.time, self.incumbent, value, True)
+            self._propose()
+        elif self._phase == "candidate":
+            # Volver al incumbente para medirlo otra vez después del candidato
+            self._candidate_reward = value
+            self._apply(self.incumbent)
+            self._phase = "check"
+            self._schedule(sim.time, self.settle)
+        else:
+            # Promediar antes y después cancela la tendencia de la demanda
+            self.incumbent_reward = (self._before + value) / 2
+            accepted = self._candidate_reward >= self.incumbent_reward
+            self._record(sim.time, self._candidate, self._candidate_reward, accepted)
+            if accepted:
+                self.incumbent = self._candidate
+                self.steps[self._changed] *= 1.5
+                self._candidate = None
+                self._apply(self.incumbent)
+                self._phase = "baseline"
+                self._schedule(sim.time, self.settle)
+            else:
+                self.steps[self._changed] = max(1.0, self.steps[self._changed] * 0.7)
+                self._before = value
+                self._propose()
+
+    def _propose(self):
+        name = self.rng.choice(sorted(self.steps))
+        low, high = self.bounds[name]
+        delta = max(1, round(self.steps[name])) * self.rng.choice((-1, 1))
+        value = min(high, max(low, self.incumbent[name] + delta))
+        if value == self.incumbent[name]:  # en el límite: probar hacia el otro lado
+            value = min(high, max(low, self.incumbent[name] - delta))
+
+        self._candidate = dict(self.incumbent, **{name: value})
+        self._changed = name
+        self._phase = "candidate"
+        self._apply(self._candidate)
+        self._schedule(self.sim.time, self.settle)
+
+    # --- Utilidades -----------------------------------------------------
+
+    def _current_params(self) -> Dict[str, int]:
+        inter = self.sim.intersection
+        return {name: getattr(inter, name) for name in self.bounds}
+
+    def _apply(self, params: Dict[str, int]):
+        inter = self.sim.intersection
+        for name, value in params.items():
+            setattr(inter, name, type(getattr(inter, name))(value))
+
+    def _record(self, time: int, params, reward: float, accepted: bool):
+        self.history.append(
+            TuningRecord(time, dict(params), reward, self.incumbent_reward, accepted)
+        )
+
+    def get_state(self) -> dict:
+        return {
+            "incumbent": dict(self.incumbent),
+            "incumbent_reward": self.incumbent_reward,
+            "phase": self._phase,
+            "candidate": dict(self._candidate) if self._candidate else None,
+            "steps": dict(self.steps),
+            "windows": len(self.history),
+        }
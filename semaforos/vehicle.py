@@ -1,12 +1,129 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
+from .following import IDM, Gipps
+
+
+@dataclass(frozen=True)
+class VehicleClass:
+    """Parámetros dinámicos de un tipo de vehículo.
+
+    ``length`` y ``desired_speed`` en ``None`` toman ``vehicle_length`` y
+    ``max_speed`` del carril, así que ``CAR`` reproduce el comportamiento
+    original. Los huecos de seguimiento están calibrados para el vehículo
+    de referencia del carril: un líder más largo deja ese exceso menos de
+    hueco a quien lo sigue.
+
+    ``following`` guarda parámetros propios para los modelos de seguimiento
+    (``following.IDM`` / ``following.Gipps``), a lo sumo uno por modelo; el
+    carril usa el que coincide con su ``car_following``.
+    """
+
+    name: str = "car"
+    length: Optional[float] = None
+    accel: float = 0.4  # aceleración máxima por step
+    decel: float = 0.6  # desaceleración máxima por step
+    desired_speed: Optional[float] = None
+    pce: float = 1.0  # equivalentes de auto en las zonas d y r
+    following: Tuple = ()
+
+    def resolve(self, reference_length: float, max_speed: float):
+        """``(exceso de largo, aceleración, desaceleración, velocidad deseada)`` en un carril."""
+        length = reference_length if self.length is None else self.length
+        desired = max_speed if self.desired_speed is None else self.desired_speed
+        return length - reference_length, self.accel, self.decel, desired
+
+    def following_model(self, model):
+        """Parámetros de la clase para el tipo de ``model``, o ``model`` si no tiene."""
+        for own in self.following:
+            if type(own) is type(model):
+                return own
+        return model
+
+
+CAR = VehicleClass()
+BUS = VehicleClass(
+    "bus", length=12.0, accel=0.25, decel=0.5, desired_speed=1.4, pce=2.0,
+    following=(
+        IDM(accel=0.6, decel=1.2, headway=1.5, min_gap=3.0),
+        Gipps(accel=0.8, decel=2.0, min_gap=4.0),
+    ),
+)
+TRUCK = VehicleClass(
+    "truck", length=16.0, accel=0.2, decel=0.45, desired_speed=1.3, pce=2.5,
+    following=(
+        IDM(accel=0.5, decel=1.0, headway=1.7, min_gap=3.0),
+        Gipps(accel=0.7, decel=1.8, min_gap=4.0),
+    ),
+)
 
 
-@dataclass
 class Vehicle:
-    id: int
-    position: float  # distancia al stop line: >0 acercándose, 0 stop line, <0 más allá
-    speed: float
-    stopped: bool = False
+    __slots__ = ("id", "position", "speed", "stopped", "vclass")
+
+    def __init__(
+        self,
+        id: int,
+        position: float,
+        speed: float,
+        stopped: bool = False,
+        vclass: VehicleClass = CAR,
+    ):
+        self.id = id
+        self.position = position  # distancia al stop line: >0 acercándose, 0 stop line, <0 más allá
+        self.speed = speed
+        self.stopped = stopped
+        self.vclass = vclass
+
+    def __repr__(self):
+        return (
+            f"Vehicle(id={self.id!r}, position={self.position!r}, "
+            f"speed={self.speed!r}, stopped={self.stopped!r}, vclass={self.vclass.name!r})"
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.id, self.position, self.speed, self.stopped, self.vclass) == (
+            other.id,
+            other.position,
+            other.speed,
+            other.stopped,
+            other.vclass,
+        )
+
+    __hash__ = None
 
     def step(self, new_position: float):
         self.position = new_position
+
+
+class VehiclePool:
+    """Lista libre de vehículos que ya salieron del carril, para reutilizarlos."""
+
+    __slots__ = ("_free", "max_size")
+
+    def __init__(self, max_size: int = 1024):
+        self._free = []
+        self.max_size = max_size
+
+    def acquire(
+        self, id: int, position: float, speed: float, vclass: VehicleClass = CAR
+    ) -> Vehicle:
+        """Entrega un vehículo reciclado (o uno nuevo si no hay libres)."""
+        if self._free:
+            vehicle = self._free.pop()
+            vehicle.id = id
+            vehicle.position = position
+            vehicle.speed = speed
+            vehicle.stopped = False
+            vehicle.vclass = vclass
+            return vehicle
+        return Vehicle(id=id, position=position, speed=speed, vclass=vclass)
+
+    def release(self, vehicle: Vehicle):
+        """Devuelve un vehículo a la lista libre."""
+        if len(self._free) < self.max_size:
+            self._free.append(vehicle)
+
+    def __len__(self):
+        return len(self._free)
@@ -0,0 +1,133 @@
+"""Visor de terminal (curses) que dibuja la simulación a partir de snapshots.
+
+No depende de pygame ni del proceso de simulación: lee frames de un archivo
+grabado con ``SnapshotRecorder`` o de un ``SnapshotServer`` en ejecución, y
+redibuja a su propio ritmo con el último frame decodificado.
+
+    python -m semaforos.viewer --file corrida.snap --fps 30
+    python -m semaforos.viewer --connect 127.0.0.1:8765
+"""
+
+import argparse
+import curses
+import socket
+import threading
+import time
+from typing import List, Optional
+from .snapshot import Frame, SnapshotDecoder, read_frames
+
+
+def render_lines(frame: Frame, width: int = 80) -> List[str]:
+    """Representación de texto de un frame: una franja por carril.
+
+    La entrada está a la izquierda, la línea de parada (``|``) en el centro y
+    la salida a la derecha; ``>`` es un vehículo en marcha y ``#`` uno detenido.
+    """
+    width = max(width, 20)
+    lights = {
+        "A": "VERDE" if frame.light_A_green else "ROJO",
+        "B": "VERDE" if frame.light_B_green else "ROJO",
+    }
+    c = frame.counters
+    lines = [
+        f"t={frame.tick}  generados={c['total_spawned']}  "
+        f"completados={c['total_completed']}  cambios={c['total_changes']}"
+        + ("  [AMBOS ROJOS]" if frame.both_red else ""),
+        "",
+    ]
+
+    strip = width - 4
+    for name, length, vehicles in zip("AB", frame.lane_lengths, frame.lanes):
+        cells = [" "] * strip
+        middle = strip // 2
+        cells[middle] = "|"
+        for _, position, _, stopped in vehicles:
+            # posición de +length (entrada) a -length (salida)
+            col = int((length - position) / (2 * length) * (strip - 1))
+            if 0 <= col < strip and cells[col] != "#":
+                cells[col] = "#" if stopped else ">"
+        waiting = sum(1 for v in vehicles if v[3])
+        lines.append(
+            f"Carril {name}: {lights[name]:<5}  contador={c['counter_' + name]}  "
+            f"vehículos={len(vehicles)}  detenidos={waiting}"
+        )
+        lines.append(f"{name} [" + "".join(cells) + "]")
+        lines.append("")
+    return lines
+
+
+class _FrameSource:
+    """Decodifica frames en un hilo aparte y conserva solo el más reciente."""
+
+    def __init__(self, frames, fps: Optional[float] = None):
+        self.latest: Optional[Frame] = None
+        self.done = False
+        self._frames = frames
+        self._delay = 1.0 / fps if fps else 0.0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        decoder = SnapshotDecoder()
+        for data in self._frames:
+            frame = decoder.decode(data)
+            if frame is not None:
+                self.latest = frame
+                if self._delay:
+                    time.sleep(self._delay)
+        self.done = True
+
+
+def _socket_frames(address: str):
+    host, port = address.rsplit(":", 1)
+    with socket.create_connection((host, int(port))) as sock:
+        with sock.makefile("rb") as stream:
+            yield from read_frames(stream)
+
+
+def _file_frames(path: str):
+    with open(path, "rb") as f:
+        yield from read_frames(f)
+
+
+def run_viewer(source: _FrameSource, refresh_hz: float = 15.0):
+    def loop(screen):
+        curses.curs_set(0)
+        screen.nodelay(True)
+        while True:
+            key = screen.getch()
+            if key in (ord("q"), 27):
+                return
+            frame = source.latest
+            screen.erase()
+            height, width = screen.getmaxyx()
+            if frame is None:
+                screen.addstr(0, 0, "Esperando frame clave...")
+            else:
+                for y, line in enumerate(render_lines(frame, width - 1)[: height - 1]):
+                    screen.addstr(y, 0, line[: width - 1])
+            screen.addstr(height - 1, 0, "q: salir"[: width - 1])
+            screen.refresh()
+            time.sleep(1.0 / refresh_hz)
+
+    curses.wrapper(loop)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Visor de terminal de snapshots")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--file", help="archivo grabado con SnapshotRecorder")
+    group.add_argument("--connect", help="host:puerto de un SnapshotServer")
+    parser.add_argument("--fps", type=float, default=30.0, help="frames por segundo al reproducir un archivo")
+    parser.add_argument("--refresh", type=float, default=15.0, help="refrescos de pantalla por segundo")
+    args = parser.parse_args(argv)
+
+    if args.file:
+        source = _FrameSource(_file_frames(args.file), fps=args.fps)
+    else:
+        source = _FrameSource(_socket_frames(args.connect))
+    run_viewer(source, args.refresh)
+
+
+if __name__ == "__main__":
+    main()
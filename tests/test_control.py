@@ -0,0 +1,59 @@
+"""Comandos de la API de control aplicados desde el lado de la simulación."""
+
+from concurrent.futures import Future
+import random
+
+import pytest
+
+from semaforos.control import ControlError, ControlServer
+from semaforos.scenario import build_simulation
+
+
+def _call(server, method, params):
+    future = Future()
+    server._execute(method, params, future)
+    return future
+
+
+def test_set_params_is_all_or_nothing():
+    server = ControlServer(build_simulation(seed=1))
+    inter = server.sim.intersection
+    before = (inter.d, inter.n)
+    future = _call(server, "set_params", {"d": 55, "n": "x"})
+    with pytest.raises(ControlError) as info:
+        future.result()
+    assert info.value.code == -32602
+    assert (inter.d, inter.n) == before
+
+    assert _call(server, "set_params", {"d": 55, "n": 12}).result()["d"] == 55.0
+    assert (inter.d, inter.n) == (55.0, 12)
+
+
+def test_set_pattern_rejects_the_pattern_clock():
+    server = ControlServer(build_simulation(seed=1))
+    future = _call(server, "set_pattern", {"lane": "A", "current_time": 0})
+    with pytest.raises(ControlError):
+        future.result()
+    pattern = server.sim.intersection.lane_A.traffic_pattern
+    before = pattern.peak_multiplier
+    future = _call(server, "set_pattern", {"lane": "A", "peak_multiplier": 2.5, "base_rate": "x"})
+    with pytest.raises(ControlError):
+        future.result()
+    assert pattern.peak_multiplier == before
+
+
+def test_positional_params_return_an_error():
+    server = ControlServer(build_simulation(seed=1))
+    future = _call(server, "step", [5])
+    assert future.done()
+    with pytest.raises(ControlError):
+        future.result()
+
+
+def test_stats_poll_does_not_perturb_the_run():
+    server = ControlServer(build_simulation(seed=1))
+    for _ in range(100):
+        server.sim.step()
+    state = random.getstate()
+    _call(server, "stats", {}).result()
+    assert random.getstate() == state
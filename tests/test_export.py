@@ -0,0 +1,29 @@
+"""Exportación de corridas y lectura con ``load_run``."""
+
+import pytest
+
+from semaforos.export import TABLES, RunExporter, load_run
+from semaforos.scenario import build_simulation
+
+
+@pytest.mark.parametrize("fmt, module", [("arrow", "pyarrow"), ("npz", "numpy")])
+def test_empty_table_loads(tmp_path, fmt, module):
+    pytest.importorskip(module)
+    sim = build_simulation(seed=1, max_steps=50)
+    # Sin ticks múltiplos de 1000 la tabla de trayectorias queda sin filas
+    with RunExporter(sim, str(tmp_path), trajectory_every=1000, fmt=fmt):
+        while sim.step():
+            pass
+
+    run = load_run(str(tmp_path))
+    assert run["metadata"]["tables"]["trajectories"]["rows"] == 0
+    trajectories = run["trajectories"]
+    lanes = run["lanes"]
+    if fmt == "arrow":
+        assert trajectories.num_rows == 0
+        assert trajectories.column_names == [name for name, _ in TABLES["trajectories"]]
+        assert lanes.num_rows == 100
+    else:
+        assert all(len(column) == 0 for column in trajectories.values())
+        assert list(trajectories) == [name for name, _ in TABLES["trajectories"]]
+        assert len(lanes["tick"]) == 100
@@ -0,0 +1,25 @@
+"""Reglas del controlador de fases."""
+
+from semaforos.phases import ConflictMatrix, Movement, PhaseController
+
+
+def _crossing():
+    # Dos rectos que se cruzan: una fase para cada uno
+    matrix = ConflictMatrix([Movement("N", "T"), Movement("E", "T")])
+    assert [matrix.phase_names(p) for p in range(len(matrix.phases))] == [["NT"], ["ET"]]
+    return matrix
+
+
+def test_blocked_green_switches_without_red_demand():
+    controller = PhaseController(_crossing(), u=5)
+    changes = [controller.step([0, 0], [0, 0], blocked_mask=0b01) for _ in range(5)]
+    # Regla 2: el tiempo mínimo en verde se respeta también para la Regla 5
+    assert changes[:4] == [None] * 4
+    assert changes[4] == 1
+    assert controller.last_change_reason.startswith("Regla 5")
+
+
+def test_no_demand_and_no_blockage_keeps_the_phase():
+    controller = PhaseController(_crossing(), u=5)
+    assert all(controller.step([3, 0], [0, 0]) is None for _ in range(50))
+    assert controller.current_phase == 0
@@ -0,0 +1,39 @@
+"""Observar la simulación (estadísticas, telemetría) no altera la corrida."""
+
+import random
+
+from semaforos.scenario import build_simulation
+from semaforos.telemetry import TelemetryServer
+
+TICKS = 3000
+
+
+def _run(observe_every=None):
+    lane = {"kernel": "array"}
+    sim = build_simulation(seed=7, lane_A=lane, lane_B=lane)
+    telemetry = TelemetryServer(sim)  # sin iniciar: solo se arma el frame
+    for tick in range(1, TICKS + 1):
+        sim.step()
+        if observe_every and tick % observe_every == 0:
+            telemetry.snapshot()
+    inter = sim.intersection
+    return (
+        sim.total_vehicles_spawned,
+        sim.total_waiting_time,
+        [(v.id, v.position, v.speed, v.stopped) for v in inter.lane_A.vehicles],
+        [(v.id, v.position, v.speed, v.stopped) for v in inter.lane_B.vehicles],
+    )
+
+
+def test_statistics_do_not_consume_random_numbers():
+    sim = build_simulation(seed=7)
+    for _ in range(200):
+        sim.step()
+    state = random.getstate()
+    sim.get_statistics()
+    sim.get_debug_info()
+    assert random.getstate() == state
+
+
+def test_telemetry_sampling_does_not_change_the_run():
+    assert _run(observe_every=50) == _run()